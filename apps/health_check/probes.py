@@ -0,0 +1,148 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db import connections
+from django.dispatch import receiver
+
+_executor = None
+_executor_lock = threading.Lock()
+_report = None
+_report_expires_at = 0.0
+_report_lock = threading.Lock()
+
+
+def probe_database():
+    """Run a trivial query on every database, going through the connection pool if there is one."""
+    try:
+        for connection in connections.all():
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+    finally:
+        # Probe threads are not request threads, so nothing else would release their connections.
+        connections.close_all()
+
+
+def probe_cache():
+    """Write a value to the default cache and read it back."""
+    key = f'health_check:{uuid.uuid4().hex}'
+    cache.set(key, 1, timeout=10)
+    if cache.get(key) != 1:
+        raise RuntimeError('The cache did not return the written value')
+    cache.delete(key)
+
+
+PROBES = {
+    'database': probe_database,
+    'cache': probe_cache,
+}
+
+
+def get_database_pool_stats():
+    """Return the connection pool usage, or the persistent connection settings, of every database."""
+    result = {}
+    for connection in connections.all(initialized_only=False):
+        if getattr(connection, 'is_pooled', False):
+            result[connection.alias] = {'pooled': True, **connection.get_pool().stats()}
+        else:
+            result[connection.alias] = {
+                'pooled': False,
+                'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+                'health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+            }
+    return result
+
+
+def check_readiness():
+    """Return the readiness report of the dependencies, reusing the last one for `HEALTH_CHECK_CACHE_TTL`.
+
+    Concurrent callers wait for the report being built instead of probing the dependencies again.
+
+    :return: Whether every dependency is healthy, and the status and latency of each of them.
+    :rtype: dict
+    """
+    global _report, _report_expires_at
+    with _report_lock:
+        if _report is None or time.monotonic() >= _report_expires_at:
+            _report = run_probes(settings.HEALTH_CHECK_PROBES, settings.HEALTH_CHECK_TIMEOUT)
+            _report_expires_at = time.monotonic() + settings.HEALTH_CHECK_CACHE_TTL
+        return _report
+
+
+def clear_readiness_report():
+    """Drop the cached readiness report, so the next check probes the dependencies again."""
+    global _report
+    with _report_lock:
+        _report = None
+
+
+@receiver(setting_changed)
+def reset_readiness_report(setting, **kwargs):
+    """Drop the cached report when the health check settings are overridden, e.g. in tests."""
+    if setting.startswith('HEALTH_CHECK_'):
+        clear_readiness_report()
+
+
+def run_probes(names, timeout):
+    """Run the given probes concurrently and wait for them at most `timeout` seconds overall.
+
+    :param names: The names of the probes to run.
+    :type names: Iterable[str]
+    :param timeout: How long (in seconds) to wait for the probes.
+    :type timeout: float
+    :return: Whether every probe passed, and the status and latency of each of them.
+    :rtype: dict
+    """
+    started = {}
+    futures = {}
+    executor = get_executor()
+    for name in names:
+        started[name] = time.monotonic()
+        futures[name] = executor.submit(_timed, PROBES[name])
+    wait(futures.values(), timeout=timeout)
+
+    checks = {}
+    for name, future in futures.items():
+        if not future.done():
+            # The stuck probe keeps its worker until it returns, the report does not wait for it.
+            checks[name] = {
+                'status': 'timeout',
+                'latency_ms': round((time.monotonic() - started[name]) * 1000, 3),
+                'error': f'No response within {timeout}s',
+            }
+        else:
+            checks[name] = future.result()
+
+    return {
+        'ready': all(check['status'] in ('ok', 'skipped') for check in checks.values()),
+        'checked_at': time.time(),
+        'checks': checks,
+    }
+
+
+def get_executor():
+    """Return the worker threads running the probes, created on first use so forked workers get their own."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(settings.HEALTH_CHECK_WORKERS, thread_name_prefix='health-check')
+    return _executor
+
+
+def _timed(probe):
+    started = time.monotonic()
+    try:
+        status = probe() or 'ok'
+    except Exception as exc:
+        return {
+            'status': 'error',
+            'latency_ms': round((time.monotonic() - started) * 1000, 3),
+            'error': f'{type(exc).__name__}: {exc}',
+        }
+    return {'status': status, 'latency_ms': round((time.monotonic() - started) * 1000, 3)}
@@ -1,8 +1,62 @@
+import time
+from unittest import mock
+
+from django.test import override_settings
 from rest_framework.test import APITestCase
 
+from .probes import PROBES, clear_readiness_report
+
 
 class HealthCheckTestCase(APITestCase):
     def test_health_check_endpoint(self):
         response = self.client.get('/health_check')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data, {"status_code": 200, "detail": "ok", "result": "working"})
+
+    def test_db_pool_endpoint(self):
+        response = self.client.get('/health_check/db_pool')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('pooled', response.data['result']['default'])
+
+    def test_liveness_endpoint(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/health_check/live')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['result'], 'alive')
+
+
+@override_settings(HEALTH_CHECK_CACHE_TTL=60)
+class ReadinessTestCase(APITestCase):
+    def setUp(self):
+        clear_readiness_report()
+
+    def test_ready_when_dependencies_respond(self):
+        response = self.client.get('/health_check/ready')
+        self.assertEqual(response.status_code, 200)
+        checks = response.data['result']['checks']
+        self.assertEqual(checks['database']['status'], 'ok')
+        self.assertEqual(checks['cache']['status'], 'ok')
+        self.assertNotIn('email', checks)
+        self.assertIn('latency_ms', checks['database'])
+        self.assertIn('default', response.data['result']['db_pool'])
+
+    def test_not_ready_when_a_dependency_fails(self):
+        with mock.patch.dict(PROBES, cache=mock.Mock(side_effect=ConnectionError('refused'))):
+            response = self.client.get('/health_check/ready')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.data['result']['checks']['cache']['status'], 'error')
+        self.assertIn('refused', response.data['result']['checks']['cache']['error'])
+
+    @override_settings(HEALTH_CHECK_TIMEOUT=0.05)
+    def test_slow_dependency_times_out(self):
+        with mock.patch.dict(PROBES, cache=lambda: time.sleep(0.5)):
+            response = self.client.get('/health_check/ready')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.data['result']['checks']['cache']['status'], 'timeout')
+
+    def test_report_is_reused_within_ttl(self):
+        probe = mock.Mock(return_value=None)
+        with mock.patch.dict(PROBES, cache=probe):
+            self.client.get('/health_check/ready')
+            self.client.get('/health_check/ready')
+        probe.assert_called_once()
@@ -1,7 +1,10 @@
 from django.urls import path
 
-from .views import HealthCheck
+from .views import DatabasePoolView, HealthCheck, LivenessView, ReadinessView
 
 urlpatterns = [
     path('', HealthCheck.as_view(), name='health_check'),
+    path('/live', LivenessView.as_view(), name='health_check_live'),
+    path('/ready', ReadinessView.as_view(), name='health_check_ready'),
+    path('/db_pool', DatabasePoolView.as_view(), name='health_check_db_pool'),
 ]
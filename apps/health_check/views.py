@@ -1,14 +1,21 @@
 import logging
 
+from rest_framework import status
+from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .probes import check_readiness, get_database_pool_stats
+
 logger = logging.getLogger(__name__)
 
 
 class HealthCheck(APIView):
     """A view for performing health checks."""
 
+    permission_classes = (AllowAny,)
+    throttle_classes = ()
+
     def get(self, *args, **kwargs):
         """Handle GET request for health check."""
         logger.info('Information incoming!')
@@ -19,3 +26,56 @@ class HealthCheck(APIView):
                 "result": "working"
             }
         )
+
+
+class LivenessView(APIView):
+    """A view for the liveness probe, answering without any I/O as long as the worker serves requests."""
+
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+    throttle_classes = ()
+
+    def get(self, *args, **kwargs):
+        """Handle GET request for the liveness probe."""
+        return Response({"status_code": 200, "detail": "ok", "result": "alive"})
+
+
+class ReadinessView(APIView):
+    """A view for the readiness probe, checking that the database and cache respond."""
+
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+    throttle_classes = ()
+
+    def get(self, *args, **kwargs):
+        """Handle GET request for the readiness probe, with 503 if a dependency is down."""
+        report = check_readiness()
+        status_code = status.HTTP_200_OK if report['ready'] else status.HTTP_503_SERVICE_UNAVAILABLE
+        if not report['ready']:
+            logger.warning('Readiness check failed: %s', report['checks'])
+        return Response(
+            {
+                "status_code": status_code,
+                "detail": "ok" if report['ready'] else "unavailable",
+                "result": {**report, 'db_pool': get_database_pool_stats()}
+            },
+            status=status_code
+        )
+
+
+class DatabasePoolView(APIView):
+    """A view for reporting the database connection pool usage of the current worker."""
+
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+    throttle_classes = ()
+
+    def get(self, *args, **kwargs):
+        """Handle GET request for the connection pool metrics."""
+        return Response(
+            {
+                "status_code": 200,
+                "detail": "ok",
+                "result": get_database_pool_stats()
+            }
+        )
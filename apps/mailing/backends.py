@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+
+from apps.mailing.messages import build_outbound_email
+from apps.mailing.models import OutboundEmail
+from apps.mailing.worker import wake_local_worker
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Email backend that stores the messages in the outbound queue instead of sending them.
+
+    The request only pays for one INSERT, which is part of its transaction, so the mail is
+    not sent if the transaction is rolled back. Messages with attachments, which the queue does
+    not store, are sent right away with `MAILING_DELIVERY_BACKEND`.
+    """
+
+    def send_messages(self, email_messages):
+        """Queue the messages and return how many were accepted."""
+        queued = []
+        direct = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            if message.attachments:
+                direct.append(message)
+            else:
+                queued.append(build_outbound_email(message))
+
+        if queued:
+            OutboundEmail.objects.bulk_create(queued, ignore_conflicts=True)
+            if settings.MAILING_LOCAL_WORKER:
+                transaction.on_commit(wake_local_worker)
+
+        sent = len(queued)
+        if direct:
+            connection = get_connection(settings.MAILING_DELIVERY_BACKEND, fail_silently=self.fail_silently)
+            sent += connection.send_messages(direct) or 0
+        return sent
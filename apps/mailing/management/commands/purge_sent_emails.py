@@ -0,0 +1,59 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+
+from apps.mailing.models import OutboundEmail
+
+
+class Command(BaseCommand):
+    """Delete the delivered and failed emails past their retention in small batches."""
+
+    help = (
+        'Purge the sent emails older than MAILING_SENT_RETENTION and the failed ones older than '
+        'MAILING_FAILED_RETENTION, as they hold activation and password reset links, in primary key '
+        'windows with one short transaction per window.'
+    )
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.MAILING_PURGE_BATCH_SIZE, help='Primary keys per window.'
+        )
+        parser.add_argument('--sleep', type=float, default=0, help='Seconds to pause between windows.')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the emails past their retention.')
+
+    def handle(self, *args, **options):
+        """Purge the emails past their retention, window by window."""
+        now = timezone.now()
+        condition = Q(
+            status=OutboundEmail.Status.SENT, sent_at__lt=now - timedelta(seconds=settings.MAILING_SENT_RETENTION)
+        ) | Q(
+            status=OutboundEmail.Status.FAILED,
+            updated_at__lt=now - timedelta(seconds=settings.MAILING_FAILED_RETENTION),
+        )
+        expired = OutboundEmail.objects.filter(condition)
+        bounds = expired.aggregate(first=Min('id'), last=Max('id'))
+        if bounds['first'] is None:
+            self.stdout.write('No emails past their retention.')
+            return
+
+        if options['dry_run']:
+            self.stdout.write(
+                f'{expired.count()} emails past their retention between ids {bounds["first"]} and {bounds["last"]}.'
+            )
+            return
+
+        purged = 0
+        started = time.perf_counter()
+        for start in range(bounds['first'], bounds['last'] + 1, options['batch_size']):
+            with transaction.atomic():
+                purged += expired.filter(id__gte=start, id__lt=start + options['batch_size']).delete()[0]
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(f'Purged {purged} emails in {time.perf_counter() - started:.1f}s.')
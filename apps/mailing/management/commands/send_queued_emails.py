@@ -0,0 +1,43 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.mailing.worker import EmailWorker
+
+
+class Command(BaseCommand):
+    """Deliver the emails of the outbound queue until stopped."""
+
+    help = 'Deliver the queued emails in batches, retrying failed deliveries with backoff.'
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('--once', action='store_true', help='Deliver the due emails once and exit.')
+        parser.add_argument('--batch-size', type=int, default=None, help='Emails sent over one connection.')
+        parser.add_argument(
+            '--interval', type=float, default=settings.MAILING_POLL_INTERVAL, help='Seconds between queue polls.'
+        )
+
+    def handle(self, *args, **options):
+        """Poll the queue, finishing the current batch on SIGTERM or SIGINT."""
+        worker = EmailWorker(batch_size=options['batch_size'])
+        if options['once']:
+            sent = 0
+            while count := worker.run_once():
+                sent += count
+            self.stdout.write(f'Processed {sent} emails.')
+            return
+
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        while not self.stopping:
+            close_old_connections()
+            if not worker.run_once():
+                time.sleep(options['interval'])
+
+    def _stop(self, *args):
+        self.stopping = True
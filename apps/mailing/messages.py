@@ -0,0 +1,64 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+
+from apps.mailing.models import OutboundEmail
+
+
+def serialize_message(message):
+    """Return the JSON-serializable fields of an email message without attachments."""
+    return {
+        'subject': message.subject,
+        'body': message.body,
+        'from_email': message.from_email,
+        'to': list(message.to),
+        'cc': list(message.cc),
+        'bcc': list(message.bcc),
+        'reply_to': list(message.reply_to),
+        'headers': dict(message.extra_headers),
+        'alternatives': [list(alternative) for alternative in getattr(message, 'alternatives', [])],
+        'content_subtype': message.content_subtype,
+    }
+
+
+def build_message(payload, connection=None):
+    """Return the email message stored in an outbound email payload."""
+    message = EmailMultiAlternatives(
+        subject=payload['subject'],
+        body=payload['body'],
+        from_email=payload['from_email'],
+        to=payload['to'],
+        cc=payload['cc'],
+        bcc=payload['bcc'],
+        reply_to=payload['reply_to'],
+        headers=payload['headers'],
+        alternatives=[tuple(alternative) for alternative in payload['alternatives']],
+        connection=connection,
+    )
+    message.content_subtype = payload['content_subtype']
+    return message
+
+
+def build_outbound_email(message):
+    """Return an unsaved outbound email for a message, keyed so that duplicates are queued once.
+
+    Messages with the same content and recipients get the same `dedupe_key` within each
+    `MAILING_DEDUPE_WINDOW`, e.g. when a client retries a signup request.
+
+    :param message: The message to queue.
+    :type message: EmailMessage
+    :rtype: OutboundEmail
+    """
+    payload = serialize_message(message)
+    window = int(time.time() // settings.MAILING_DEDUPE_WINDOW)
+    content = json.dumps([payload, window], sort_keys=True)
+    return OutboundEmail(
+        dedupe_key=hashlib.sha256(content.encode()).hexdigest(),
+        subject=payload['subject'][:998],
+        from_email=payload['from_email'] or settings.DEFAULT_FROM_EMAIL,
+        recipients=message.recipients(),
+        payload=payload,
+    )
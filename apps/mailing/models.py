@@ -0,0 +1,31 @@
+from django.db import models
+from django.utils import timezone
+
+from apps.health_check.models import TimeStampedModel
+
+
+class OutboundEmail(TimeStampedModel):
+    """Email waiting in the outbound queue, or already delivered by the mailing worker."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending'
+        SENDING = 'sending'
+        SENT = 'sent'
+        FAILED = 'failed'
+
+    class Meta:
+        db_table = 'outbound_email'
+        indexes = (
+            models.Index(fields=('status', 'next_attempt_at'), name='outbound_email_due_idx'),
+        )
+
+    dedupe_key = models.CharField(max_length=64, unique=True)
+    subject = models.CharField(max_length=998)
+    from_email = models.CharField(max_length=254)
+    recipients = models.JSONField()
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    sent_at = models.DateTimeField(null=True, blank=True)
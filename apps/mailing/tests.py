@@ -0,0 +1,99 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.mailing.models import OutboundEmail
+from apps.mailing.worker import EmailWorker
+from core.testing.smtp import LocalSMTPServer
+
+
+@override_settings(
+    EMAIL_BACKEND='apps.mailing.backends.QueuedEmailBackend',
+    MAILING_DELIVERY_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+    EMAIL_HOST='127.0.0.1',
+    EMAIL_USE_TLS=False,
+    EMAIL_HOST_USER='',
+    EMAIL_HOST_PASSWORD='',
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class OutboundEmailQueueTestCase(APITestCase):
+    def send(self, subject='Hello', to='user@example.com'):
+        return mail.send_mail(subject, 'Body', 'noreply@example.com', [to])
+
+    def test_signup_queues_the_activation_email(self):
+        payload = {
+            'email': 'signup@example.com', 'first_name': 'A', 'last_name': 'B', 'password': 'Str0ng-secret',
+            're_password': 'Str0ng-secret'
+        }
+        response = self.client.post('/auth/users/', payload)
+        self.assertEqual(response.status_code, 201)
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.recipients, ['signup@example.com'])
+        self.assertEqual(email.status, OutboundEmail.Status.PENDING)
+
+        with LocalSMTPServer() as server, self.settings(EMAIL_PORT=server.port):
+            self.assertEqual(EmailWorker().run_once(), 1)
+        self.assertEqual(server.messages[0]['recipients'], ['signup@example.com'])
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.Status.SENT)
+
+    def test_identical_emails_are_queued_once(self):
+        self.send()
+        self.send()
+        self.send(to='other@example.com')
+        self.assertEqual(OutboundEmail.objects.count(), 2)
+
+    def test_batch_is_sent_over_one_connection(self):
+        for index in range(3):
+            self.send(subject=f'Hello {index}')
+        with LocalSMTPServer() as server, self.settings(EMAIL_PORT=server.port):
+            EmailWorker().run_once()
+        self.assertEqual(len(server.messages), 3)
+        self.assertEqual(server.connections, 1)
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        self.send()
+        with LocalSMTPServer() as server, self.settings(EMAIL_PORT=server.port):
+            server.fail_next = 1
+            EmailWorker().run_once()
+            email = OutboundEmail.objects.get()
+            self.assertEqual(email.status, OutboundEmail.Status.PENDING)
+            self.assertEqual(email.attempts, 1)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+            self.assertIn('451', email.last_error)
+
+            self.assertEqual(EmailWorker().run_once(), 0)
+            OutboundEmail.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+            EmailWorker().run_once()
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.Status.SENT)
+        self.assertEqual(len(server.messages), 1)
+
+    @override_settings(MAILING_MAX_ATTEMPTS=1)
+    def test_delivery_gives_up_after_max_attempts(self):
+        self.send()
+        with self.settings(EMAIL_PORT=1):
+            EmailWorker().run_once()
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.Status.FAILED)
+
+    @override_settings(MAILING_SENT_RETENTION=3600, MAILING_FAILED_RETENTION=7200)
+    def test_purge_deletes_the_emails_past_their_retention(self):
+        for index in range(5):
+            self.send(subject=f'Hello {index}')
+        emails = list(OutboundEmail.objects.order_by('pk'))
+        now = timezone.now()
+        OutboundEmail.objects.filter(pk__in=[emails[0].pk, emails[1].pk]).update(
+            status=OutboundEmail.Status.SENT, sent_at=now - timedelta(hours=2)
+        )
+        OutboundEmail.objects.filter(pk=emails[2].pk).update(status=OutboundEmail.Status.SENT, sent_at=now)
+        OutboundEmail.objects.filter(pk=emails[3].pk).update(
+            status=OutboundEmail.Status.FAILED, updated_at=now - timedelta(hours=3)
+        )
+
+        call_command('purge_sent_emails', batch_size=2, stdout=StringIO())
+        self.assertEqual(
+            list(OutboundEmail.objects.order_by('pk').values_list('pk', flat=True)), [emails[2].pk, emails[4].pk]
+        )
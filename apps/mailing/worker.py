@@ -0,0 +1,146 @@
+import logging
+import os
+import random
+import smtplib
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.mailing.messages import build_message
+from apps.mailing.models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+_local_worker = None
+_local_worker_pid = None
+_local_worker_lock = threading.Lock()
+_wakeup = threading.Event()
+
+
+class EmailWorker:
+    """Deliver the queued emails in batches, each batch over a single connection to the mail server.
+
+    Failed deliveries are retried with an exponential backoff, up to `MAILING_MAX_ATTEMPTS`
+    attempts. Permanent SMTP errors (5xx) are not retried. Batches are claimed with
+    `SELECT ... FOR UPDATE SKIP LOCKED`, so several workers can share the queue.
+    """
+
+    def __init__(self, batch_size=None, max_attempts=None):
+        """Initialize the worker, falling back to the `MAILING_*` settings."""
+        self.batch_size = batch_size or settings.MAILING_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.MAILING_MAX_ATTEMPTS
+
+    def run_once(self):
+        """Claim and deliver one batch of due emails.
+
+        :return: The number of emails that were claimed.
+        :rtype: int
+        """
+        emails = self.claim()
+        if emails:
+            self.deliver(emails)
+        return len(emails)
+
+    def claim(self):
+        """Mark a batch of due emails as being sent and return them."""
+        now = timezone.now()
+        due = Q(status=OutboundEmail.Status.PENDING, next_attempt_at__lte=now) | Q(
+            status=OutboundEmail.Status.SENDING,
+            updated_at__lt=now - timedelta(seconds=settings.MAILING_SENDING_TIMEOUT),
+        )
+        with transaction.atomic():
+            emails = list(
+                OutboundEmail.objects.select_for_update(skip_locked=True).filter(due).order_by('next_attempt_at')[
+                    :self.batch_size
+                ]
+            )
+            if emails:
+                OutboundEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+                    status=OutboundEmail.Status.SENDING, updated_at=now
+                )
+        return emails
+
+    def deliver(self, emails):
+        """Send the claimed emails over one connection and record the outcome of each of them."""
+        connection = get_connection(settings.MAILING_DELIVERY_BACKEND, fail_silently=False)
+        try:
+            connection.open()
+        except Exception as exc:
+            logger.warning('Could not connect to the mail server: %s', exc)
+            for email in emails:
+                self._record_failure(email, exc)
+            self._save(emails)
+            return
+
+        try:
+            for email in emails:
+                try:
+                    connection.send_messages([build_message(email.payload, connection)])
+                except Exception as exc:
+                    logger.warning('Could not send email %s: %s', email.pk, exc)
+                    self._record_failure(email, exc)
+                    # The connection may be broken, the next message gets a new one.
+                    connection.close()
+                else:
+                    email.attempts += 1
+                    email.status = OutboundEmail.Status.SENT
+                    email.sent_at = timezone.now()
+                    email.last_error = ''
+        finally:
+            connection.close()
+        self._save(emails)
+
+    def get_retry_delay(self, attempts):
+        """Return how long to wait before the next attempt, with jitter so retries spread out."""
+        delay = min(settings.MAILING_RETRY_BASE_DELAY * 2 ** (attempts - 1), settings.MAILING_RETRY_MAX_DELAY)
+        return delay * random.uniform(0.5, 1)
+
+    def _record_failure(self, email, exc):
+        email.attempts += 1
+        email.last_error = f'{type(exc).__name__}: {exc}'[:2000]
+        permanent = isinstance(exc, smtplib.SMTPResponseException) and exc.smtp_code >= 500
+        if permanent or email.attempts >= self.max_attempts:
+            email.status = OutboundEmail.Status.FAILED
+        else:
+            email.status = OutboundEmail.Status.PENDING
+            email.next_attempt_at = timezone.now() + timedelta(seconds=self.get_retry_delay(email.attempts))
+
+    @staticmethod
+    def _save(emails):
+        now = timezone.now()
+        for email in emails:
+            email.updated_at = now
+        OutboundEmail.objects.bulk_update(
+            emails, ('status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'updated_at')
+        )
+
+
+def wake_local_worker():
+    """Start the in-process worker thread if needed, and make it check the queue now."""
+    global _local_worker, _local_worker_pid
+    if _local_worker_pid != os.getpid():
+        with _local_worker_lock:
+            if _local_worker_pid != os.getpid():
+                _local_worker = threading.Thread(target=_run_local_worker, name='mailing-worker', daemon=True)
+                _local_worker.start()
+                _local_worker_pid = os.getpid()
+    _wakeup.set()
+
+
+def _run_local_worker():
+    worker = EmailWorker()
+    while True:
+        _wakeup.wait(settings.MAILING_POLL_INTERVAL)
+        _wakeup.clear()
+        try:
+            while worker.run_once():
+                pass
+        except Exception:
+            logger.exception('The local mailing worker failed')
+        finally:
+            close_old_connections()
@@ -7,4 +7,6 @@ from .models import UserModel
 class UserAdmin(admin.ModelAdmin):
     """Admin configuration for the UserModel."""
 
-    list_display = ['first_name', 'last_name', 'email']
\ No newline at end of file
+    list_display = ['first_name', 'last_name', 'email']
+    search_fields = ['=email']
+    list_filter = ['is_active']
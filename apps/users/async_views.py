@@ -0,0 +1,179 @@
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.request import Request
+
+from core.cache.mixins import get_validator_headers, make_validators, resolve_field
+from core.hashing.pool import get_hashing_pool
+from core.pagination.keyset_pagination import KeysetPagination
+from core.serializers.compiled import compile_serializer
+from core.views.async_api import AsyncAPIView
+
+from .changes import record_changes, record_user_deletion
+from .filters import UserFilterBackend
+from .models import ProfileModel, UserChangeModel, UserModel
+from .permissions import IsOwnerOrStaff
+from .serializers import ProfileSerializer, UserAccountSerializer
+from .updates import PreconditionFailed, UserUpdater
+
+
+class AsyncUsersListCreateView(AsyncAPIView):
+    """Async API view for listing and creating users."""
+
+    pagination_class = KeysetPagination
+    filter_backend = UserFilterBackend
+
+    async def get(self, request, *args, **kwargs):
+        """Return a filtered page of users, fetched as `values_list()` rows with async iteration.
+
+        Like in the sync view, a fieldset the compiled serializer cannot render is rendered from
+        model instances by the DRF serializer instead.
+        """
+        drf_request = self.get_request()
+        paginator = self.pagination_class()
+        try:
+            serializer = UserAccountSerializer(context={'request': drf_request})
+            compiled = compile_serializer(serializer)
+            queryset = self.filter_backend().filter_queryset(drf_request, UserModel.objects.all(), self)
+        except ValidationError as exc:
+            return self.render(exc.detail, status=400)
+        if compiled is None:
+            page = await paginator.apaginate_queryset(queryset.for_serializer(serializer), drf_request)
+            many = UserAccountSerializer(page, many=True, context={'request': drf_request})
+            data = await sync_to_async(lambda: many.data)()
+        else:
+            ordering = (field.lstrip('-') for field in paginator.ordering)
+            page = await paginator.apaginate_queryset(compiled.values_list(queryset, ordering), drf_request)
+            data = compiled.render_many(page)
+
+        if drf_request.query_params.get(paginator.total_query_param):
+            return self.render(await sync_to_async(paginator.get_paginated_payload)(data))
+        return self.render(paginator.get_paginated_payload(data))
+
+    async def post(self, request, *args, **kwargs):
+        """Create a user with a profile, hashing the password on the hashing pool."""
+        data = self.parse_json()
+        if data is None:
+            return self.render_error('JSON parse error', status=400)
+
+        serializer = UserAccountSerializer(data=data)
+        if not await sync_to_async(serializer.is_valid)():
+            return self.render(serializer.errors, status=400)
+
+        validated_data = dict(serializer.validated_data)
+        profile = validated_data.pop('profile')
+        password = await get_hashing_pool().ahash(validated_data.pop('password'))
+        user = await sync_to_async(self.create_user)(validated_data, password, profile)
+        return self.render(UserAccountSerializer(user).data, status=201)
+
+    @staticmethod
+    @transaction.atomic
+    def create_user(validated_data, password, profile):
+        """Insert the user and its profile in one transaction, which the async ORM cannot open."""
+        user = UserModel(**validated_data, password=password)
+        user.email = UserModel.objects.normalize_email(user.email)
+        user.save()
+        user.profile = ProfileModel.objects.create(**profile, user=user)
+        record_changes([user, user.profile], UserChangeModel.Action.CREATED)
+        return user
+
+
+class AsyncUserRetrieveDestroyView(AsyncAPIView):
+    """Async API view for retrieving and destroying user accounts."""
+
+    async def get(self, request, pk, *args, **kwargs):
+        """Return the requested fields of a user, or 304 if the client has the current version."""
+        context = {'request': self.get_request()}
+        try:
+            serializer = UserAccountSerializer(context=context)
+            # The validators of the sync view: the profile is part of them when it is rendered.
+            validator_fields = ('updated_at',)
+            if 'profile' in serializer.fields:
+                validator_fields += ('profile__updated_at',)
+            queryset = UserModel.objects.for_serializer(serializer, validator_fields)
+        except ValidationError as exc:
+            return self.render(exc.detail, status=400)
+        try:
+            user = await queryset.aget(pk=pk)
+        except UserModel.DoesNotExist:
+            return self.render_error('Not found.', status=404)
+        return self.render_conditional(
+            UserAccountSerializer(user, context=context).data,
+            [resolve_field(user, field) for field in validator_fields],
+            serializer.fieldset_variant,
+        )
+
+    async def delete(self, request, pk, *args, **kwargs):
+        """Delete a user with its profile."""
+        try:
+            user = await UserModel.objects.only('pk').aget(pk=pk)
+        except UserModel.DoesNotExist:
+            return self.render_error('Not found.', status=404)
+        await sync_to_async(self.delete_user)(user)
+        return self.render(None, status=204)
+
+    @staticmethod
+    @transaction.atomic
+    def delete_user(user):
+        """Delete the user with its profile, recording both deletions in the change feed."""
+        record_user_deletion(user)
+        user.delete()
+
+
+class AsyncUserProfileView(AsyncAPIView):
+    """Async API view for retrieving and updating user profiles.
+
+    Users can only update their own profile, staff users any profile.
+    """
+
+    async def get(self, request, pk, *args, **kwargs):
+        """Return a profile, or 304 if the client has the current version."""
+        try:
+            profile = await ProfileModel.objects.aget(pk=pk)
+        except ProfileModel.DoesNotExist:
+            return self.render_error('Not found.', status=404)
+        return self.render_conditional(ProfileSerializer(profile).data, [profile.updated_at])
+
+    async def put(self, request, pk, *args, **kwargs):
+        """Replace the fields of a profile."""
+        return await self.update(pk, partial=False)
+
+    async def patch(self, request, pk, *args, **kwargs):
+        """Update some fields of a profile."""
+        return await self.update(pk, partial=True)
+
+    async def update(self, pk, partial):
+        """Validate the request body and save only the changed columns of the profile.
+
+        With `If-Match` or `If-Unmodified-Since`, the update is only saved if the profile was not
+        modified since the client read it, else 412 is returned.
+        """
+        request = await self.authenticate()
+        if not isinstance(request, Request):
+            return request
+        data = self.parse_json()
+        if data is None:
+            return self.render_error('JSON parse error', status=400)
+
+        try:
+            profile = await ProfileModel.objects.aget(pk=pk)
+        except ProfileModel.DoesNotExist:
+            return self.render_error('Not found.', status=404)
+        if not IsOwnerOrStaff().has_object_permission(request, self, profile):
+            return self.render_error(PermissionDenied.default_detail, status=403)
+        response = self.get_conditional_response(make_validators([profile.updated_at]))
+        if response is not None:
+            return response
+
+        serializer = ProfileSerializer(profile, data=data, partial=partial)
+        if not serializer.is_valid():
+            return self.render(serializer.errors, status=400)
+
+        conditional = 'If-Match' in self.request.headers or 'If-Unmodified-Since' in self.request.headers
+        try:
+            await sync_to_async(UserUpdater().save_profile)(profile, serializer.validated_data, conditional)
+        except PreconditionFailed as exc:
+            return self.render_error(exc.detail, status=exc.status_code)
+        return self.render(
+            ProfileSerializer(profile).data, headers=get_validator_headers(make_validators([profile.updated_at]))
+        )
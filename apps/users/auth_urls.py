@@ -0,0 +1,9 @@
+from rest_framework.routers import DefaultRouter
+
+from .views import AuthUserViewSet
+
+# The djoser users endpoints, served by a view set recording the changes in the change feed.
+router = DefaultRouter()
+router.register('users', AuthUserViewSet)
+
+urlpatterns = router.urls
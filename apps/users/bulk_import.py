@@ -0,0 +1,150 @@
+import codecs
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from apps.users.changes import record_changes
+from apps.users.models import ProfileModel, UserChangeModel, UserModel
+from apps.users.serializers import UserImportRowSerializer
+from core.hashing.pool import get_hashing_pool
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+
+def iter_import_rows(upload, import_format):
+    """Yield `(row_number, row)` pairs from an uploaded CSV or NDJSON file, one line at a time.
+
+    Rows that cannot be parsed are yielded as `ValueError` instances, so they can be reported
+    without aborting the import.
+    """
+    lines = codecs.iterdecode(upload, 'utf-8-sig')
+    if import_format == 'csv':
+        for row_number, row in enumerate(csv.DictReader(lines), start=1):
+            if None in row:
+                yield row_number, ValueError('Row has more values than the header')
+            else:
+                yield row_number, row
+        return
+
+    row_number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield row_number, ValueError(f'Invalid JSON: {exc}')
+            continue
+        yield row_number, row if isinstance(row, dict) else ValueError('Row must be a JSON object')
+
+
+class UserImporter:
+    """Import users with their profiles in batches, collecting the errors of every row."""
+
+    def __init__(self, batch_size=None, max_reported_errors=None):
+        """Initialize the importer, falling back to the `USERS_IMPORT_*` settings."""
+        self.batch_size = batch_size or settings.USERS_IMPORT_BATCH_SIZE
+        self.max_reported_errors = max_reported_errors or settings.USERS_IMPORT_MAX_REPORTED_ERRORS
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self._seen_emails = set()
+
+    def run(self, rows):
+        """Validate and insert the given `(row_number, row)` pairs.
+
+        :param rows: The rows to import, as yielded by `iter_import_rows`.
+        :type rows: Iterable[tuple[int, dict | ValueError]]
+        :return: The number of created and failed rows and the reported row errors.
+        :rtype: dict
+        """
+        rows = iter(rows)
+        while chunk := list(islice(rows, self.batch_size)):
+            self._import_chunk(chunk)
+
+        return {
+            'created': self.created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+    def _import_chunk(self, chunk):
+        valid = []
+        for row_number, row in chunk:
+            if isinstance(row, ValueError):
+                self._add_error(row_number, {'non_field_errors': [str(row)]})
+                continue
+
+            serializer = UserImportRowSerializer(data=row)
+            if not serializer.is_valid():
+                self._add_error(row_number, serializer.errors)
+                continue
+
+            data = serializer.validated_data
+            data['email'] = UserModel.objects.normalize_email(data['email'])
+            if data['email'] in self._seen_emails:
+                self._add_error(row_number, {'email': ['Duplicate email in the import']})
+                continue
+            self._seen_emails.add(data['email'])
+            valid.append((row_number, data))
+
+        existing = set(
+            UserModel.objects.filter(email__in=[data['email'] for _, data in valid]).values_list('email', flat=True)
+        )
+        for row_number, data in valid:
+            if data['email'] in existing:
+                self._add_error(row_number, {'email': ['User with this email already exists']})
+        valid = [(row_number, data) for row_number, data in valid if data['email'] not in existing]
+        if not valid:
+            return
+
+        hashes = get_hashing_pool().hash_many([data['password'] for _, data in valid])
+
+        try:
+            with transaction.atomic():
+                self._insert(valid, hashes)
+        except IntegrityError:
+            self._insert_one_by_one(valid, hashes)
+        else:
+            self.created += len(valid)
+
+    def _insert(self, rows, hashes):
+        users = UserModel.objects.bulk_create(
+            [
+                UserModel(
+                    email=data['email'], password=password, first_name=data['first_name'],
+                    last_name=data['last_name']
+                )
+                for (_, data), password in zip(rows, hashes)
+            ],
+            batch_size=self.batch_size
+        )
+        profiles = ProfileModel.objects.bulk_create(
+            [
+                ProfileModel(city=data['city'], phone=data['phone'], age=data['age'], user=user)
+                for (_, data), user in zip(rows, users)
+            ],
+            batch_size=self.batch_size
+        )
+        record_changes([*users, *profiles], UserChangeModel.Action.CREATED)
+
+    def _insert_one_by_one(self, rows, hashes):
+        for row, password in zip(rows, hashes):
+            try:
+                with transaction.atomic():
+                    self._insert([row], [password])
+            except IntegrityError as exc:
+                self._add_error(row[0], {'non_field_errors': [str(exc)]})
+            else:
+                self.created += 1
+
+    def _add_error(self, row_number, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_reported_errors:
+            self.errors.append({'row': row_number, 'errors': errors})
+
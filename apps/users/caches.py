@@ -0,0 +1,4 @@
+from core.cache.read_through import ReadThroughCache
+
+user_detail_cache = ReadThroughCache('users:user')
+profile_detail_cache = ReadThroughCache('users:profile')
@@ -0,0 +1,318 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, Max, OuterRef
+from django.utils import timezone
+from redis import Redis, ResponseError
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from apps.users.models import ProfileModel, UserChangeModel, UserModel
+from core.renderers.fast_json import encode_json
+
+# The state recorded with a change, by kind of object. The password hash never leaves the database.
+CHANGE_FIELDS = {
+    UserChangeModel.Kind.USER: (
+        'id', 'email', 'first_name', 'last_name', 'is_active', 'is_staff', 'is_superuser', 'last_login',
+        'created_at', 'updated_at',
+    ),
+    UserChangeModel.Kind.PROFILE: ('id', 'user_id', 'city', 'phone', 'age', 'created_at', 'updated_at'),
+}
+CHANGE_KINDS = {UserModel: UserChangeModel.Kind.USER, ProfileModel: UserChangeModel.Kind.PROFILE}
+# The fields of a change in the feed.
+FEED_FIELDS = ('sequence', 'kind', 'action', 'object_id', 'data', 'created_at')
+SEQUENCE_BATCH_SIZE = 1000
+
+# Keys of the PostgreSQL advisory locks that make a single transaction number the changes, and a
+# single relay append them to the Redis stream, at a time.
+SEQUENCE_LOCK_ID = 7_510_001
+RELAY_LOCK_ID = 7_510_002
+# Returned by Redis when a stream ID is not above the last one, i.e. the change was already appended.
+DUPLICATE_ID_ERROR = 'equal or smaller than the target stream top item'
+
+
+def build_change(instance, action):
+    """Return the unsaved change of a user or a profile, holding its current state."""
+    # Unlike `type()`, `__class__` is the class of the user behind the lazy `request.user`.
+    kind = CHANGE_KINDS[instance.__class__]
+    if action == UserChangeModel.Action.DELETED:
+        data = {'id': instance.pk}
+    else:
+        data = {field: getattr(instance, field) for field in CHANGE_FIELDS[kind]}
+    return UserChangeModel(kind=kind, action=action, object_id=instance.pk, data=data)
+
+
+def record_changes(instances, action):
+    """Record the same change of every user or profile of `instances`, in the current transaction."""
+    UserChangeModel.objects.bulk_create([build_change(instance, action) for instance in instances])
+
+
+def record_user_deletion(user):
+    """Record the deletion of `user` and of its profile, which is deleted with it. Call it before deleting."""
+    profiles = [ProfileModel(pk=pk) for pk in ProfileModel.objects.filter(user_id=user.pk).values_list('pk', flat=True)]
+    record_changes([*profiles, user], UserChangeModel.Action.DELETED)
+
+
+def sequence_changes(batch_size=SEQUENCE_BATCH_SIZE, wait=True):
+    """Give the next positions of the feed to committed changes that have none, in the order they were recorded.
+
+    Only committed changes are visible here, so a change committed after others were numbered
+    gets a later position, and a consumer reading the feed after a position never misses it.
+
+    :param batch_size: The maximum number of changes to number.
+    :type batch_size: int
+    :param wait: Whether to wait for another transaction numbering changes, instead of returning.
+    :type wait: bool
+    :return: The number of numbered changes.
+    :rtype: int
+    """
+    pending = UserChangeModel.objects.filter(sequence__isnull=True)
+    if not pending.exists():
+        return 0
+
+    with transaction.atomic():
+        if not _lock(SEQUENCE_LOCK_ID, wait):
+            return 0
+        changes = list(pending.order_by('pk').only('pk')[:batch_size])
+        last = UserChangeModel.objects.aggregate(last=Max('sequence'))['last'] or 0
+        now = timezone.now()
+        for position, change in enumerate(changes, start=last + 1):
+            change.sequence = position
+            change.updated_at = now
+        UserChangeModel.objects.bulk_update(changes, ('sequence', 'updated_at'))
+    return len(changes)
+
+
+def get_changes(after=0, limit=None):
+    """Return the changes of the feed after position `after`, as dicts of `FEED_FIELDS`.
+
+    Positions only grow, but they have gaps where compaction deleted changes.
+    """
+    sequence_changes(wait=False)
+    queryset = UserChangeModel.objects.filter(sequence__gt=after).order_by('sequence').values(*FEED_FIELDS)
+    return list(queryset[:limit or settings.USERS_CHANGES_PAGE_SIZE])
+
+
+def wait_for_changes(after=0, limit=None, timeout=0.0, poll_interval=None):
+    """Return the changes after position `after`, waiting up to `timeout` seconds for one if there are none yet."""
+    poll_interval = poll_interval or settings.USERS_CHANGES_POLL_INTERVAL
+    deadline = time.monotonic() + timeout
+    while True:
+        changes = get_changes(after, limit)
+        remaining = deadline - time.monotonic()
+        if changes or remaining <= 0:
+            return changes
+        time.sleep(min(poll_interval, remaining))
+
+
+class TooManyWaiters(APIException):
+    """Every place of the requests waiting for changes is taken in this process."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many clients are waiting for changes, retry later.'
+    default_code = 'too_many_waiters'
+
+    def __init__(self, detail=None, code=None, wait=None):
+        """Initialize the error, asking the client to retry after `wait` seconds."""
+        super().__init__(detail, code)
+        self.wait = wait
+
+
+class ChangeWaiters:
+    """Count the requests of this process waiting for changes, up to `USERS_CHANGES_MAX_WAITERS`.
+
+    A waiting request holds a worker thread, so the requests over the limit are refused instead
+    of leaving no thread to the other requests.
+    """
+
+    def __init__(self):
+        """Initialize the counter, with no request waiting."""
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def acquire(self):
+        """Take a place, to be given back with `release`.
+
+        :raises TooManyWaiters: If every place is taken.
+        """
+        with self.lock:
+            if self.count >= settings.USERS_CHANGES_MAX_WAITERS:
+                raise TooManyWaiters(wait=math.ceil(settings.USERS_CHANGES_POLL_INTERVAL))
+            self.count += 1
+
+    def release(self):
+        """Give a place back."""
+        with self.lock:
+            self.count -= 1
+
+    @contextmanager
+    def hold(self):
+        """Hold a place while the block runs."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def hold_while_streaming(self, chunks):
+        """Hold a place until the response streaming `chunks` is closed.
+
+        :return: The chunks, to be streamed in place of `chunks`.
+        :rtype: Iterator
+        """
+        self.acquire()
+        return _ReleasingIterator(chunks, self.release)
+
+
+class _ReleasingIterator:
+    # The server closes a streamed response even if it never iterated it, unlike a generator,
+    # whose `finally` only runs once it started.
+    def __init__(self, iterable, release):
+        self.iterator = iter(iterable)
+        self.release = release
+        self.released = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.iterator)
+
+    def close(self):
+        if hasattr(self.iterator, 'close'):
+            self.iterator.close()
+        if not self.released:
+            self.released = True
+            self.release()
+
+
+change_waiters = ChangeWaiters()
+
+
+def iter_change_pages(after=0, limit=None, timeout=None, heartbeat_interval=None, poll_interval=None):
+    """Yield the pages of changes after position `after` as they are committed, for `timeout` seconds.
+
+    An empty page is yielded when no change came for `heartbeat_interval` seconds, so the
+    connection can be kept alive.
+    """
+    timeout = settings.USERS_CHANGES_STREAM_TIMEOUT if timeout is None else timeout
+    heartbeat_interval = heartbeat_interval or settings.USERS_CHANGES_HEARTBEAT_INTERVAL
+    deadline = time.monotonic() + timeout
+    while (remaining := deadline - time.monotonic()) > 0:
+        changes = wait_for_changes(after, limit, min(heartbeat_interval, remaining), poll_interval)
+        if changes:
+            after = changes[-1]['sequence']
+        yield changes
+
+
+class ChangeRelay:
+    """Append the changes of the feed to a Redis stream, in batches and in the order of the feed.
+
+    A change is appended with the stream ID `<sequence>-0`, so its stream ID is its position in
+    the feed, and Redis rejects a change that was already appended by a relay that stopped before
+    recording it: every change reaches the stream once. Relays take turns, so several of them
+    can run. The stream is trimmed to about `maxlen` entries.
+    """
+
+    def __init__(self, client=None, stream=None, batch_size=None, maxlen=None):
+        """Initialize the relay, falling back to the `USERS_CHANGES_*` settings."""
+        self.client = client or Redis.from_url(settings.USERS_CHANGES_REDIS_URL)
+        self.stream = stream or settings.USERS_CHANGES_REDIS_STREAM
+        self.batch_size = batch_size or settings.USERS_CHANGES_RELAY_BATCH_SIZE
+        self.maxlen = maxlen or settings.USERS_CHANGES_REDIS_MAXLEN
+
+    def run_once(self):
+        """Assign positions to the pending changes and append a batch of them to the stream.
+
+        :return: The number of relayed changes.
+        :rtype: int
+        """
+        sequence_changes()
+        with transaction.atomic():
+            if not _lock(RELAY_LOCK_ID, wait=False):
+                return 0
+            changes = list(
+                UserChangeModel.objects.filter(sequence__isnull=False, relayed_at__isnull=True)
+                .order_by('sequence').values(*FEED_FIELDS)[:self.batch_size]
+            )
+            if changes:
+                self.append(changes)
+                now = timezone.now()
+                UserChangeModel.objects.filter(sequence__in=[change['sequence'] for change in changes]).update(
+                    relayed_at=now, updated_at=now
+                )
+        return len(changes)
+
+    def append(self, changes):
+        """Append `changes` to the stream in one round trip, skipping those it already holds."""
+        pipeline = self.client.pipeline(transaction=False)
+        for change in changes:
+            pipeline.xadd(
+                self.stream,
+                {
+                    'kind': change['kind'],
+                    'action': change['action'],
+                    'object_id': change['object_id'],
+                    'data': encode_json(change['data']),
+                    'created_at': change['created_at'].isoformat(),
+                },
+                id=f'{change["sequence"]}-0',
+                maxlen=self.maxlen,
+            )
+        for result in pipeline.execute(raise_on_error=False):
+            if isinstance(result, ResponseError) and DUPLICATE_ID_ERROR not in str(result):
+                raise result
+
+
+def compact_changes(compact_after=None, retention=None, batch_size=1000):
+    """Delete the changes that no consumer needs to rebuild the current state of the users and profiles.
+
+    Those are the changes older than `compact_after` seconds that a later change of the same
+    object supersedes, and the deletions older than `retention` seconds. A consumer that read the
+    feed less than `compact_after` seconds ago still sees every change, the others see the latest
+    state of every object. Changes are kept until they are relayed when a relay is configured.
+
+    The last change of the feed is always kept: the next positions follow it, and deleting it
+    would give its position to the next change, which the consumers that read it would skip.
+
+    :return: The number of deleted changes.
+    :rtype: int
+    """
+    compact_after = settings.USERS_CHANGES_COMPACT_AFTER if compact_after is None else compact_after
+    retention = settings.USERS_CHANGES_RETENTION if retention is None else retention
+    now = timezone.now()
+
+    last = UserChangeModel.objects.aggregate(last=Max('sequence'))['last']
+    changes = UserChangeModel.objects.filter(sequence__isnull=False).exclude(sequence=last)
+    if settings.USERS_CHANGES_REDIS_URL:
+        changes = changes.filter(relayed_at__isnull=False)
+    later = UserChangeModel.objects.filter(
+        kind=OuterRef('kind'), object_id=OuterRef('object_id'), sequence__gt=OuterRef('sequence')
+    )
+    superseded = changes.filter(Exists(later), created_at__lt=now - timedelta(seconds=compact_after))
+    expired = changes.filter(action=UserChangeModel.Action.DELETED, created_at__lt=now - timedelta(seconds=retention))
+    return _delete_in_batches(superseded, batch_size) + _delete_in_batches(expired, batch_size)
+
+
+def _delete_in_batches(queryset, batch_size):
+    deleted = 0
+    while pks := list(queryset.values_list('pk', flat=True)[:batch_size]):
+        deleted += UserChangeModel.objects.filter(pk__in=pks).delete()[0]
+    return deleted
+
+
+def _lock(key, wait):
+    # Other databases than PostgreSQL run one writing transaction at a time anyway.
+    if connection.vendor != 'postgresql':
+        return True
+    with connection.cursor() as cursor:
+        if wait:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [key])
+            return True
+        cursor.execute('SELECT pg_try_advisory_xact_lock(%s)', [key])
+        return cursor.fetchone()[0]
@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.filters import BaseFilterBackend
+
+from .serializers import UserFilterSerializer
+
+SEARCH_FIELDS = ('email', 'first_name', 'last_name')
+
+
+class UserFilterBackend(BaseFilterBackend):
+    """Filter the users list by the query parameters validated with `UserFilterSerializer`.
+
+    - `is_active`: Only active (`true`) or inactive (`false`) users.
+    - `created_after`, `created_before`: An inclusive range of creation datetimes.
+    - `city`: The exact city of the profile.
+    - `age_min`, `age_max`: An inclusive range of profile ages.
+    - `q`: Whitespace-separated terms that must each be contained in the email, first or last name.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        """Return the queryset narrowed down by the filters of the request.
+
+        :param request: The incoming request.
+        :type request: Request
+        :param queryset: The users queryset.
+        :type queryset: QuerySet
+        :param view: The view listing the users.
+        :type view: APIView
+        :return: The filtered queryset.
+        :rtype: QuerySet
+        :raises ValidationError: If a filter value is invalid.
+        """
+        serializer = UserFilterSerializer(data=request.query_params.dict())
+        serializer.is_valid(raise_exception=True)
+        filters = serializer.validated_data
+
+        lookups = {
+            'is_active': 'is_active',
+            'created_after': 'created_at__gte',
+            'created_before': 'created_at__lte',
+            'city': 'profile__city',
+            'age_min': 'profile__age__gte',
+            'age_max': 'profile__age__lte',
+        }
+        queryset = queryset.filter(**{lookup: filters[name] for name, lookup in lookups.items() if name in filters})
+        return queryset.filter(build_search_filter(filters.get('q', '')))
+
+
+def build_search_filter(query):
+    """Return the condition matching users whose email or names contain every term of `query`.
+
+    `icontains` compiles to `UPPER(column) LIKE UPPER('%term%')` on PostgreSQL, which the trigram
+    indexes created by the users migrations can serve. Other databases scan the table.
+
+    :param query: The search query.
+    :type query: str
+    :return: The search condition, empty for a blank query.
+    :rtype: Q
+    """
+    condition = Q()
+    for term in query.split()[:settings.USERS_SEARCH_MAX_TERMS]:
+        term_condition = Q()
+        for field in SEARCH_FIELDS:
+            term_condition |= Q(**{f'{field}__icontains': term})
+        condition &= term_condition
+    return condition
@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient
+
+from apps.users.models import ProfileModel
+
+
+class Command(BaseCommand):
+    """Compare the throughput of the sync and async users views on the same ASGI handler."""
+
+    help = (
+        'Drive the sync DRF users views and their async counterparts through the ASGI request handler '
+        'with concurrent requests, and report requests/sec for each. Runs against the configured database.'
+    )
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint.')
+        parser.add_argument('--concurrency', type=int, default=20, help='Concurrent in-flight requests.')
+
+    def handle(self, *args, **options):
+        """Run every endpoint pair and print the throughput of both variants."""
+        profile = ProfileModel.objects.only('pk', 'user_id').first()
+        if profile is None:
+            raise CommandError('No users with a profile to benchmark, seed the database first.')
+
+        endpoints = (
+            ('list', '/users', '/users/async'),
+            ('retrieve', f'/users/{profile.user_id}', f'/users/async/{profile.user_id}'),
+            ('profile', f'/users/{profile.pk}/profile', f'/users/async/{profile.pk}/profile'),
+        )
+        for name, sync_url, async_url in endpoints:
+            sync_rate = asyncio.run(self._run(sync_url, options['requests'], options['concurrency']))
+            async_rate = asyncio.run(self._run(async_url, options['requests'], options['concurrency']))
+            self.stdout.write(
+                f'{name:<9} sync {sync_rate:9.1f} req/s   async {async_rate:9.1f} req/s   '
+                f'x{async_rate / sync_rate:.2f}'
+            )
+
+    async def _run(self, url, total, concurrency):
+        client = AsyncClient()
+        remaining = total
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                response = await client.get(url)
+                if response.status_code != 200:
+                    raise CommandError(f'GET {url} returned {response.status_code}')
+
+        await client.get(url)
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - started)
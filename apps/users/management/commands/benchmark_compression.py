@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory
+
+from apps.users.models import ProfileModel, UserModel
+from apps.users.views import UsersListCreateView
+from core.middleware.compression import compress
+
+
+class Command(BaseCommand):
+    """Compare the size and the time to first byte of users list pages sent with each content coding."""
+
+    help = 'Report compressed sizes, compression times and transfer times of users list pages.'
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument(
+            '--query', action='append', dest='queries', help='Query string of a page, can be repeated.'
+        )
+        parser.add_argument('--bandwidths', default='1,10,100', help='Comma-separated link speeds in Mbit/s.')
+        parser.add_argument('--repeat', type=int, default=50, help='Compressions timed for each coding.')
+
+    def handle(self, *args, **options):
+        """Render every page once and print one result line for each content coding."""
+        bandwidths = [float(value) for value in options['bandwidths'].split(',')]
+        view = UsersListCreateView.as_view()
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['*']):
+            self._create_users(20)
+            for query in options['queries'] or ('size=20', 'size=20&fields=id,email'):
+                response = view(APIRequestFactory().get(f'/users?{query}'))
+                content = response.render().content
+                self.stdout.write(f'/users?{query}')
+                for encoding in ('identity', 'gzip', 'br'):
+                    self._report(content, encoding, bandwidths, options['repeat'])
+            transaction.set_rollback(True)
+
+    def _report(self, content, encoding, bandwidths, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            body = content if encoding == 'identity' else compress(content, encoding)
+        elapsed = (time.perf_counter() - started) / repeat
+        transfers = ' '.join(
+            f'{bandwidth:g}Mbit/s {(elapsed + len(body) * 8 / (bandwidth * 1e6)) * 1e3:7.2f} ms'
+            for bandwidth in bandwidths
+        )
+        self.stdout.write(
+            f'  {encoding:<8} {len(body):8d} bytes ({len(body) / len(content):6.1%}) '
+            f'compress {elapsed * 1e6:8.1f} us  {transfers}'
+        )
+
+    @staticmethod
+    def _create_users(count):
+        missing = count - UserModel.objects.count()
+        if missing <= 0:
+            return
+        users = UserModel.objects.bulk_create(
+            UserModel(email=f'compression-benchmark-{index}@example.com', first_name='Bench', last_name=f'User{index}')
+            for index in range(missing)
+        )
+        ProfileModel.objects.bulk_create(
+            ProfileModel(city='Kyiv', phone='380000000', age=20 + index % 50, user=user)
+            for index, user in enumerate(users)
+        )
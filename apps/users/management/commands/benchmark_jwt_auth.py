@@ -0,0 +1,79 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from apps.users.authentication import ClaimsJWTAuthentication
+from apps.users.models import UserModel
+from apps.users.tokens import ClaimsRefreshToken
+
+AUTHENTICATION_CLASSES = {
+    'jwt': JWTAuthentication,
+    'claims': ClaimsJWTAuthentication,
+}
+
+
+class Command(BaseCommand):
+    """Compare the throughput of an authenticated endpoint with each JWT authentication class."""
+
+    help = 'Report requests per second and queries per request of the DB-backed and the claims-based JWT auth.'
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('--duration', type=float, default=3.0, help='Seconds to run each authentication class.')
+        parser.add_argument('--email', default='jwt-benchmark@example.com', help='Email of the benchmark user.')
+
+    def handle(self, *args, **options):
+        """Run every authentication class and print one result line for each."""
+        user, created = UserModel.objects.get_or_create(email=options['email'])
+        try:
+            token = str(ClaimsRefreshToken.for_user(user).access_token)
+            factory = APIRequestFactory()
+            for name, authentication_class in AUTHENTICATION_CLASSES.items():
+                view = self._build_view(authentication_class)
+                # The benchmark runs in one process, so its cache is shared by every request.
+                with override_settings(AUTH_CLAIMS_ENABLED=True):
+                    count, elapsed, queries = self._run(view, factory, token, options['duration'])
+                self.stdout.write(
+                    f'{name:<7} {count / elapsed:10.1f} requests/s {elapsed / count * 1e6:8.1f} us/request '
+                    f'{queries / count:5.2f} queries/request'
+                )
+        finally:
+            if created:
+                user.delete()
+
+    @staticmethod
+    def _build_view(authentication_class):
+        class BenchmarkView(APIView):
+            authentication_classes = (authentication_class,)
+            permission_classes = (IsAuthenticated,)
+
+            def get(self, request):
+                return Response({'id': request.user.pk, 'is_staff': request.user.is_staff})
+
+        return BenchmarkView.as_view()
+
+    @staticmethod
+    def _run(view, factory, token, duration):
+        count = 0
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_query):
+            while time.perf_counter() < deadline:
+                request = factory.get('/benchmark', HTTP_AUTHORIZATION=f'Bearer {token}')
+                response = view(request)
+                response.render()
+                count += 1
+        return count, time.perf_counter() - started, len(queries)
@@ -0,0 +1,130 @@
+import logging
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from core.logging.filters import RequestIDFilter, SamplingFilter
+from core.logging.formatters import JSONFormatter
+from core.logging.handlers import BackgroundQueueHandler
+
+PIPELINES = ('none', 'file', 'queue')
+
+
+class SlowStream:
+    """File stream whose writes take at least `latency` seconds, like a saturated or network disk."""
+
+    def __init__(self, stream, latency):
+        """Wrap `stream`."""
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, text):
+        """Write `text` after the simulated latency."""
+        time.sleep(self.latency)
+        return self.stream.write(text)
+
+    def __getattr__(self, name):
+        """Delegate everything else to the wrapped stream."""
+        return getattr(self.stream, name)
+
+
+class Command(BaseCommand):
+    """Compare the cost of logging on the request path for each logging pipeline."""
+
+    help = 'Report the per-record and per-request logging overhead of the synchronous and the queued pipelines.'
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('--pipelines', default=','.join(PIPELINES), help='Comma-separated pipelines to run.')
+        parser.add_argument('--records', type=int, default=20000, help='Records logged by each run.')
+        parser.add_argument('--threads', type=int, default=4, help='Threads logging concurrently.')
+        parser.add_argument('--requests', type=int, default=1000, help='Requests served by each run.')
+        parser.add_argument('--path', default='/health_check/live', help='Path requested by the request benchmark.')
+        parser.add_argument(
+            '--disk-latency-ms', type=float, default=0, help='Simulated latency of every write to the log file.'
+        )
+
+    def handle(self, *args, **options):
+        """Run every pipeline and print one result line for each benchmark."""
+        logger = logging.getLogger('core')
+        original_handlers, original_level = logger.handlers[:], logger.level
+        logger.setLevel(logging.INFO)
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                for name in options['pipelines'].split(','):
+                    handler = self._build_handler(
+                        name, os.path.join(directory, f'{name}.log'), options['disk_latency_ms'] / 1000
+                    )
+                    logger.handlers = [handler] if handler else []
+                    try:
+                        self._run(name, handler, logger, options)
+                    finally:
+                        if handler:
+                            handler.close()
+        finally:
+            logger.handlers = original_handlers
+            logger.setLevel(original_level)
+
+    def _run(self, name, handler, logger, options):
+        latencies = self._log_records(logger, options['records'], options['threads'])
+        drain_started = time.perf_counter()
+        if handler:
+            handler.flush()
+        drain = time.perf_counter() - drain_started
+        latencies.sort()
+        self.stdout.write(
+            f'{name:<6} records={len(latencies):<7} threads={options["threads"]:<3} '
+            f'mean={statistics.fmean(latencies) * 1e6:8.2f}us '
+            f'p99={latencies[int(len(latencies) * 0.99)] * 1e6:8.2f}us drain={drain * 1000:8.1f}ms'
+        )
+
+        client = Client()
+        started = time.perf_counter()
+        for _ in range(options['requests']):
+            client.get(options['path'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{name:<6} requests={options["requests"]:<6} {options["path"]} '
+            f'{elapsed / options["requests"] * 1000:8.3f} ms/request'
+        )
+
+    @staticmethod
+    def _build_handler(name, filename, disk_latency):
+        if name == 'none':
+            return None
+        if name == 'file':
+            handler = logging.FileHandler(filename)
+            handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+            if disk_latency:
+                handler.stream = SlowStream(handler.stream, disk_latency)
+            return handler
+        handler = BackgroundQueueHandler(
+            filename, settings.LOG_MAX_BYTES, settings.LOG_BACKUP_COUNT, settings.LOG_ROTATE_INTERVAL,
+            settings.LOG_QUEUE_SIZE, settings.LOG_BATCH_SIZE,
+        )
+        if disk_latency:
+            handler.target.stream = SlowStream(handler.target._open(), disk_latency)
+        handler.setFormatter(JSONFormatter())
+        handler.addFilter(SamplingFilter(settings.LOG_INFO_SAMPLE_RATE))
+        handler.addFilter(RequestIDFilter())
+        return handler
+
+    @staticmethod
+    def _log_records(logger, records, threads):
+        def work(count):
+            latencies = []
+            for index in range(count):
+                started = time.perf_counter()
+                logger.info('Benchmark record %s', index, extra={'benchmark': True})
+                latencies.append(time.perf_counter() - started)
+            return latencies
+
+        with ThreadPoolExecutor(threads) as executor:
+            results = executor.map(work, [records // threads] * threads)
+        return [latency for result in results for latency in result]
@@ -0,0 +1,73 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.utils.module_loading import import_string
+
+COST_SETTINGS = {
+    'pbkdf2': 'PASSWORD_PBKDF2_ITERATIONS',
+    'argon2': 'PASSWORD_ARGON2_TIME_COST',
+    'bcrypt': 'PASSWORD_BCRYPT_ROUNDS',
+}
+
+
+class Command(BaseCommand):
+    """Report the password hashing throughput of each hasher and cost configuration."""
+
+    help = 'Report password hashes per second, in total and per core, for each hasher configuration.'
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('--hashers', default=','.join(COST_SETTINGS), help='Comma-separated hashers to run.')
+        parser.add_argument('--pbkdf2-iterations', default=None, help='Comma-separated iteration counts.')
+        parser.add_argument('--argon2-time-cost', default=None, help='Comma-separated Argon2 time costs.')
+        parser.add_argument('--bcrypt-rounds', default=None, help='Comma-separated bcrypt work factors.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Parallel hashing threads.')
+        parser.add_argument('--duration', type=float, default=3.0, help='Seconds to run each configuration.')
+
+    def handle(self, *args, **options):
+        """Run every configuration and print one result line for each."""
+        costs = {
+            'pbkdf2': options['pbkdf2_iterations'],
+            'argon2': options['argon2_time_cost'],
+            'bcrypt': options['bcrypt_rounds'],
+        }
+        cores = min(options['workers'], os.cpu_count() or 1)
+        for name in options['hashers'].split(','):
+            setting = COST_SETTINGS[name]
+            values = costs[name].split(',') if costs[name] else [getattr(settings, setting)]
+            for value in values:
+                with override_settings(**{setting: int(value)}):
+                    hasher = import_string(settings.PASSWORD_HASHER_CLASSES[name])()
+                    try:
+                        if hasher.library:
+                            hasher._load_library()
+                    except ValueError as exc:
+                        self.stderr.write(f'{name}: skipped, {exc}')
+                        break
+                    count, elapsed = self._run(hasher, options['workers'], options['duration'])
+
+                rate = count / elapsed
+                self.stdout.write(
+                    f'{name:<7} {setting}={value:<8} workers={options["workers"]:<3} '
+                    f'{rate:10.1f} hashes/s {rate / cores:10.1f} hashes/s/core '
+                    f'{options["workers"] / rate * 1000:8.1f} ms/hash'
+                )
+
+    def _run(self, hasher, workers, duration):
+        deadline = time.perf_counter() + duration
+
+        def work():
+            done = 0
+            while time.perf_counter() < deadline:
+                hasher.encode('benchmark-password', hasher.salt())
+                done += 1
+            return done
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(workers) as executor:
+            count = sum(executor.map(lambda _: work(), range(workers)))
+        return count, time.perf_counter() - started
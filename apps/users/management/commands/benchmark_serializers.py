@@ -0,0 +1,77 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from apps.users.models import ProfileModel, UserModel
+from apps.users.serializers import UserAccountSerializer
+from core.renderers.fast_json import FastJSONRenderer
+from core.serializers.compiled import compile_serializer
+
+ORDERING = ('-created_at', '-id')
+
+
+class Command(BaseCommand):
+    """Compare the DRF serializer path of the users list with the compiled `values_list()` path."""
+
+    help = 'Report fetch, serialize and render times per page of the DRF and the compiled users serialization.'
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('--rows', default='20,100,1000', help='Comma-separated page sizes.')
+        parser.add_argument('--repeat', type=int, default=20, help='Pages rendered for each path and size.')
+
+    def handle(self, *args, **options):
+        """Render pages of every size with both paths and print one result line for each."""
+        sizes = [int(size) for size in options['rows'].split(',')]
+        with transaction.atomic():
+            self._create_users(max(sizes))
+            for size in sizes:
+                baseline = None
+                for name, run in (('drf', self._run_drf), ('compiled', self._run_compiled)):
+                    runs = [run(size) for _ in range(options['repeat'])]
+                    timings = [sum(values) / len(runs) for values in zip(*runs)]
+                    total = sum(timings)
+                    baseline = baseline or total
+                    fetch, serialize, render = (timing * 1e3 for timing in timings)
+                    self.stdout.write(
+                        f'{name:<9} rows={size:<5} fetch {fetch:8.2f} ms serialize {serialize:8.2f} ms '
+                        f'render {render:8.2f} ms total {total * 1e3:8.2f} ms x{baseline / total:.1f}'
+                    )
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def _create_users(count):
+        missing = count - UserModel.objects.count()
+        if missing <= 0:
+            return
+        users = UserModel.objects.bulk_create(
+            UserModel(email=f'serializer-benchmark-{index}@example.com', first_name='Bench', last_name=f'User{index}')
+            for index in range(missing)
+        )
+        ProfileModel.objects.bulk_create(
+            ProfileModel(city='Kyiv', phone='380000000', age=20 + index % 50, user=user)
+            for index, user in enumerate(users)
+        )
+
+    @staticmethod
+    def _run_drf(size):
+        started = time.perf_counter()
+        users = list(UserModel.objects.for_serializer(UserAccountSerializer).order_by(*ORDERING)[:size])
+        fetched = time.perf_counter()
+        data = UserAccountSerializer(users, many=True).data
+        serialized = time.perf_counter()
+        JSONRenderer().render(data)
+        return fetched - started, serialized - fetched, time.perf_counter() - serialized
+
+    @staticmethod
+    def _run_compiled(size):
+        started = time.perf_counter()
+        serializer = compile_serializer(UserAccountSerializer())
+        rows = list(serializer.values_list(UserModel.objects.order_by(*ORDERING))[:size])
+        fetched = time.perf_counter()
+        data = serializer.render_many(rows)
+        serialized = time.perf_counter()
+        FastJSONRenderer().render(data)
+        return fetched - started, serialized - fetched, time.perf_counter() - serialized
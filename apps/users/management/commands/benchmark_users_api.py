@@ -0,0 +1,187 @@
+import itertools
+import json
+import os
+import shutil
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.models import UserModel
+from apps.users.seeding import SEED_PASSWORD, get_seeded_users, seed_users
+from apps.users.tokens import ClaimsRefreshToken
+from core.benchmarks.baseline import find_regressions, load_baseline, median_summary, save_baseline
+from core.benchmarks.load import SERVER_COMMANDS, SERVER_ENV, ServerStartError, local_server, run_load
+
+SCENARIOS = ('list', 'retrieve', 'create', 'profile_update', 'login')
+CREATED_EMAIL_DOMAIN = 'load.example.com'
+# Users and profiles the retrieve, update and login requests go through in turn.
+SAMPLE_SIZE = 1000
+
+
+class Command(BaseCommand):
+    """Load the users API through a local server and compare the results with a stored baseline."""
+
+    help = (
+        'Seed the database with users, load the list, retrieve, create, profile update and JWT login endpoints, '
+        'report requests/sec, latency percentiles and queries per request, and fail on regressions from the '
+        'baseline of the same number of users.'
+    )
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('--users', type=int, default=10000, help='Seeded users, e.g. 10000, 100000 or 1000000.')
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated scenarios to run.')
+        parser.add_argument('--server', choices=SERVER_COMMANDS, default='gunicorn', help='Local server to start.')
+        parser.add_argument('--url', help='Base URL of a running server to load instead of starting one.')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent connections.')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run each scenario.')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs of each scenario, the median is reported.')
+        parser.add_argument(
+            '--baseline', default=str(settings.BASE_DIR / 'benchmarks' / 'users_api.json'),
+            help='JSON file holding the baselines, by number of users.'
+        )
+        parser.add_argument('--update-baseline', action='store_true', help='Store the results as the baseline.')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2, help='Allowed relative change of the p50 latency and req/s.'
+        )
+        parser.add_argument(
+            '--tail-tolerance', type=float, default=0.5, help='Allowed relative change of the p95 and p99 latencies.'
+        )
+
+    def handle(self, *args, **options):
+        """Seed the users, run every scenario and compare the results with the baseline."""
+        scenarios = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}.')
+        if not options['url'] and options['server'] == 'gunicorn' and not shutil.which('gunicorn'):
+            raise CommandError('gunicorn is not installed.')
+
+        started = time.perf_counter()
+        created = seed_users(options['users'], workers=os.cpu_count() or 1)
+        self.stdout.write(f'Seeded {created} users in {time.perf_counter() - started:.1f} s')
+
+        # Inactive users cannot log in.
+        samples = list(
+            get_seeded_users().filter(is_active=True).values_list('pk', 'profile__id', 'email')[:SAMPLE_SIZE]
+        )
+        if not samples:
+            raise CommandError('No users to benchmark.')
+        try:
+            # Profiles are only updated by their user or by staff users.
+            staff = UserModel.objects.create_user(
+                f'staff-{int(time.time())}@{CREATED_EMAIL_DOMAIN}', 'load-password', is_staff=True
+            )
+            headers = {
+                'profile_update': {'Authorization': f'Bearer {ClaimsRefreshToken.for_user(staff).access_token}'},
+            }
+            results = self._run(scenarios, samples, headers, options)
+        finally:
+            UserModel.objects.filter(email__endswith=f'@{CREATED_EMAIL_DOMAIN}').delete()
+
+        self._compare(results, options)
+
+    def _run(self, scenarios, samples, headers, options):
+        builders = self._get_request_builders(samples)
+        results = {}
+        try:
+            with self._server(options) as base_url:
+                for name in scenarios:
+                    summaries = [
+                        run_load(
+                            base_url, concurrency=options['concurrency'], duration=options['duration'],
+                            headers={'Content-Type': 'application/json', **headers.get(name, {})},
+                            make_request=builders[name],
+                        ).summary()
+                        for _ in range(options['repeat'])
+                    ]
+                    results[name] = median_summary(summaries)
+                    self._report(name, results[name])
+        except ServerStartError as exc:
+            raise CommandError(str(exc)) from exc
+        return results
+
+    def _server(self, options):
+        if options['url']:
+            return nullcontext(options['url'].rstrip('/'))
+        return local_server(SERVER_COMMANDS[options['server']], settings.BASE_DIR, SERVER_ENV)
+
+    @staticmethod
+    def _get_request_builders(samples):
+        run_id = int(time.time())
+        # The request numbers start over on every run, the emails must not.
+        email_numbers = itertools.count()
+
+        def body(data):
+            return json.dumps(data).encode()
+
+        def create(number):
+            return 'POST', '/users', body(
+                {
+                    'email': f'user-{run_id}-{next(email_numbers)}@{CREATED_EMAIL_DOMAIN}', 'password': 'load-password',
+                    'profile': {'city': 'Kyiv', 'phone': '380000000', 'age': 30},
+                }
+            )
+
+        def sample(number):
+            return samples[number % len(samples)]
+
+        return {
+            'list': lambda number: ('GET', '/users?size=20', None),
+            'retrieve': lambda number: ('GET', f'/users/{sample(number)[0]}', None),
+            'create': create,
+            'profile_update': lambda number: (
+                'PATCH', f'/users/{sample(number)[1]}/profile', body({'age': 18 + number % 60})
+            ),
+            'login': lambda number: (
+                'POST', '/auth/jwt/create/', body({'email': sample(number)[2], 'password': SEED_PASSWORD})
+            ),
+        }
+
+    def _report(self, name, summary):
+        queries = summary['queries_per_request']
+        self.stdout.write(
+            f'{name:<15} {summary["rps"]:9.1f} req/s  p50 {summary["p50_ms"]:8.2f} ms  '
+            f'p95 {summary["p95_ms"]:8.2f} ms  p99 {summary["p99_ms"]:8.2f} ms  '
+            f'queries {"-" if queries is None else f"{queries:.2f}"}  errors {summary["errors"]}'
+        )
+
+    def _compare(self, results, options):
+        baselines = load_baseline(options['baseline'])
+        key = str(options['users'])
+        run_options = {name: options[name] for name in ('concurrency', 'duration', 'repeat')}
+
+        regressions = [
+            f'{name}: {summary["errors"]} failed requests' for name, summary in results.items() if summary['errors']
+        ]
+        if options['update_baseline']:
+            if regressions:
+                raise CommandError('Not storing a baseline with failed requests:\n  ' + '\n  '.join(regressions))
+            scenarios = {
+                name: {metric: value for metric, value in summary.items() if metric not in ('requests', 'errors')}
+                for name, summary in results.items()
+            }
+            baselines[key] = {**run_options, 'scenarios': {**baselines.get(key, {}).get('scenarios', {}), **scenarios}}
+            save_baseline(options['baseline'], baselines)
+            self.stdout.write(f'Stored the baseline of {key} users in {options["baseline"]}')
+            return
+
+        baseline = baselines.get(key)
+        if baseline is None:
+            self.stdout.write(f'No baseline for {key} users, store one with --update-baseline.')
+        else:
+            if {name: baseline.get(name) for name in run_options} != run_options:
+                self.stdout.write(
+                    f'The baseline was measured with --concurrency {baseline.get("concurrency")} --duration '
+                    f'{baseline.get("duration")} --repeat {baseline.get("repeat")}, the results may not be comparable.'
+                )
+            regressions.extend(
+                find_regressions(results, baseline['scenarios'], options['tolerance'], options['tail_tolerance'])
+            )
+
+        if regressions:
+            raise CommandError('Regressions:\n  ' + '\n  '.join(regressions))
+        self.stdout.write('No regression.')
+
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.users.changes import compact_changes
+
+
+class Command(BaseCommand):
+    """Delete the changes of users and profiles that the change feed no longer needs."""
+
+    help = (
+        'Compact the change feed: delete the changes older than --compact-after seconds that a later change of the '
+        'same object supersedes, and the deletions older than --retention seconds, in small batches.'
+    )
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument(
+            '--compact-after', type=int, default=settings.USERS_CHANGES_COMPACT_AFTER,
+            help='Age in seconds after which superseded changes are deleted.'
+        )
+        parser.add_argument(
+            '--retention', type=int, default=settings.USERS_CHANGES_RETENTION,
+            help='Age in seconds after which deletions are deleted.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Changes deleted per transaction.')
+
+    def handle(self, *args, **options):
+        """Compact the change feed."""
+        deleted = compact_changes(options['compact_after'], options['retention'], options['batch_size'])
+        self.stdout.write(f'Deleted {deleted} changes.')
@@ -0,0 +1,47 @@
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks.load import SERVER_COMMANDS, SERVER_ENV, ServerStartError, local_server, run_load
+
+
+class Command(BaseCommand):
+    """Measure the throughput and latency of an endpoint under concurrent load."""
+
+    help = (
+        'Send concurrent keep-alive requests to an endpoint and report requests/sec and latency percentiles. '
+        'With --compare, start the development server and gunicorn locally and load both the same way.'
+    )
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('target', nargs='?', default='/users', help='URL, or path when used with --compare.')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent connections.')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run each load.')
+        parser.add_argument('--compare', action='store_true', help='Compare runserver with gunicorn.')
+
+    def handle(self, *args, **options):
+        """Run the load against the target, or against every local server with --compare."""
+        if not options['compare']:
+            self._report(options['target'], self._load(options['target'], options))
+            return
+
+        if not shutil.which('gunicorn'):
+            raise CommandError('gunicorn is not installed.')
+        for name, command in SERVER_COMMANDS.items():
+            try:
+                with local_server(command, settings.BASE_DIR, SERVER_ENV) as base_url:
+                    self._report(name, self._load(f'{base_url}{options["target"]}', options))
+            except ServerStartError as exc:
+                raise CommandError(str(exc)) from exc
+
+    def _load(self, url, options):
+        return run_load(url, concurrency=options['concurrency'], duration=options['duration'])
+
+    def _report(self, name, result):
+        summary = result.summary()
+        self.stdout.write(
+            f'{name:<10} {summary["rps"]:9.1f} req/s  p50 {summary["p50_ms"]:8.2f} ms  '
+            f'p95 {summary["p95_ms"]:8.2f} ms  p99 {summary["p99_ms"]:8.2f} ms  errors {summary["errors"]}'
+        )
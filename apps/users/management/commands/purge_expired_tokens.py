@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    """Delete the expired outstanding tokens and their blacklist entries in small batches."""
+
+    help = (
+        'Purge expired outstanding and blacklisted tokens in primary key windows, one short transaction '
+        'per window, instead of one long DELETE locking the whole table.'
+    )
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.TOKEN_PURGE_BATCH_SIZE, help='Primary keys per window.'
+        )
+        parser.add_argument('--sleep', type=float, default=0, help='Seconds to pause between windows.')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the expired tokens.')
+
+    def handle(self, *args, **options):
+        """Purge the tokens that expired before now, window by window."""
+        now = timezone.now()
+        expired = OutstandingToken.objects.filter(expires_at__lte=now)
+        bounds = expired.aggregate(first=Min('id'), last=Max('id'))
+        if bounds['first'] is None:
+            self.stdout.write('No expired tokens.')
+            return
+
+        if options['dry_run']:
+            self.stdout.write(f'{expired.count()} expired tokens between ids {bounds["first"]} and {bounds["last"]}.')
+            return
+
+        purged = blacklisted = 0
+        started = time.perf_counter()
+        for start in range(bounds['first'], bounds['last'] + 1, options['batch_size']):
+            window = {'id__gte': start, 'id__lt': start + options['batch_size'], 'expires_at__lte': now}
+            with transaction.atomic():
+                ids = list(OutstandingToken.objects.filter(**window).values_list('id', flat=True))
+                if not ids:
+                    continue
+                blacklisted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                purged += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(
+            f'Purged {purged} expired tokens and {blacklisted} blacklist entries '
+            f'in {time.perf_counter() - started:.1f}s.'
+        )
@@ -0,0 +1,58 @@
+import logging
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from redis import RedisError
+
+from apps.users.changes import ChangeRelay
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Append the changes of users and profiles to a Redis stream until stopped."""
+
+    help = (
+        'Relay the change feed of users and profiles to the USERS_CHANGES_REDIS_STREAM Redis stream in batches, '
+        'in the order of the feed, with the position of every change as its stream ID.'
+    )
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('--once', action='store_true', help='Relay the pending changes once and exit.')
+        parser.add_argument('--batch-size', type=int, default=None, help='Changes appended per round trip.')
+        parser.add_argument(
+            '--interval', type=float, default=settings.USERS_CHANGES_RELAY_INTERVAL,
+            help='Seconds between checks for new changes.'
+        )
+
+    def handle(self, *args, **options):
+        """Relay the changes, finishing the current batch on SIGTERM or SIGINT."""
+        if not settings.USERS_CHANGES_REDIS_URL:
+            raise CommandError('USERS_CHANGES_REDIS_URL is not set.')
+        relay = ChangeRelay(batch_size=options['batch_size'])
+        if options['once']:
+            relayed = 0
+            while count := relay.run_once():
+                relayed += count
+            self.stdout.write(f'Relayed {relayed} changes.')
+            return
+
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        while not self.stopping:
+            close_old_connections()
+            try:
+                relayed = relay.run_once()
+            except RedisError as exc:
+                logger.warning('Could not relay the user changes: %s', exc)
+                relayed = 0
+            if not relayed:
+                time.sleep(options['interval'])
+
+    def _stop(self, *args):
+        self.stopping = True
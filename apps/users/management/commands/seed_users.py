@@ -0,0 +1,52 @@
+import os
+import time
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.seeding import SEED_PASSWORD, UserSeeder
+from core.hashing.pool import get_hashing_pool
+
+
+class Command(BaseCommand):
+    """Fill the users and profiles tables with generated data, to reproduce production volumes."""
+
+    help = (
+        'Insert COUNT users with their profiles, generated from --seed, with COPY on PostgreSQL. Chunks are '
+        'inserted in parallel processes, each in its own transaction, and the chunks inserted by a previous run '
+        'are skipped, so an interrupted run can be resumed by running the command again.'
+    )
+
+    def add_arguments(self, parser):
+        """Add the command arguments."""
+        parser.add_argument('count', type=int, help='Number of seeded users to reach, e.g. 1000000.')
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Users inserted per transaction.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Processes inserting chunks.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the generated data.')
+        parser.add_argument(
+            '--until', type=datetime.fromisoformat,
+            help='Most recent creation date, as YYYY-MM-DD, the current day by default. Set it for reproducible data.'
+        )
+        parser.add_argument('--days', type=int, default=3 * 365, help='Days over which the users were created.')
+        parser.add_argument('--password', default=SEED_PASSWORD, help='Password of every seeded user.')
+
+    def handle(self, *args, **options):
+        """Insert the missing chunks and report the progress after each of them."""
+        if options['count'] < 0 or options['chunk_size'] < 1 or options['workers'] < 1:
+            raise CommandError('COUNT must be positive, --chunk-size and --workers at least 1.')
+
+        until = options['until']
+        if until is not None and until.tzinfo is None:
+            until = until.replace(tzinfo=timezone.utc)
+        seeder = UserSeeder(
+            seed=options['seed'], until=until, days=options['days'],
+            password_hash=get_hashing_pool().hash(options['password']),
+        )
+
+        started = time.perf_counter()
+        created = 0
+        for chunk_created in seeder.seed_users(options['count'], options['chunk_size'], options['workers']):
+            created += chunk_created
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'Created {created} users, {created / elapsed:.0f} users/s')
+        self.stdout.write(self.style.SUCCESS(f'Created {created} users in {time.perf_counter() - started:.1f} s'))
@@ -1,7 +1,71 @@
 from django.contrib.auth.base_user import BaseUserManager
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework.serializers import BaseSerializer
 
+from core.hashing.pool import get_hashing_pool
 
-class UserManager(BaseUserManager):
+
+class UserQuerySet(models.QuerySet):
+    """Custom queryset for user accounts."""
+
+    def for_serializer(self, serializer, extra_fields=()):
+        """Return the queryset joined and pruned for the fields rendered by `serializer`.
+
+        Nested serializers on forward or reverse one-to-one relations are loaded with
+        `select_related`, and only the columns that are actually rendered are selected, plus
+        `extra_fields`. Column pruning is skipped when a rendered field is not backed by a
+        model column.
+        """
+        if isinstance(serializer, type):
+            serializer = serializer()
+
+        related, columns = collect_serializer_columns(serializer, self.model)
+        queryset = self.select_related(*related) if related else self
+        if columns is not None:
+            queryset = queryset.only(*columns, *extra_fields)
+        return queryset
+
+
+def collect_serializer_columns(serializer, model, prefix=''):
+    """Return the relations to join and the columns to load for rendering `serializer`.
+
+    The columns are `None` when they cannot be determined from the serializer fields.
+    """
+    related = []
+    columns = [f'{prefix}{model._meta.pk.name}']
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+
+        source = field.source
+        if source == '*' or '.' in source:
+            return related, None
+
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            return related, None
+
+        if isinstance(field, BaseSerializer):
+            if getattr(field, 'many', False) or not model_field.one_to_one:
+                return related, None
+            related.append(f'{prefix}{source}')
+            nested_related, nested_columns = collect_serializer_columns(
+                field, model_field.related_model, f'{prefix}{source}__'
+            )
+            related.extend(nested_related)
+            if nested_columns is None:
+                return related, None
+            columns.extend(nested_columns)
+        elif model_field.concrete:
+            columns.append(f'{prefix}{model_field.name}')
+        else:
+            return related, None
+    return related, columns
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     """Custom user manager for creating and managing user accounts."""
 
     def create_user(self, email, password, **extra_kwargs):
@@ -15,6 +79,17 @@ class UserManager(BaseUserManager):
         user.save()
         return user
 
+    async def acreate_user(self, email, password, **extra_kwargs):
+        """Create and save a regular user, hashing the password on the hashing pool."""
+        if not email:
+            raise ValueError('The email must be set')
+
+        email = self.normalize_email(email)
+        user = self.model(email=email, **extra_kwargs)
+        user.password = await get_hashing_pool().ahash(password)
+        await user.asave(using=self._db)
+        return user
+
     def create_superuser(self, email, password, **extra_kwargs):
         """Create and saves a superuser with the given email and password."""
         extra_kwargs.setdefault('is_staff', True)
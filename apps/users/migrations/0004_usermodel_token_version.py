@@ -0,0 +1,18 @@
+# Generated by Django 4.2.5 on 2026-10-18 11:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_alter_usermodel_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usermodel',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.5 on 2026-10-18 11:19
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+import core.db.operations
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('users', '0004_usermodel_token_version'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='usermodel',
+            options={'ordering': ('-created_at', '-id')},
+        ),
+        core.db.operations.AddIndexConcurrently(
+            model_name='profilemodel',
+            index=models.Index(fields=['city', 'age'], name='profile_city_age_idx'),
+        ),
+        core.db.operations.AddIndexConcurrently(
+            model_name='usermodel',
+            index=models.Index(fields=['-created_at', '-id'], name='auth_users_created_idx'),
+        ),
+        core.db.operations.AddIndexConcurrently(
+            model_name='usermodel',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-id'], name='auth_users_active_created_idx'),
+        ),
+        core.db.operations.AddIndexConcurrently(
+            model_name='usermodel',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='auth_users_email_upper_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.5 on 2026-10-18 12:02
+
+from django.db import migrations
+
+import core.db.operations
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('users', '0005_user_and_profile_indexes'),
+    ]
+
+    operations = [
+        core.db.operations.AddTrigramIndexConcurrently(
+            model_name='usermodel',
+            field_name='email',
+            name='auth_users_email_trgm_idx',
+        ),
+        core.db.operations.AddTrigramIndexConcurrently(
+            model_name='usermodel',
+            field_name='first_name',
+            name='auth_users_first_name_trgm_idx',
+        ),
+        core.db.operations.AddTrigramIndexConcurrently(
+            model_name='usermodel',
+            field_name='last_name',
+            name='auth_users_last_name_trgm_idx',
+        ),
+    ]
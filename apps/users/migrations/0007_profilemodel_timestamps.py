@@ -0,0 +1,25 @@
+# Generated by Django 4.2.5 on 2026-10-18 12:41
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_user_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profilemodel',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='profilemodel',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
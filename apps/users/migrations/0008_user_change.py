@@ -0,0 +1,32 @@
+# Generated by Django 4.2.5 on 2026-10-18 12:13
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_profilemodel_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserChangeModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sequence', models.BigIntegerField(blank=True, null=True, unique=True)),
+                ('kind', models.CharField(choices=[('user', 'User'), ('profile', 'Profile')], max_length=10)),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('relayed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'user_change',
+                'indexes': [models.Index(condition=models.Q(('sequence__isnull', True)), fields=['id'], name='user_change_pending_idx'), models.Index(condition=models.Q(('relayed_at__isnull', True), ('sequence__isnull', False)), fields=['sequence'], name='user_change_unrelayed_idx'), models.Index(fields=['kind', 'object_id', 'sequence'], name='user_change_object_idx')],
+            },
+        ),
+    ]
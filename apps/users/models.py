@@ -1,5 +1,8 @@
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Upper
 
 from apps.health_check.models import TimeStampedModel
 from apps.users.managers import UserManager
@@ -10,7 +13,16 @@ class UserModel(AbstractBaseUser, PermissionsMixin, TimeStampedModel):
 
     class Meta:
         db_table = 'auth_users'
-        ordering = ('-created_at',)
+        ordering = ('-created_at', '-id')
+        indexes = (
+            # Serves the default ordering, and the keyset pagination built on it.
+            models.Index(fields=('-created_at', '-id'), name='auth_users_created_idx'),
+            models.Index(
+                fields=('-created_at', '-id'), condition=Q(is_active=True), name='auth_users_active_created_idx'
+            ),
+            # Matches `email__iexact`, which compiles to `UPPER(email) = UPPER(%s)`.
+            models.Index(Upper('email'), name='auth_users_email_upper_idx'),
+        )
 
     email = models.EmailField(unique=True)
     password = models.CharField(max_length=128)
@@ -18,20 +30,96 @@ class UserModel(AbstractBaseUser, PermissionsMixin, TimeStampedModel):
     last_name = models.CharField(max_length=255)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    token_version = models.PositiveIntegerField(default=0)
 
     USERNAME_FIELD = 'email'
+    # Changing any of these revokes the tokens issued before, as their claims no longer hold.
+    TOKEN_STATE_FIELDS = ('password', 'is_active', 'is_staff', 'is_superuser')
 
     objects = UserManager()
     REQUIRED_FIELDS = ['first_name', 'last_name']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Load a user, remembering the fields its tokens depend on."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_token_state = instance._get_token_state()
+        return instance
 
-class ProfileModel(models.Model):
+    def refresh_from_db(self, using=None, fields=None):
+        """Reload fields from the database, remembering the reloaded ones its tokens depend on.
+
+        Deferred fields are loaded through here, e.g. the password of the cached users.
+        """
+        super().refresh_from_db(using, fields)
+        loaded = getattr(self, '_loaded_token_state', {})
+        self._loaded_token_state = {**loaded, **self._get_token_state(fields)}
+
+    def save(self, *args, **kwargs):
+        """Save the user, bumping `token_version` if the fields its tokens depend on changed."""
+        loaded = getattr(self, '_loaded_token_state', {})
+        current = self._get_token_state()
+        self._token_version_changed = any(current.get(field, value) != value for field, value in loaded.items())
+        if self._token_version_changed:
+            self.token_version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'token_version'}
+        super().save(*args, **kwargs)
+        self._loaded_token_state = self._get_token_state()
+
+    def _get_token_state(self, fields=None):
+        # Deferred fields are not loaded, so they cannot have been changed either.
+        return {
+            field: self.__dict__[field] for field in self.TOKEN_STATE_FIELDS
+            if field in self.__dict__ and (fields is None or field in fields)
+        }
+
+
+class ProfileModel(TimeStampedModel):
     """Custom profile model representing user profile in the system."""
 
     class Meta:
         db_table = 'profile'
+        indexes = (models.Index(fields=('city', 'age'), name='profile_city_age_idx'),)
 
     city = models.CharField(max_length=20)
     phone = models.CharField(max_length=20)
     age = models.IntegerField()
     user = models.OneToOneField(UserModel, on_delete=models.CASCADE, related_name='profile')
+
+
+class UserChangeModel(TimeStampedModel):
+    """Change of a user or a profile, written in the transaction of the change (transactional outbox).
+
+    `sequence` is the position of the change in the change feed. It is assigned in commit order
+    once the change is committed, so a consumer that read the feed up to a position never misses
+    a change committed later. `data` holds the state of the object after the change.
+    """
+
+    class Kind(models.TextChoices):
+        USER = 'user'
+        PROFILE = 'profile'
+
+    class Action(models.TextChoices):
+        CREATED = 'created'
+        UPDATED = 'updated'
+        DELETED = 'deleted'
+
+    class Meta:
+        db_table = 'user_change'
+        indexes = (
+            models.Index(fields=('id',), condition=Q(sequence__isnull=True), name='user_change_pending_idx'),
+            models.Index(
+                fields=('sequence',), condition=Q(sequence__isnull=False, relayed_at__isnull=True),
+                name='user_change_unrelayed_idx'
+            ),
+            # Finds the later changes of the same object, which compaction keeps.
+            models.Index(fields=('kind', 'object_id', 'sequence'), name='user_change_object_idx'),
+        )
+
+    sequence = models.BigIntegerField(null=True, blank=True, unique=True)
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    action = models.CharField(max_length=10, choices=Action.choices)
+    object_id = models.BigIntegerField()
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    relayed_at = models.DateTimeField(null=True, blank=True)
@@ -0,0 +1,10 @@
+from rest_framework.permissions import BasePermission
+
+
+class IsOwnerOrStaff(BasePermission):
+    """Allow users to change their own account and profile, and staff users to change any of them."""
+
+    def has_object_permission(self, request, view, obj):
+        """Return whether `obj` is the user of the request or its profile, or that user is staff."""
+        owner_id = getattr(obj, 'user_id', obj.pk)
+        return bool(request.user and (request.user.is_staff or owner_id == request.user.pk))
@@ -0,0 +1,209 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time, timedelta, timezone
+
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, connection, connections, transaction
+
+from apps.users.models import ProfileModel, UserModel
+from core.db.copy import copy_objects, reserve_ids
+from core.hashing.pool import init_worker
+
+SEED_EMAIL_DOMAIN = 'seed.example.com'
+SEED_PASSWORD = 'seed-password'
+
+FIRST_NAMES = (
+    'Olena', 'Oleksandr', 'Iryna', 'Andrii', 'Nataliia', 'Dmytro', 'Tetiana', 'Serhii', 'Yuliia', 'Mykola',
+    'Kateryna', 'Volodymyr', 'Oksana', 'Ivan', 'Svitlana', 'Taras', 'Anna', 'Maksym', 'Mariia', 'Bohdan',
+)
+LAST_NAMES = (
+    'Melnyk', 'Shevchenko', 'Kovalenko', 'Bondarenko', 'Boiko', 'Tkachenko', 'Kravchenko', 'Kovalchuk',
+    'Koval', 'Oliinyk', 'Shevchuk', 'Polishchuk', 'Tkachuk', 'Savchenko', 'Bondar', 'Marchenko', 'Rudenko',
+)
+# Weighted by population, so a few cities hold most of the profiles.
+CITIES = {
+    'Kyiv': 2950, 'Kharkiv': 1420, 'Odesa': 1010, 'Dnipro': 960, 'Lviv': 720, 'Zaporizhzhia': 710,
+    'Kryvyi Rih': 600, 'Mykolaiv': 470, 'Vinnytsia': 370, 'Poltava': 280, 'Chernihiv': 280, 'Cherkasy': 270,
+    'Sumy': 260, 'Zhytomyr': 260, 'Rivne': 245, 'Ivano-Frankivsk': 240, 'Ternopil': 225, 'Lutsk': 215,
+    'Uzhhorod': 115, 'Chernivtsi': 265,
+}
+ACTIVE_RATIO = 0.93
+STAFF_RATIO = 0.001
+NEVER_LOGGED_IN_RATIO = 0.2
+
+
+def seed_email(index):
+    """Return the email of the seeded user number `index`."""
+    return f'user{index}@{SEED_EMAIL_DOMAIN}'
+
+
+def get_seeded_users():
+    """Return the queryset of the seeded users."""
+    return UserModel.objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}')
+
+
+def get_existing_emails(emails, batch_size=500):
+    """Return the set of `emails` that belong to a user, looked up in batches."""
+    existing = set()
+    for start in range(0, len(emails), batch_size):
+        batch = emails[start:start + batch_size]
+        existing.update(UserModel.objects.filter(email__in=batch).values_list('email', flat=True))
+    return existing
+
+
+class UserSeeder:
+    """Generate users with their profiles, numbered from 0, in chunks inserted in one transaction each.
+
+    The attributes of every user only depend on the seed and on its number, so the generated
+    data is the same whatever the chunk size, the number of workers and the runs it took. The
+    email of user `n` is `seed_email(n)`, which lets a new run skip the chunks that are already
+    inserted. Every user gets the same password, hashed once.
+
+    The rows are written with `COPY` on PostgreSQL, and with `bulk_create` on other databases.
+    """
+
+    def __init__(self, seed=0, until=None, days=3 * 365, password_hash=None):
+        """Initialize the seeder.
+
+        :param seed: The seed of the generated data.
+        :type seed: int
+        :param until: The most recent creation time, the start of the current UTC day by default.
+        :type until: datetime | None
+        :param days: The number of days before `until` over which the users were created.
+        :type days: int
+        :param password_hash: The password hash of every user, the hash of `SEED_PASSWORD` by default.
+        :type password_hash: str | None
+        """
+        self.seed = seed
+        self.until = until or datetime.combine(datetime.now(timezone.utc).date(), time(), timezone.utc)
+        self.days = days
+        self.password_hash = password_hash or make_password(SEED_PASSWORD)
+
+    def seed_users(self, count, chunk_size=10000, workers=1):
+        """Insert the missing users among the first `count`, chunk by chunk.
+
+        :param count: The number of seeded users to reach.
+        :type count: int
+        :param chunk_size: The number of users inserted per transaction.
+        :type chunk_size: int
+        :param workers: The number of processes inserting chunks in parallel.
+        :type workers: int
+        :return: An iterator of the number of users created by each inserted chunk.
+        :rtype: Iterator[int]
+        """
+        chunks = self.get_missing_chunks(count, chunk_size)
+        if workers <= 1 or len(chunks) <= 1:
+            return map(self.insert_chunk, *zip(*chunks)) if chunks else iter(())
+        return self._insert_in_processes(chunks, workers)
+
+    def get_missing_chunks(self, count, chunk_size):
+        """Return the `(start, stop)` ranges of users to insert, without the chunks whose bounds both exist."""
+        chunks = [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+        existing = get_existing_emails([seed_email(index) for start, stop in chunks for index in (start, stop - 1)])
+        return [
+            (start, stop) for start, stop in chunks
+            if seed_email(start) not in existing or seed_email(stop - 1) not in existing
+        ]
+
+    def insert_chunk(self, start, stop):
+        """Insert the users numbered from `start` to `stop` (excluded) that do not exist yet.
+
+        :return: The number of created users.
+        :rtype: int
+        """
+        users, profiles = self.generate(start, stop)
+        try:
+            with transaction.atomic():
+                self._insert(users, profiles)
+            return len(users)
+        except IntegrityError:
+            # Some users of the chunk were inserted by a run with another chunk size. The failed
+            # insert may have changed the instances, so they are generated again.
+            users, profiles = self.generate(start, stop)
+
+        existing = get_existing_emails([user.email for user in users])
+        missing = [(user, profile) for user, profile in zip(users, profiles) if user.email not in existing]
+        if missing:
+            with transaction.atomic():
+                self._insert(*zip(*missing))
+        return len(missing)
+
+    def generate(self, start, stop):
+        """Return the unsaved users numbered from `start` to `stop` (excluded), and their profiles."""
+        users, profiles = [], []
+        for index in range(start, stop):
+            user, profile = self.generate_user(index)
+            users.append(user)
+            profiles.append(profile)
+        return users, profiles
+
+    def generate_user(self, index):
+        """Return the unsaved user number `index` and its profile."""
+        rng = random.Random(self.seed * 10 ** 12 + index)
+        # Sign-ups grow over time, so recent creation dates are more likely.
+        created_at = self.until - timedelta(days=self.days * (1 - rng.random() ** 0.5), seconds=rng.random())
+        updated_at = min(self.until, created_at + timedelta(days=rng.expovariate(1 / 30)))
+        last_login = None
+        if rng.random() >= NEVER_LOGGED_IN_RATIO:
+            last_login = created_at + (self.until - created_at) * rng.random()
+
+        user = UserModel(
+            email=seed_email(index),
+            password=self.password_hash,
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=rng.choice(LAST_NAMES),
+            is_active=rng.random() < ACTIVE_RATIO,
+            is_staff=rng.random() < STAFF_RATIO,
+            last_login=last_login,
+            created_at=created_at,
+            updated_at=updated_at,
+        )
+        profile = ProfileModel(
+            city=rng.choices(tuple(CITIES), weights=tuple(CITIES.values()))[0],
+            phone=f'380{rng.randrange(10 ** 9):09d}',
+            age=min(90, max(16, round(rng.gauss(34, 11)))),
+            created_at=created_at,
+            updated_at=updated_at,
+        )
+        return user, profile
+
+    def _insert(self, users, profiles):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                for user, profile, pk in zip(users, profiles, reserve_ids(cursor, UserModel, len(users))):
+                    user.pk = pk
+                    profile.user_id = pk
+                copy_objects(cursor, UserModel, users, UserModel._meta.concrete_fields)
+                copy_objects(
+                    cursor, ProfileModel, profiles,
+                    [field for field in ProfileModel._meta.concrete_fields if not field.primary_key]
+                )
+            return
+
+        for profile, user in zip(profiles, self._bulk_create(UserModel, users)):
+            profile.user = user
+        self._bulk_create(ProfileModel, profiles)
+
+    @staticmethod
+    def _bulk_create(model, objs):
+        # `bulk_create` sets the `auto_now` fields to the current time, the generated ones are restored after.
+        timestamps = [(obj.created_at, obj.updated_at) for obj in objs]
+        objs = model.objects.bulk_create(objs)
+        for obj, (created_at, updated_at) in zip(objs, timestamps):
+            obj.created_at, obj.updated_at = created_at, updated_at
+        model.objects.bulk_update(objs, ('created_at', 'updated_at'))
+        return objs
+
+    def _insert_in_processes(self, chunks, workers):
+        # The workers open their own connections, they must not share the ones of this process.
+        connections.close_all()
+        with ProcessPoolExecutor(workers, initializer=init_worker) as executor:
+            yield from executor.map(self.insert_chunk, *zip(*chunks))
+
+
+def seed_users(count, chunk_size=10000, workers=1, **kwargs):
+    """Insert the missing seeded users among the first `count`, and return the number of created users.
+
+    The keyword arguments are passed to `UserSeeder`.
+    """
+    return sum(UserSeeder(**kwargs).seed_users(count, chunk_size, workers))
@@ -1,9 +1,23 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction
 from djoser.serializers import UserCreateSerializer
-from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import (
+    BooleanField,
+    CharField,
+    DateTimeField,
+    EmailField,
+    FloatField,
+    IntegerField,
+    ModelSerializer,
+    Serializer,
+    ValidationError,
+)
 
-from apps.users.models import ProfileModel
+from apps.users.changes import record_changes
+from apps.users.models import ProfileModel, UserChangeModel
+from core.serializers.measured import MeasuredListSerializer, MeasuredSerializerMixin
+from core.serializers.sparse_fields import SparseFieldsetMixin
 
 UserModel = get_user_model()
 
@@ -15,17 +29,25 @@ class UserCreateSerializers(UserCreateSerializer):
         model = UserModel
         fields = ('id', 'email', 'first_name', 'last_name', 'password')
 
+    @transaction.atomic
+    def perform_create(self, validated_data):
+        """Create a user account, recording it in the change feed."""
+        user = super().perform_create(validated_data)
+        record_changes([user], UserChangeModel.Action.CREATED)
+        return user
+
 
-class ProfileSerializer(ModelSerializer):
+class ProfileSerializer(MeasuredSerializerMixin, ModelSerializer):
     """Serializer for creating user profile."""
 
     class Meta:
         model = ProfileModel
         fields = ('id', 'city', 'phone', 'age')
+        list_serializer_class = MeasuredListSerializer
 
 
-class UserAccountSerializer(ModelSerializer):
-    """Serializer for creating user."""
+class UserAccountSerializer(MeasuredSerializerMixin, SparseFieldsetMixin, ModelSerializer):
+    """Serializer for creating user, rendering the fieldset requested with `fields` and `expand`."""
 
     profile = ProfileSerializer()
 
@@ -37,6 +59,8 @@ class UserAccountSerializer(ModelSerializer):
             'updated_at', 'profile'
         )
         read_only_fields = ('id', 'is_active', 'is_staff', 'is_superuser', 'last_login', 'created_at', 'updated_at')
+        expandable_fields = ('profile',)
+        list_serializer_class = MeasuredListSerializer
         extra_kwargs = {
             'password': {
                 'write_only': True
@@ -45,8 +69,75 @@ class UserAccountSerializer(ModelSerializer):
 
     @transaction.atomic
     def create(self, validated_data: dict):
-        """Create a new user account with associated profile."""
+        """Create a new user account with associated profile, recording both in the change feed."""
         profile = validated_data.pop('profile')
         user = UserModel.objects.create_user(**validated_data)
-        ProfileModel.objects.create(**profile, user=user)
+        profile = ProfileModel.objects.create(**profile, user=user)
+        record_changes([user, profile], UserChangeModel.Action.CREATED)
         return user
+
+
+class UserUpdateSerializer(ModelSerializer):
+    """Serializer for validating partial updates of a user and of its profile."""
+
+    profile = ProfileSerializer(required=False)
+
+    class Meta:
+        model = UserModel
+        fields = ('email', 'first_name', 'last_name', 'profile')
+
+    def validate_email(self, value):
+        """Normalize the email like on sign-up."""
+        return UserModel.objects.normalize_email(value)
+
+
+class UserImportRowSerializer(Serializer):
+    """Serializer for validating a single row of a bulk user import."""
+
+    email = EmailField(max_length=254)
+    password = CharField(max_length=128, write_only=True)
+    first_name = CharField(max_length=128, required=False, allow_blank=True, default='')
+    last_name = CharField(max_length=255, required=False, allow_blank=True, default='')
+    city = CharField(max_length=20)
+    phone = CharField(max_length=20)
+    age = IntegerField(min_value=0)
+
+
+class UserExportSerializer(Serializer):
+    """Serializer for validating the query parameters of the users export."""
+
+    since = DateTimeField(required=False)
+
+
+class UserChangesSerializer(Serializer):
+    """Serializer for validating the query parameters of the change feed."""
+
+    after = IntegerField(min_value=0, default=0)
+    limit = IntegerField(min_value=1, required=False)
+    wait = FloatField(min_value=0, default=0)
+
+    def validate_limit(self, value):
+        """Check that the page is not larger than `USERS_CHANGES_MAX_PAGE_SIZE`."""
+        if value > settings.USERS_CHANGES_MAX_PAGE_SIZE:
+            raise ValidationError(f'Ensure this value is less than or equal to {settings.USERS_CHANGES_MAX_PAGE_SIZE}.')
+        return value
+
+
+class UserFilterSerializer(Serializer):
+    """Serializer for validating the filter query parameters of the users list."""
+
+    is_active = BooleanField(required=False)
+    created_after = DateTimeField(required=False)
+    created_before = DateTimeField(required=False)
+    city = CharField(max_length=20, required=False)
+    age_min = IntegerField(min_value=0, required=False)
+    age_max = IntegerField(min_value=0, required=False)
+    q = CharField(max_length=255, required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        """Check that the ranges are not inverted."""
+        if 'age_min' in attrs and 'age_max' in attrs and attrs['age_min'] > attrs['age_max']:
+            raise ValidationError({'age_max': ['Must be greater than or equal to age_min.']})
+        if 'created_after' in attrs and 'created_before' in attrs and attrs['created_after'] > attrs['created_before']:
+            raise ValidationError({'created_before': ['Must be later than created_after.']})
+        return attrs
@@ -0,0 +1,54 @@
+import math
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from djoser.signals import user_activated, user_updated
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from apps.users.caches import profile_detail_cache, user_detail_cache
+from apps.users.changes import record_changes
+from apps.users.models import ProfileModel, UserChangeModel, UserModel
+from apps.users.tokens import invalidate_cached_user, revoke_session, revoke_user_tokens
+
+
+@receiver([post_save, post_delete], sender=UserModel)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """Drop the cached representation of a changed user."""
+    transaction.on_commit(partial(user_detail_cache.invalidate, instance.pk))
+
+
+@receiver(post_save, sender=UserModel)
+def revoke_outdated_tokens(sender, instance, **kwargs):
+    """Revoke the tokens of a user whose token version was bumped, or drop the cached user."""
+    if getattr(instance, '_token_version_changed', False):
+        transaction.on_commit(partial(revoke_user_tokens, instance.pk, instance.token_version))
+    else:
+        transaction.on_commit(partial(invalidate_cached_user, instance.pk))
+
+
+@receiver(post_delete, sender=UserModel)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    """Revoke every token of a deleted user."""
+    transaction.on_commit(partial(revoke_user_tokens, instance.pk, math.inf))
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def revoke_blacklisted_session(sender, instance, created, **kwargs):
+    """Revoke the access tokens issued from a refresh token that was blacklisted."""
+    if created:
+        transaction.on_commit(partial(revoke_session, instance.token.jti, instance.token.expires_at))
+
+
+@receiver([post_save, post_delete], sender=ProfileModel)
+def invalidate_profile_cache(sender, instance, **kwargs):
+    """Drop the cached representations of a changed profile and of its user."""
+    transaction.on_commit(partial(profile_detail_cache.invalidate, instance.pk))
+    transaction.on_commit(partial(user_detail_cache.invalidate, instance.user_id))
+
+
+@receiver([user_activated, user_updated])
+def record_djoser_change(sender, user, **kwargs):
+    """Record the users activated or updated through the djoser endpoints in the change feed."""
+    record_changes([user], UserChangeModel.Action.UPDATED)
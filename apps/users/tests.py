@@ -1,2 +1,1208 @@
+import gzip
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
+from urllib.parse import urlencode
 
-# Create your tests here.
+import brotli
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.hashers import identify_hasher
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from djoser.utils import encode_uid
+from redis import Redis, ResponseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.serializers import BaseSerializer
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from apps.users.caches import user_detail_cache
+from apps.users.changes import ChangeRelay, change_waiters, sequence_changes
+from apps.users.export import UserExporter
+from apps.users.models import ProfileModel, UserChangeModel, UserModel
+from apps.users.seeding import SEED_PASSWORD, get_seeded_users, seed_users
+from apps.users.serializers import UserAccountSerializer
+from apps.users.tokens import local_auth_cache
+from apps.users.updates import PreconditionFailed, UserUpdater, get_user_etag
+from apps.users.views import UserRetrieveUpdateDestroyView
+from core.benchmarks.baseline import find_regressions, median_summary
+from core.middleware.compression import compress_chunks
+from core.renderers.fast_json import FastJSONRenderer
+from core.serializers.compiled import compile_serializer
+from core.testing.query_count import QueryCountAssertionsMixin
+from core.throttling.buckets import LocalTokenBucket, RedisTokenBucket, get_token_bucket
+
+
+def create_users(count, same_created_at=False):
+    start = UserModel.objects.count()
+    users = UserModel.objects.bulk_create(
+        UserModel(email=f'user{index}@example.com', first_name=f'First{index}', last_name=f'Last{index}')
+        for index in range(start, start + count)
+    )
+    ProfileModel.objects.bulk_create(
+        ProfileModel(city='Kyiv', phone='380000000', age=20 + index, user=user) for index, user in enumerate(users)
+    )
+    now = timezone.now()
+    for index, user in enumerate(users):
+        created_at = now if same_created_at else now - timedelta(minutes=index)
+        UserModel.objects.filter(pk=user.pk).update(created_at=created_at)
+    return users
+
+
+class UsersListPaginationTestCase(APITestCase):
+    def test_keyset_pages_cover_all_users_in_order(self):
+        create_users(7, same_created_at=True)
+        expected = list(UserModel.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+        seen = []
+        url = '/users?size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('total_items', response.data)
+            seen.extend(item['id'] for item in response.data['data'])
+            url = response.data['next']
+        self.assertEqual(seen, expected)
+
+    def test_prev_cursor_returns_previous_page(self):
+        create_users(7)
+        first = self.client.get('/users?size=3').data
+        self.assertIsNone(first['prev'])
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['prev']).data
+        self.assertEqual([item['id'] for item in back['data']], [item['id'] for item in first['data']])
+
+    def test_total_items_only_when_requested(self):
+        create_users(4)
+        response = self.client.get('/users?with_total=true')
+        self.assertEqual(response.data['total_items'], 4)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/users?cursor=garbage')
+        self.assertEqual(response.status_code, 404)
+
+
+class UsersListFilterTestCase(APITestCase):
+    def setUp(self):
+        self.users = create_users(6)
+        UserModel.objects.filter(pk=self.users[1].pk).update(is_active=False)
+        ProfileModel.objects.filter(user=self.users[2]).update(city='Lviv')
+        UserModel.objects.filter(pk=self.users[3].pk).update(first_name='Olena', last_name='Shevchenko')
+
+    def get_ids(self, query, url='/users'):
+        response = self.client.get(f'{url}?size=20&{query}')
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.json()['data']]
+
+    def test_filters_by_user_and_profile_fields(self):
+        ids = [user.id for user in self.users]
+        self.assertEqual(self.get_ids('is_active=false'), [ids[1]])
+        self.assertNotIn(ids[1], self.get_ids('is_active=true'))
+        self.assertEqual(self.get_ids('city=Lviv'), [ids[2]])
+        self.assertEqual(self.get_ids('age_min=21&age_max=22'), [ids[1], ids[2]])
+
+        created_at = UserModel.objects.get(pk=ids[2]).created_at
+        query = urlencode({'created_after': created_at - timedelta(seconds=1), 'created_before': created_at})
+        self.assertEqual(self.get_ids(query), [ids[2]])
+
+    def test_search_requires_every_term_in_email_or_names(self):
+        ids = [user.id for user in self.users]
+        self.assertEqual(self.get_ids('q=shevchenko'), [ids[3]])
+        self.assertEqual(self.get_ids('q=olena+user3@'), [ids[3]])
+        self.assertEqual(self.get_ids('q=olena+user4@'), [])
+        self.assertEqual(self.get_ids('q=first5'), [ids[5]])
+
+    def test_async_list_applies_the_same_filters(self):
+        for query in ('city=Lviv', 'q=olena', 'is_active=false&age_min=21'):
+            self.assertEqual(self.get_ids(query, url='/users/async'), self.get_ids(query))
+
+    def test_invalid_filters_are_rejected(self):
+        for url in ('/users', '/users/async'):
+            self.assertEqual(self.client.get(f'{url}?age_min=30&age_max=20').status_code, 400)
+            self.assertEqual(self.client.get(f'{url}?created_after=yesterday').status_code, 400)
+            self.assertEqual(self.client.get(f'{url}?is_active=maybe').status_code, 400)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Query plans are checked on PostgreSQL only')
+class UsersQueryPlanTestCase(APITestCase):
+    def explain(self, sql, params=None):
+        with connection.cursor() as cursor:
+            # The tables are tiny, so make sequential scans unattractive to see if an index could serve the query.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}', params)
+            return '\n'.join(row[0] for row in cursor.fetchall())
+
+    def get_list_plan(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        sql = next(query['sql'] for query in context.captured_queries if 'FROM "auth_users"' in query['sql'])
+        return response, self.explain(sql)
+
+    def test_list_pages_are_read_from_the_created_at_index(self):
+        create_users(5)
+        response, first_plan = self.get_list_plan('/users?size=2')
+        _, next_plan = self.get_list_plan(response.data['next'])
+
+        for plan in (first_plan, next_plan):
+            self.assertIn('auth_users_created_idx', plan)
+            self.assertNotIn('Seq Scan on auth_users', plan)
+            self.assertNotRegex(plan, r'\bSort\b')
+
+    def test_case_insensitive_email_lookup_uses_index(self):
+        create_users(3)
+        queryset = UserModel.objects.filter(email__iexact='USER1@EXAMPLE.COM').order_by()
+        self.assertIn('auth_users_email_upper_idx', self.explain(*queryset.query.sql_with_params()))
+
+
+class UsersQueryCountTestCase(QueryCountAssertionsMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_list_does_not_query_per_user(self):
+        create_users(2)
+        self.assertQueriesDoNotScale(
+            lambda: self.client.get('/users?size=20'),
+            lambda: create_users(10)
+        )
+
+    def test_list_and_retrieve_query_budget(self):
+        user = create_users(5)[0]
+        with self.assertMaxQueries(1):
+            self.client.get('/users')
+        with self.assertMaxQueries(1):
+            response = self.client.get(f'/users/{user.pk}')
+        self.assertEqual(response.data['profile']['city'], 'Kyiv')
+
+    def test_for_serializer_prunes_write_only_columns(self):
+        create_users(1)
+        user = UserModel.objects.for_serializer(UserAccountSerializer).get()
+        self.assertIn('password', user.get_deferred_fields())
+        self.assertNotIn('email', user.get_deferred_fields())
+
+
+class SparseFieldsetTestCase(QueryCountAssertionsMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = create_users(3)
+
+    def test_list_selects_only_requested_columns_without_join(self):
+        with self.assertMaxQueries(1) as context:
+            response = self.client.get('/users?size=2&fields=id,email')
+        self.assertEqual(set(response.data['data'][0]), {'id', 'email'})
+        sql = context.captured_queries[0]['sql']
+        self.assertNotIn('"profile"', sql)
+        self.assertNotIn('"last_login"', sql)
+
+        with self.assertMaxQueries(1):
+            next_page = self.client.get(response.data['next'])
+        self.assertEqual(next_page.data['data'][0], {'id': self.users[2].id, 'email': self.users[2].email})
+
+    def test_expand_adds_the_nested_profile(self):
+        response = self.client.get('/users?fields=id&expand=profile')
+        self.assertEqual(set(response.data['data'][0]), {'id', 'profile'})
+        self.assertEqual(response.data['data'][0]['profile']['city'], 'Kyiv')
+
+        async_data = self.client.get('/users/async?fields=id&expand=profile').json()['data']
+        self.assertEqual(async_data, response.json()['data'])
+
+    def test_detail_caches_each_fieldset_separately(self):
+        pk, email = self.users[0].pk, self.users[0].email
+        self.assertEqual(self.client.get(f'/users/{pk}?fields=email').data, {'email': email})
+        self.assertIn('profile', self.client.get(f'/users/{pk}').data)
+        self.assertEqual(self.client.get(f'/users/async/{pk}?fields=email').json(), {'email': email})
+
+    def test_unknown_fields_are_rejected(self):
+        for url in ('/users', f'/users/{self.users[0].pk}', '/users/async'):
+            self.assertEqual(self.client.get(f'{url}?fields=id,password').status_code, 400)
+            self.assertEqual(self.client.get(f'{url}?fields=id&expand=email').status_code, 400)
+
+
+class FastSerializationTestCase(APITestCase):
+    def test_compiled_serializer_matches_drf_serializer(self):
+        users = create_users(3)
+        UserModel.objects.filter(pk=users[0].pk).update(last_login=timezone.now(), first_name='Олена')
+        for query in ('', 'fields=id,created_at', 'fields=email&expand=profile'):
+            request = Request(APIRequestFactory().get(f'/users?{query}'))
+            serializer = UserAccountSerializer(context={'request': request})
+            compiled = compile_serializer(serializer)
+            rows = compiled.values_list(UserModel.objects.order_by('-created_at', '-id'))
+            queryset = UserModel.objects.for_serializer(serializer).order_by('-created_at', '-id')
+            expected = UserAccountSerializer(queryset, many=True, context={'request': request}).data
+            self.assertEqual(compiled.render_many(rows), expected)
+
+    def test_compiled_serializer_renders_missing_profile_as_null(self):
+        UserModel.objects.create_user('no-profile@example.com', 'secret')
+        compiled = compile_serializer(UserAccountSerializer())
+        self.assertIsNone(compiled.render_many(compiled.values_list(UserModel.objects.all()))[0]['profile'])
+
+    def test_fast_renderer_matches_drf_renderer(self):
+        data = {
+            'datetime': timezone.now().replace(microsecond=123456),
+            'decimal': Decimal('1.50'),
+            'lazy': gettext_lazy('Not found.'),
+            'text': 'Олена \u2028 line',
+            'nested': [{'id': 1, 'none': None}],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+        with mock.patch('core.renderers.fast_json.orjson', None):
+            self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class UserDetailCacheTestCase(QueryCountAssertionsMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_users(1)[0]
+
+    def test_second_read_is_served_from_cache(self):
+        hits = user_detail_cache.hits
+        first = self.client.get(f'/users/{self.user.pk}')
+        with self.assertMaxQueries(0):
+            second = self.client.get(f'/users/{self.user.pk}')
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(user_detail_cache.hits, hits + 1)
+
+    def test_if_none_match_returns_not_modified(self):
+        etag = self.client.get(f'/users/{self.user.pk}')['ETag']
+        response = self.client.get(f'/users/{self.user.pk}', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_profile_update_invalidates_user_and_profile(self):
+        profile = self.user.profile
+        etag = self.client.get(f'/users/{self.user.pk}')['ETag']
+        self.client.get(f'/users/{profile.pk}/profile')
+
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/users/{profile.pk}/profile', {'city': 'Lviv'})
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get(f'/users/{profile.pk}/profile').data['city'], 'Lviv')
+        response = self.client.get(f'/users/{self.user.pk}', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['profile']['city'], 'Lviv')
+
+    def test_entry_loaded_before_an_invalidation_is_not_served(self):
+        load_cache_entry = UserRetrieveUpdateDestroyView.load_cache_entry
+
+        def load_then_change(view):
+            entry = load_cache_entry(view)
+            # A concurrent update commits and invalidates the user once the stale entry is loaded.
+            UserModel.objects.filter(pk=self.user.pk).update(email='changed@example.com')
+            user_detail_cache.invalidate(self.user.pk)
+            return entry
+
+        with mock.patch.object(UserRetrieveUpdateDestroyView, 'load_cache_entry', load_then_change):
+            self.assertEqual(self.client.get(f'/users/{self.user.pk}').data['email'], self.user.email)
+        self.assertEqual(self.client.get(f'/users/{self.user.pk}').data['email'], 'changed@example.com')
+
+
+class ConditionalRequestsTestCase(QueryCountAssertionsMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_users(1)[0]
+
+    def test_not_modified_is_answered_from_timestamps_on_a_cache_miss(self):
+        response = self.client.get(f'/users/{self.user.pk}')
+        self.assertIn('Last-Modified', response)
+        cache.clear()
+
+        with self.assertMaxQueries(1) as context:
+            response = self.client.get(f'/users/{self.user.pk}', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertNotIn('"email"', context.captured_queries[0]['sql'])
+
+        last_modified = self.client.get(f'/users/{self.user.profile.pk}/profile')['Last-Modified']
+        cache.clear()
+        response = self.client.get(f'/users/{self.user.profile.pk}/profile', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_partial_saves_change_the_validators(self):
+        etag = self.client.get(f'/users/{self.user.pk}')['ETag']
+        profile_etag = self.client.get(f'/users/{self.user.pk}?fields=id,email')['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.profile.city = 'Lviv'
+            self.user.profile.save(update_fields=['city'])
+        self.assertEqual(self.client.get(f'/users/{self.user.pk}', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        # The profile is not rendered in this fieldset, so its change does not affect it.
+        response = self.client.get(f'/users/{self.user.pk}?fields=id,email', HTTP_IF_NONE_MATCH=profile_etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_gets_an_etag_from_conditional_get_middleware(self):
+        etag = self.client.get('/users')['ETag']
+        self.assertEqual(self.client.get('/users', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+@override_settings(COMPRESSION_MIN_SIZE=200)
+class CompressionTestCase(APITestCase):
+    def setUp(self):
+        create_users(10)
+        self.identity = self.client.get('/users?size=10')
+
+    def test_brotli_is_preferred_over_gzip(self):
+        response = self.client.get('/users?size=10', HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), self.identity.content)
+        self.assertEqual(response['ETag'], f'W/{self.identity["ETag"]}')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        response = self.client.get('/users?size=10', HTTP_ACCEPT_ENCODING='br;q=0, gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.identity.content)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+
+    def test_small_and_unaccepted_responses_are_not_compressed(self):
+        response = self.client.get('/users?size=1&fields=id', HTTP_ACCEPT_ENCODING='br, gzip')
+        self.assertNotIn('Content-Encoding', response)
+        response = self.client.get('/users?size=10', HTTP_ACCEPT_ENCODING='identity')
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_streamed_chunks_are_compressed_and_flushed(self):
+        chunks = [b'{"id": %d}\n' % index * 20 for index in range(5)]
+        for encoding, decompress in (('br', brotli.decompress), ('gzip', gzip.decompress)):
+            compressed = list(compress_chunks(iter(chunks), encoding))
+            self.assertTrue(all(compressed[:len(chunks)]))
+            self.assertEqual(decompress(b''.join(compressed)), b''.join(chunks))
+
+
+@override_settings(
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'read': '2/min', 'write': '2/min', 'signup': '1/hour', 'login': '2/min'},
+    },
+    THROTTLE_REDIS_URL=None,
+)
+class ThrottlingTestCase(APITestCase):
+    def setUp(self):
+        get_token_bucket().clear()
+
+    def test_reads_are_throttled_per_client_with_retry_after(self):
+        self.assertEqual(self.client.get('/users').status_code, 200)
+        self.assertEqual(self.client.get('/users/async').status_code, 200)
+
+        response = self.client.get('/users')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        response = self.client.get('/users/async')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+
+        self.assertEqual(self.client.get('/users', REMOTE_ADDR='10.0.0.2').status_code, 200)
+        self.assertEqual(self.client.get('/health_check/live').status_code, 200)
+
+    def test_signup_and_login_have_their_own_scopes(self):
+        payload = {'email': 'throttled@example.com', 'password': 'secret'}
+        self.assertEqual(self.client.post('/users', payload, format='json').status_code, 400)
+        response = self.client.post('/users/async', payload, format='json')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '3600')
+
+        self.assertEqual(self.client.post('/auth/jwt/create/', payload, format='json').status_code, 401)
+        self.assertEqual(self.client.post('/auth/jwt/create/', payload, format='json').status_code, 401)
+        self.assertEqual(self.client.post('/auth/jwt/create/', payload, format='json').status_code, 429)
+        self.assertEqual(self.client.get('/users').status_code, 200)
+
+    def test_forwarded_for_does_not_identify_clients_without_proxies(self):
+        payload = {'email': 'throttled@example.com', 'password': 'secret'}
+        statuses = [
+            self.client.post('/auth/jwt/create/', payload, format='json', HTTP_X_FORWARDED_FOR=f'203.0.113.{index}')
+            .status_code for index in range(3)
+        ]
+        self.assertEqual(statuses, [401, 401, 429])
+
+    def test_redis_errors_fall_back_to_local_buckets(self):
+        client = Redis.from_url('redis://127.0.0.1:1/0', socket_connect_timeout=0.1)
+        bucket = RedisTokenBucket(client, LocalTokenBucket(), retry_interval=60)
+        with self.assertLogs('core.throttling.buckets', 'WARNING'):
+            self.assertEqual(bucket.consume('key', 1, 1 / 60), 0)
+        self.assertAlmostEqual(bucket.consume('key', 1, 1 / 60), 60, delta=1)
+        self.assertEqual(bucket.consume('other', 1, 1 / 60), 0)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SeedUsersTestCase(APITestCase):
+    until = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+    def get_seeded_rows(self):
+        return list(
+            get_seeded_users().order_by('email').values_list(
+                'email', 'first_name', 'is_active', 'created_at', 'updated_at', 'profile__city', 'profile__age',
+                'profile__created_at'
+            )
+        )
+
+    def test_seed_users_resumes_with_any_chunk_size(self):
+        self.assertEqual(seed_users(3, chunk_size=2, until=self.until), 3)
+        self.assertEqual(seed_users(5, chunk_size=4, until=self.until), 2)
+        self.assertEqual(seed_users(4, until=self.until), 0)
+
+        users = get_seeded_users()
+        self.assertEqual(users.count(), 5)
+        self.assertEqual(ProfileModel.objects.filter(user__in=users).count(), 5)
+        self.assertTrue(users.first().check_password(SEED_PASSWORD))
+        self.assertTrue(all(row[3] <= row[4] <= self.until for row in self.get_seeded_rows()))
+
+    def test_seeded_data_only_depends_on_the_seed(self):
+        seed_users(4, chunk_size=3, seed=7, until=self.until)
+        rows = self.get_seeded_rows()
+        get_seeded_users().delete()
+
+        seed_users(4, chunk_size=4, seed=7, until=self.until)
+        self.assertEqual(self.get_seeded_rows(), rows)
+        get_seeded_users().delete()
+
+        seed_users(4, seed=8, until=self.until)
+        self.assertNotEqual(self.get_seeded_rows(), rows)
+
+    def test_seed_users_command(self):
+        out = StringIO()
+        call_command('seed_users', '3', '--workers', '1', '--until', '2026-01-01', stdout=out)
+        self.assertIn('Created 3 users', out.getvalue())
+        self.assertEqual(get_seeded_users().count(), 3)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class BenchmarkTestCase(APITestCase):
+    def test_regressions_against_the_baseline(self):
+        baseline = {
+            'list': {'rps': 100, 'p50_ms': 10, 'p95_ms': 20, 'p99_ms': 40, 'queries_per_request': 1},
+            'login': {'rps': 10, 'p50_ms': 100, 'p95_ms': 200, 'p99_ms': 400, 'queries_per_request': 2},
+        }
+        results = {
+            'list': {'rps': 85, 'p50_ms': 11, 'p95_ms': 29, 'p99_ms': 50, 'queries_per_request': 1.4},
+            'login': {'rps': 7, 'p50_ms': 100, 'p95_ms': 320, 'p99_ms': 400, 'queries_per_request': 3},
+            'create': {'rps': 1, 'p50_ms': 1000, 'p95_ms': 2000, 'p99_ms': 4000, 'queries_per_request': 9},
+        }
+        regressions = find_regressions(results, baseline, tolerance=0.2, tail_tolerance=0.5)
+        self.assertEqual(
+            [regression.split(':')[0] for regression in regressions],
+            ['login p95_ms', 'login rps', 'login queries_per_request'],
+        )
+
+    def test_median_summary_of_repeated_runs(self):
+        summaries = [
+            {'requests': 10, 'errors': 1, 'rps': rps, 'p50_ms': rps / 10, 'queries_per_request': None}
+            for rps in (30, 10, 20)
+        ]
+        self.assertEqual(
+            median_summary(summaries),
+            {'requests': 30, 'errors': 3, 'rps': 20, 'p50_ms': 2, 'queries_per_request': None},
+        )
+
+
+@override_settings(PASSWORD_HASHING_WORKERS=2, PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class UsersImportTestCase(APITestCase):
+    def setUp(self):
+        self.admin = UserModel.objects.create_superuser('admin@example.com', 'password')
+        self.client.force_authenticate(self.admin)
+
+    def test_csv_import_reports_row_errors_without_aborting(self):
+        content = (
+            'email,password,first_name,last_name,city,phone,age\n'
+            'one@example.com,secret,One,User,Kyiv,380001,30\n'
+            'not-an-email,secret,Two,User,Kyiv,380002,31\n'
+            'one@example.com,secret,Dup,User,Kyiv,380003,32\n'
+            'admin@example.com,secret,Old,User,Kyiv,380004,33\n'
+            'three@example.com,secret,Three,User,Lviv,380005,34\n'
+        )
+        upload = SimpleUploadedFile('users.csv', content.encode(), content_type='text/csv')
+        with self.settings(USERS_IMPORT_BATCH_SIZE=2):
+            response = self.client.post('/users/import', {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['row'] for error in response.data['errors']], [2, 3, 4])
+        user = UserModel.objects.get(email='three@example.com')
+        self.assertTrue(user.check_password('secret'))
+        self.assertEqual(user.profile.city, 'Lviv')
+
+    def test_ndjson_import(self):
+        content = (
+            '{"email": "one@example.com", "password": "secret", "city": "Kyiv", "phone": "1", "age": 20}\n'
+            '\n'
+            '{broken\n'
+        )
+        upload = SimpleUploadedFile('users.ndjson', content.encode())
+        response = self.client.post('/users/import', {'file': upload}, format='multipart')
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+
+    def test_import_requires_staff(self):
+        self.client.force_authenticate(None)
+        response = self.client.post('/users/import', {}, format='multipart')
+        self.assertEqual(response.status_code, 401)
+
+
+class UsersExportTestCase(APITestCase):
+    def setUp(self):
+        self.users = create_users(3)
+        self.admin = UserModel.objects.create_superuser('admin@example.com', 'password')
+        self.client.force_authenticate(self.admin)
+
+    def test_export_is_staff_only(self):
+        self.client.force_authenticate(self.users[0])
+        self.assertEqual(self.client.get('/users/export').status_code, 403)
+
+    def test_ndjson_export_streams_users_with_profiles(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/users/export')
+            content = b''.join(response.streaming_content)
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertIn('X-Export-Until', response)
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['email'] for row in rows], [user.email for user in self.users] + [self.admin.email])
+        self.assertEqual(rows[0]['city'], 'Kyiv')
+        self.assertIsNone(rows[-1]['city'])
+
+    def test_csv_export_is_negotiated_and_compressed(self):
+        response = self.client.get('/users/export?format=csv')
+        identity = b''.join(response.streaming_content)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="users.csv"')
+        lines = identity.decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'email', 'first_name'])
+        self.assertEqual(len(lines), 5)
+
+        response = self.client.get('/users/export', HTTP_ACCEPT='text/csv', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), identity)
+
+    def test_incremental_export(self):
+        since = timezone.now()
+        UserModel.objects.update(updated_at=since - timedelta(days=1))
+        ProfileModel.objects.update(updated_at=since - timedelta(days=1))
+        ProfileModel.objects.filter(user=self.users[1]).update(updated_at=since)
+
+        response = self.client.get('/users/export', {'since': since.isoformat()})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.users[1].pk])
+        self.assertEqual(self.client.get('/users/export?since=yesterday').status_code, 400)
+
+    @override_settings(USERS_EXPORT_SAFETY_MARGIN=600)
+    def test_next_export_overlaps_the_running_transactions(self):
+        started = timezone.now()
+        response = self.client.get('/users/export')
+        until = datetime.fromisoformat(response['X-Export-Until'])
+        self.assertLessEqual(until, timezone.now() - timedelta(seconds=600))
+
+        # Saved before the export started, but committed after it.
+        UserModel.objects.filter(pk=self.users[0].pk).update(updated_at=started - timedelta(seconds=1))
+        response = self.client.get('/users/export', {'since': until.isoformat()})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertIn(self.users[0].pk, [row['id'] for row in rows])
+
+    def test_rows_are_paged_without_server_side_cursors(self):
+        with mock.patch.dict(connection.settings_dict, DISABLE_SERVER_SIDE_CURSORS=True):
+            with self.assertNumQueries(3):
+                rows = list(UserExporter(chunk_size=2).iter_rows())
+        self.assertEqual([row[0] for row in rows], sorted(UserModel.objects.values_list('pk', flat=True)))
+
+    def test_export_command_writes_gzipped_csv(self):
+        err = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'users.csv.gz')
+            call_command('export_users', '--output', path, '--chunk-size', '2', stderr=err)
+            with gzip.open(path, 'rt') as file:
+                self.assertEqual(len(file.read().splitlines()), 5)
+        self.assertIn('Exported 4 users', err.getvalue())
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class UserChangesTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = UserModel.objects.create_superuser('admin@example.com', 'password')
+        self.client.force_authenticate(self.admin)
+
+    def create_user(self, email='changed@example.com'):
+        payload = {'email': email, 'password': 'secret', 'profile': {'city': 'Kyiv', 'phone': '1', 'age': 20}}
+        return self.client.post('/users', payload, format='json').data
+
+    def test_mutations_are_recorded_in_commit_order(self):
+        user = self.create_user()
+        self.client.patch(f'/users/{user["profile"]["id"]}/profile', {'age': 30}, format='json')
+        self.client.delete(f'/users/{user["id"]}')
+
+        response = self.client.get('/users/changes')
+        changes = response.data['changes']
+        self.assertEqual(
+            [(change['kind'], change['action']) for change in changes],
+            [('user', 'created'), ('profile', 'created'), ('profile', 'updated'), ('profile', 'deleted'),
+             ('user', 'deleted')]
+        )
+        self.assertEqual([change['sequence'] for change in changes], [1, 2, 3, 4, 5])
+        self.assertEqual(response.data['cursor'], 5)
+        self.assertEqual(changes[0]['data']['email'], 'changed@example.com')
+        self.assertNotIn('password', changes[0]['data'])
+        self.assertEqual(changes[2]['data']['age'], 30)
+        self.assertEqual(changes[4]['data'], {'id': user['id']})
+
+        response = self.client.get('/users/changes', {'after': 3, 'limit': 1})
+        self.assertEqual([change['sequence'] for change in response.data['changes']], [4])
+        response = self.client.get('/users/changes', {'after': 5, 'wait': 0.05})
+        self.assertEqual(response.data, {'changes': [], 'cursor': 5})
+
+    def test_async_mutations_are_recorded(self):
+        pk = self.client.post(
+            '/users/async', {'email': 'async@example.com', 'password': 'secret',
+                             'profile': {'city': 'Kyiv', 'phone': '1', 'age': 20}}, format='json'
+        ).json()['id']
+        profile_pk = ProfileModel.objects.get(user_id=pk).pk
+        self.client.patch(f'/users/async/{profile_pk}/profile', {'age': 42}, format='json')
+        self.client.delete(f'/users/async/{pk}')
+
+        changes = self.client.get('/users/changes').data['changes']
+        self.assertEqual(
+            [(change['kind'], change['action'], change['object_id']) for change in changes],
+            [('user', 'created', pk), ('profile', 'created', profile_pk), ('profile', 'updated', profile_pk),
+             ('profile', 'deleted', profile_pk), ('user', 'deleted', pk)]
+        )
+
+    def test_feed_is_staff_only_and_validates_parameters(self):
+        self.assertEqual(self.client.get('/users/changes', {'limit': 100000}).status_code, 400)
+        self.assertEqual(self.client.get('/users/changes', {'after': -1}).status_code, 400)
+        self.client.force_authenticate(UserModel.objects.create_user('plain@example.com', 'password'))
+        self.assertEqual(self.client.get('/users/changes').status_code, 403)
+        self.assertEqual(self.client.get('/users/changes/stream').status_code, 403)
+
+    @override_settings(USERS_CHANGES_STREAM_TIMEOUT=0.2, USERS_CHANGES_HEARTBEAT_INTERVAL=0.1)
+    def test_stream_resumes_after_last_event_id(self):
+        self.create_user('first@example.com')
+        self.create_user('second@example.com')
+
+        response = self.client.get(
+            '/users/changes/stream', HTTP_LAST_EVENT_ID='2', HTTP_ACCEPT='text/event-stream',
+            HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream; charset=utf-8')
+        self.assertNotIn('Content-Encoding', response)
+        content = b''.join(response.streaming_content).decode()
+
+        messages = content.split('\n\n')
+        self.assertEqual(messages[0], 'retry: 1000')
+        self.assertTrue(messages[1].startswith('id: 3\nevent: user.created\ndata: {'))
+        self.assertEqual(json.loads(messages[1].partition('data: ')[2])['data']['email'], 'second@example.com')
+        self.assertTrue(messages[2].startswith('id: 4\nevent: profile.created\n'))
+        self.assertIn(': keep-alive', messages)
+
+    @override_settings(USERS_CHANGES_MAX_WAITERS=1, USERS_CHANGES_STREAM_TIMEOUT=0.1)
+    def test_waiting_requests_are_limited_per_process(self):
+        with change_waiters.hold():
+            response = self.client.get('/users/changes', {'wait': 0.05})
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], '1')
+            self.assertEqual(self.client.get('/users/changes').status_code, 200)
+            self.assertEqual(self.client.get('/users/changes/stream').status_code, 503)
+
+        response = self.client.get('/users/changes/stream')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(change_waiters.count, 1)
+        b''.join(response.streaming_content)
+        self.assertEqual(change_waiters.count, 0)
+
+        response = self.client.get('/users/changes/stream')
+        response.close()
+        self.assertEqual(change_waiters.count, 0)
+
+    def test_relay_appends_every_change_once(self):
+        self.create_user()
+        client = mock.Mock()
+        pipeline = client.pipeline.return_value
+        pipeline.execute.return_value = [
+            ResponseError('The ID specified in XADD is equal or smaller than the target stream top item'), b'2-0'
+        ]
+
+        self.assertEqual(ChangeRelay(client, 'changes').run_once(), 2)
+        self.assertEqual([call.kwargs['id'] for call in pipeline.xadd.call_args_list], ['1-0', '2-0'])
+        fields = pipeline.xadd.call_args_list[0].args[1]
+        self.assertEqual((fields['kind'], fields['action']), ('user', 'created'))
+        self.assertEqual(json.loads(fields['data'])['email'], 'changed@example.com')
+        self.assertFalse(UserChangeModel.objects.filter(relayed_at__isnull=True).exists())
+        self.assertEqual(ChangeRelay(client, 'changes').run_once(), 0)
+
+    def test_failed_relay_is_retried(self):
+        self.create_user()
+        client = mock.Mock()
+        client.pipeline.return_value.execute.return_value = [ResponseError('OOM'), b'2-0']
+        with self.assertRaises(ResponseError):
+            ChangeRelay(client, 'changes').run_once()
+        self.assertEqual(UserChangeModel.objects.filter(relayed_at__isnull=True).count(), 2)
+
+    @override_settings(USERS_CHANGES_REDIS_URL=None)
+    def test_compaction_keeps_the_latest_state_of_every_object(self):
+        user = self.create_user()
+        for age in (30, 40):
+            self.client.patch(f'/users/{user["profile"]["id"]}/profile', {'age': age}, format='json')
+        deleted = self.create_user('deleted@example.com')
+        self.client.delete(f'/users/{deleted["id"]}')
+        sequence_changes()
+        UserChangeModel.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        call_command('compact_user_changes', '--compact-after', 3 * 24 * 3600, stdout=StringIO())
+        self.assertEqual(UserChangeModel.objects.count(), 8)
+        call_command('compact_user_changes', '--compact-after', 24 * 3600, '--retention', 3 * 24 * 3600,
+                     stdout=StringIO())
+        changes = self.client.get('/users/changes').data['changes']
+        self.assertEqual(
+            [(change['kind'], change['action']) for change in changes],
+            [('user', 'created'), ('profile', 'updated'), ('profile', 'deleted'), ('user', 'deleted')]
+        )
+        self.assertEqual(changes[1]['data']['age'], 40)
+
+        call_command('compact_user_changes', '--retention', 24 * 3600, stdout=StringIO())
+        # The last change is kept, so the next change does not take its position.
+        last = UserChangeModel.objects.get(action='deleted')
+        self.assertEqual((last.kind, last.sequence), ('user', 8))
+        self.create_user('next@example.com')
+        sequence_changes()
+        self.assertEqual(UserChangeModel.objects.filter(sequence__gt=8).count(), 2)
+
+
+class UserUpdateTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = create_users(3)
+        self.user = self.users[0]
+
+    def patch(self, path, data, **headers):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.patch(path, data, format='json', **headers)
+
+    def test_patch_updates_user_and_profile_with_only_changed_columns(self):
+        self.client.force_authenticate(self.user)
+        etag = self.client.get(f'/users/{self.user.pk}')['ETag']
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.patch(
+                f'/users/{self.user.pk}', {'email': 'new@example.com', 'profile': {'city': 'Lviv', 'age': 20}},
+                HTTP_IF_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['email'], response.data['profile']['city']), ('new@example.com', 'Lviv'))
+        updates = [query['sql'] for query in context.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertNotIn('"password"', updates[0])
+        self.assertNotIn('"age"', updates[1])
+
+        self.assertEqual(self.client.get(f'/users/{self.user.pk}')['ETag'], response['ETag'])
+        self.assertEqual(ProfileModel.objects.get(pk=self.user.profile.pk).city, 'Lviv')
+        self.assertEqual(
+            list(UserChangeModel.objects.values_list('kind', 'action')), [('user', 'updated'), ('profile', 'updated')]
+        )
+
+        response = self.patch(f'/users/{self.user.pk}', {'email': 'stale@example.com'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(UserModel.objects.get(pk=self.user.pk).email, 'new@example.com')
+
+    def test_conditional_update_fails_if_a_row_changed_after_it_was_read(self):
+        updater = UserUpdater()
+        user = updater.load([self.user.pk])[self.user.pk]
+        data = updater.validate(user, {'email': 'new@example.com'})
+        ProfileModel.objects.filter(user=user).update(updated_at=timezone.now())
+
+        with self.assertRaises(PreconditionFailed):
+            updater.save([(user, data, True)])
+        self.assertEqual(UserModel.objects.get(pk=user.pk).email, self.user.email)
+
+        user = updater.load([self.user.pk])[self.user.pk]
+        updater.save([(user, updater.validate(user, {'email': 'new@example.com'}), False)])
+        self.assertEqual(UserModel.objects.get(pk=user.pk).email, 'new@example.com')
+
+    def test_conditional_profile_update_fails_if_it_changed_after_it_was_read(self):
+        profile = ProfileModel.objects.get(pk=self.user.profile.pk)
+        ProfileModel.objects.filter(pk=profile.pk).update(updated_at=timezone.now())
+
+        with self.assertRaises(PreconditionFailed):
+            UserUpdater().save_profile(profile, {'age': 999}, True)
+        with self.assertRaises(PreconditionFailed):
+            UserUpdater().save_profile(profile, {}, True)
+        self.assertNotEqual(ProfileModel.objects.get(pk=profile.pk).age, 999)
+
+        profile = ProfileModel.objects.get(pk=profile.pk)
+        UserUpdater().save_profile(profile, {'age': 999}, False)
+        self.assertEqual(ProfileModel.objects.get(pk=profile.pk).age, 999)
+
+    def test_patch_is_limited_to_the_owner_and_staff(self):
+        payload = {'first_name': 'Taken'}
+        self.assertEqual(self.patch(f'/users/{self.user.pk}', payload).status_code, 401)
+        self.client.force_authenticate(self.users[1])
+        self.assertEqual(self.patch(f'/users/{self.user.pk}', payload).status_code, 403)
+        self.assertEqual(UserModel.objects.get(pk=self.user.pk).first_name, self.user.first_name)
+
+        self.client.force_authenticate(UserModel.objects.create_user('staff@example.com', 'password', is_staff=True))
+        self.assertEqual(self.patch(f'/users/{self.user.pk}', payload).status_code, 200)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.patch(f'/users/{self.user.pk}', {'last_name': 'Owner'}).data['email'], self.user.email)
+        self.assertEqual(UserModel.objects.get(pk=self.user.pk).last_name, 'Owner')
+
+    def test_profile_update_is_limited_to_the_owner_and_staff(self):
+        path = f'/users/{self.user.profile.pk}/profile'
+        self.assertEqual(self.patch(path, {'age': 50}).status_code, 401)
+        self.client.force_authenticate(self.users[1])
+        self.assertEqual(self.patch(path, {'age': 50}).status_code, 403)
+        self.assertEqual(self.client.put(path, {'city': 'Lviv', 'phone': '1', 'age': 50}).status_code, 403)
+        self.assertEqual(ProfileModel.objects.get(pk=self.user.profile.pk).age, self.user.profile.age)
+
+        self.client.force_authenticate(UserModel.objects.create_user('staff@example.com', 'password', is_staff=True))
+        self.assertEqual(self.patch(path, {'age': 50}).status_code, 200)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.patch(path, {'age': 60}).data['age'], 60)
+
+    def test_profile_update_honours_if_match(self):
+        path = f'/users/{self.user.profile.pk}/profile'
+        self.client.force_authenticate(self.user)
+        etag = self.client.get(path)['ETag']
+
+        response = self.patch(path, {'age': 50}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(path)['ETag'], response['ETag'])
+
+        response = self.patch(path, {'age': 60}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(response['ETag'], self.client.get(path)['ETag'])
+        self.assertEqual(ProfileModel.objects.get(pk=self.user.profile.pk).age, 50)
+
+    def test_patch_validates_and_creates_missing_profiles(self):
+        self.client.force_authenticate(UserModel.objects.create_superuser('admin@example.com', 'password'))
+        self.assertEqual(self.patch(f'/users/{self.user.pk}', {'profile': {'age': 'old'}}).status_code, 400)
+        self.assertEqual(self.patch(f'/users/{self.user.pk}', {'email': self.users[1].email}).status_code, 400)
+        self.assertEqual(self.patch('/users/0', {'email': 'new@example.com'}).status_code, 404)
+
+        user = UserModel.objects.create_user('bare@example.com', 'password')
+        response = self.patch(f'/users/{user.pk}', {'profile': {'city': 'Lviv'}})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('phone', response.data['profile'])
+        response = self.patch(f'/users/{user.pk}', {'profile': {'city': 'Lviv', 'phone': '1', 'age': 30}})
+        self.assertEqual(response.data['profile']['city'], 'Lviv')
+        self.assertEqual(self.client.get(f'/users/{user.pk}')['ETag'], response['ETag'])
+
+    def test_bulk_patch_applies_every_update_or_none(self):
+        self.assertEqual(self.patch('/users', [{'id': self.user.pk, 'first_name': 'New'}]).status_code, 401)
+        self.client.force_authenticate(UserModel.objects.create_superuser('admin@example.com', 'password'))
+        etags = [self.client.get(f'/users/{user.pk}')['ETag'] for user in self.users[:2]]
+
+        response = self.patch('/users', [
+            {'id': self.users[0].pk, 'if_match': etags[0], 'profile': {'age': 50}},
+            {'id': self.users[1].pk, 'profile': {'age': 'old'}},
+            {'id': 0, 'first_name': 'Nobody'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('age', response.data[1]['profile'])
+        self.assertIn('id', response.data[2])
+
+        response = self.patch('/users', [
+            {'id': self.users[0].pk, 'if_match': etags[0], 'profile': {'age': 50}},
+            {'id': self.users[1].pk, 'if_match': etags[1], 'first_name': 'Renamed'},
+            {'id': self.users[2].pk, 'profile': {'city': 'Odesa'}},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([user['profile']['age'] for user in response.data['results']], [50, 21, 22])
+        self.assertEqual(UserModel.objects.get(pk=self.users[1].pk).first_name, 'Renamed')
+        etag = self.client.get(f'/users/{self.users[0].pk}')['ETag']
+        self.assertEqual(response.data['etags'][str(self.users[0].pk)], etag)
+
+        response = self.patch('/users', [
+            {'id': self.users[0].pk, 'if_match': etags[0], 'profile': {'age': 60}},
+            {'id': self.users[2].pk, 'profile': {'city': 'Kyiv'}},
+        ])
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(response.data[1], {})
+        self.assertIn('if_match', response.data[0])
+        self.assertEqual(ProfileModel.objects.get(user=self.users[2]).city, 'Odesa')
+
+
+@override_settings(
+    PASSWORD_HASHERS=['core.hashing.hashers.PBKDF2PasswordHasher', 'core.hashing.hashers.Argon2PasswordHasher'],
+    PASSWORD_PBKDF2_ITERATIONS=1000,
+    PASSWORD_HASHING_WORKERS=1,
+)
+class PasswordHashingTestCase(APITestCase):
+    def test_acreate_user_hashes_on_pool(self):
+        user = async_to_sync(UserModel.objects.acreate_user)('async@example.com', 'secret')
+        user.refresh_from_db()
+        self.assertTrue(user.check_password('secret'))
+        self.assertEqual(identify_hasher(user.password).decode(user.password)['iterations'], 1000)
+
+    def test_password_is_rehashed_on_login_when_cost_changes(self):
+        user = UserModel.objects.create_user('cost@example.com', 'secret')
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            response = self.client.post('/auth/jwt/create', {'email': user.email, 'password': 'secret'})
+            self.assertEqual(response.status_code, 200)
+            user.refresh_from_db()
+            self.assertEqual(identify_hasher(user.password).decode(user.password)['iterations'], 2000)
+
+    def test_password_is_rehashed_when_preferred_hasher_changes(self):
+        user = UserModel.objects.create_user('argon@example.com', 'secret')
+        with self.settings(PASSWORD_HASHERS=['core.hashing.hashers.Argon2PasswordHasher',
+                                             'core.hashing.hashers.PBKDF2PasswordHasher']):
+            self.assertTrue(user.check_password('secret'))
+            self.assertTrue(user.password.startswith('argon2'))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AsyncUsersViewsTestCase(QueryCountAssertionsMixin, APITestCase):
+    def test_async_list_matches_sync_list(self):
+        create_users(3)
+        sync_data = self.client.get('/users').data
+        async_data = self.client.get('/users/async').json()
+        self.assertEqual(async_data['data'], sync_data['data'])
+
+    def test_async_list_falls_back_to_the_drf_serializer(self):
+        create_users(3)
+        sync_data = self.client.get('/users').data
+        with mock.patch('apps.users.async_views.compile_serializer', return_value=None):
+            response = self.client.get('/users/async')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'], sync_data['data'])
+
+    def test_async_create_retrieve_and_delete(self):
+        payload = {
+            'email': 'async@example.com', 'password': 'secret', 'profile': {'city': 'Kyiv', 'phone': '1', 'age': 20}
+        }
+        response = self.client.post('/users/async', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        pk = response.json()['id']
+        self.assertTrue(UserModel.objects.get(pk=pk).check_password('secret'))
+
+        response = self.client.get(f'/users/async/{pk}')
+        self.assertEqual(response.json()['profile']['city'], 'Kyiv')
+        response = self.client.get(f'/users/async/{pk}', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        self.assertEqual(self.client.delete(f'/users/async/{pk}').status_code, 204)
+        self.assertEqual(self.client.get(f'/users/async/{pk}').status_code, 404)
+
+    def test_async_and_sync_views_share_validators(self):
+        user = create_users(1)[0]
+        for sync_path, async_path in (
+            (f'/users/{user.pk}', f'/users/async/{user.pk}'),
+            (f'/users/{user.pk}?fields=id,email', f'/users/async/{user.pk}?fields=id,email'),
+            (f'/users/{user.profile.pk}/profile', f'/users/async/{user.profile.pk}/profile'),
+        ):
+            sync_response, async_response = self.client.get(sync_path), self.client.get(async_path)
+            self.assertEqual(async_response['ETag'], sync_response['ETag'])
+            self.assertEqual(async_response['Last-Modified'], sync_response['Last-Modified'])
+        # The ETag of the full user is the one `If-Match` is compared with by `PATCH /users/<pk>`.
+        self.assertEqual(self.client.get(f'/users/async/{user.pk}')['ETag'], get_user_etag(user))
+
+        last_modified = self.client.get(f'/users/async/{user.profile.pk}/profile')['Last-Modified']
+        response = self.client.get(f'/users/async/{user.profile.pk}/profile', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_async_profile_update(self):
+        user, other = create_users(2)
+        path = f'/users/async/{user.profile.pk}/profile'
+        response = self.client.patch(path, {'age': 42}, format='json')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response)
+        self.assertEqual(self.client.patch(path, {'age': 42}, HTTP_AUTHORIZATION='Bearer bad').status_code, 401)
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.patch(path, {'age': 42}, format='json').status_code, 403)
+
+        self.client.force_authenticate(user)
+        etag = self.client.get(path)['ETag']
+        response = self.client.patch(path, {'age': 42}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.json()['age'], 42)
+        self.assertEqual(ProfileModel.objects.get(pk=user.profile.pk).age, 42)
+        self.assertEqual(response['ETag'], self.client.get(path)['ETag'])
+
+        response = self.client.patch(path, {'age': 43}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(ProfileModel.objects.get(pk=user.profile.pk).age, 42)
+
+        response = self.client.patch(path, {'age': 'old'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class PerformanceMiddlewareTestCase(APITestCase):
+    def test_server_timing_reports_queries(self):
+        create_users(3)
+        with self.assertNumQueries(1) as context:
+            response = self.client.get('/users')
+        self.assertIn(f'queries;desc="{len(context.captured_queries)}"', response['Server-Timing'])
+        self.assertIn('render;dur=', response['Server-Timing'])
+
+    def test_server_timing_reports_serialization(self):
+        # Measured by the serializers of the API, not by patching DRF.
+        self.assertEqual(BaseSerializer.data.fget.__module__, 'rest_framework.serializers')
+        cache.clear()
+        user = create_users(1)[0]
+        for path in ('/users', f'/users/{user.pk}'):
+            metrics = self.client.get(path)['Server-Timing'].split(', ')
+            timing = dict(metric.split(';dur=') for metric in metrics if ';dur=' in metric)
+            self.assertGreater(float(timing['serialize']), 0)
+            self.assertLessEqual(float(timing['serialize']), float(timing['total']))
+
+    def test_metrics_endpoint_exposes_endpoint_histograms(self):
+        self.client.get('/users')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('http_request_duration_seconds_count{method="GET",endpoint="users",status="200"}', body)
+        self.assertIn('http_request_db_queries_bucket{method="GET",endpoint="users",status="200",le="+Inf"}', body)
+        self.assertIn('read_through_cache_requests_total{cache="users:user",result="hit"}', body)
+
+    @override_settings(PERFORMANCE_SLOW_REQUEST_MS=0)
+    def test_slow_request_logs_sql(self):
+        create_users(1)
+        with self.assertLogs('core.performance', 'WARNING') as logs:
+            self.client.get('/users')
+        self.assertIn('Slow request GET /users', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], AUTH_CLAIMS_ENABLED=True)
+class ClaimsAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        local_auth_cache.clear()
+        self.user = UserModel.objects.create_user('claims@example.com', 'secret', first_name='A', last_name='B')
+        response = self.client.post('/auth/jwt/create/', {'email': 'claims@example.com', 'password': 'secret'})
+        self.access, self.refresh = response.data['access'], response.data['refresh']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+
+    def test_token_carries_claims(self):
+        token = AccessToken(self.access)
+        self.assertEqual(token['ver'], self.user.token_version)
+        self.assertFalse(token['is_staff'])
+        self.assertEqual(token['sid'], RefreshToken(self.refresh)['jti'])
+
+    def test_user_is_loaded_once_and_then_served_from_cache(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/auth/users/me/')
+        self.assertEqual(response.data['email'], 'claims@example.com')
+        with self.assertNumQueries(0):
+            self.client.get('/auth/users/me/')
+
+    def test_password_change_revokes_tokens(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password('changed')
+            self.user.save()
+        self.assertEqual(self.client.get('/auth/users/me/').status_code, 401)
+        response = self.client.post('/auth/jwt/refresh/', {'refresh': self.refresh})
+        self.assertEqual(response.status_code, 401)
+
+    def test_deactivation_revokes_tokens(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            user = UserModel.objects.only('pk', 'is_active', 'token_version').get(pk=self.user.pk)
+            user.is_active = False
+            user.save(update_fields=['is_active'])
+        self.assertEqual(UserModel.objects.get(pk=self.user.pk).token_version, self.user.token_version + 1)
+        self.assertEqual(self.client.get('/auth/users/me/').status_code, 401)
+
+    def test_blacklisted_refresh_token_revokes_its_access_tokens(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            RefreshToken(self.refresh).blacklist()
+        self.assertEqual(self.client.get('/auth/users/me/').status_code, 401)
+
+    def test_evicted_version_marker_is_confirmed_in_the_database(self):
+        UserModel.objects.filter(pk=self.user.pk).update(token_version=F('token_version') + 1)
+        cache.clear()
+        local_auth_cache.clear()
+        self.assertEqual(self.client.get('/auth/users/me/').status_code, 401)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/auth/users/me/').status_code, 401)
+
+    def test_cached_user_has_no_password_hash(self):
+        self.assertEqual(self.client.get('/auth/users/me/').status_code, 200)
+        self.assertNotIn('password', cache.get(f'auth:user:{self.user.pk}').__dict__)
+
+        password = 'Changed-secret-1'
+        payload = {'current_password': 'secret', 'new_password': password, 're_new_password': password}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/auth/users/set_password/', payload)
+        self.assertEqual(response.status_code, 204)
+        self.assertTrue(UserModel.objects.get(pk=self.user.pk).check_password(password))
+        self.assertEqual(self.client.get('/auth/users/me/').status_code, 401)
+
+    def test_djoser_changes_are_recorded(self):
+        inactive = UserModel.objects.create_user('inactive@example.com', 'secret', is_active=False)
+        payload = {'uid': encode_uid(inactive.pk), 'token': default_token_generator.make_token(inactive)}
+        self.assertEqual(self.client.post('/auth/users/activation/', payload).status_code, 204)
+        self.assertEqual(self.client.patch('/auth/users/me/', {'first_name': 'C'}).status_code, 200)
+        payload = {'current_password': 'secret', 'new_email': 'new@example.com', 're_new_email': 'new@example.com'}
+        self.assertEqual(self.client.post('/auth/users/set_email/', payload).status_code, 204)
+        self.assertEqual(self.client.delete('/auth/users/me/', {'current_password': 'wrong'}).status_code, 400)
+        self.assertEqual(self.client.delete('/auth/users/me/', {'current_password': 'secret'}).status_code, 204)
+
+        changes = list(UserChangeModel.objects.order_by('pk').values('action', 'object_id', 'data'))
+        self.assertEqual(
+            [(change['action'], change['object_id']) for change in changes],
+            [('updated', inactive.pk), ('updated', self.user.pk), ('updated', self.user.pk),
+             ('deleted', self.user.pk)]
+        )
+        self.assertTrue(changes[0]['data']['is_active'])
+        self.assertEqual(changes[1]['data']['first_name'], 'C')
+        self.assertEqual(changes[2]['data']['email'], 'new@example.com')
+
+    @override_settings(AUTH_CLAIMS_ENABLED=False)
+    def test_tokens_are_checked_in_the_database_without_a_shared_cache(self):
+        self.assertEqual(self.client.get('/auth/users/me/').data['email'], 'claims@example.com')
+        # Revoked by another process, whose cache this one does not see.
+        UserModel.objects.filter(pk=self.user.pk).update(token_version=F('token_version') + 1)
+        self.assertEqual(self.client.get('/auth/users/me/').status_code, 401)
+        response = self.client.post('/auth/jwt/refresh/', {'refresh': self.refresh})
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], AUTH_CLAIMS_ENABLED=True)
+class TokenBlacklistTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        local_auth_cache.clear()
+        UserModel.objects.create_user('blacklist@example.com', 'secret')
+        response = self.client.post('/auth/jwt/create/', {'email': 'blacklist@example.com', 'password': 'secret'})
+        self.access, self.refresh = response.data['access'], response.data['refresh']
+
+    def test_refresh_checks_the_blacklist_table_once(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.post('/auth/jwt/refresh/', {'refresh': self.refresh}).status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.post('/auth/jwt/refresh/', {'refresh': self.refresh}).status_code, 200)
+
+    def test_token_blacklisted_before_the_cache_was_populated_is_refused(self):
+        RefreshToken(self.refresh).blacklist()
+        cache.clear()
+        local_auth_cache.clear()
+        self.assertEqual(self.client.post('/auth/jwt/refresh/', {'refresh': self.refresh}).status_code, 401)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.post('/auth/jwt/refresh/', {'refresh': self.refresh}).status_code, 401)
+
+    def test_verify_refuses_revoked_tokens(self):
+        self.assertEqual(self.client.post('/auth/jwt/verify/', {'token': self.access}).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            RefreshToken(self.refresh).blacklist()
+        self.assertEqual(self.client.post('/auth/jwt/verify/', {'token': self.access}).status_code, 401)
+        self.assertEqual(self.client.post('/auth/jwt/verify/', {'token': self.refresh}).status_code, 401)
+
+    def test_purge_expired_tokens(self):
+        user = UserModel.objects.get(email='blacklist@example.com')
+        expired = timezone.now() - timedelta(days=1)
+        tokens = OutstandingToken.objects.bulk_create(
+            [OutstandingToken(user=user, jti=f'expired-{i}', token='t', expires_at=expired) for i in range(5)]
+        )
+        BlacklistedToken.objects.create(token=tokens[0])
+        call_command('purge_expired_tokens', batch_size=2, stdout=StringIO())
+        self.assertFalse(OutstandingToken.objects.filter(expires_at__lte=timezone.now()).exists())
+        self.assertFalse(BlacklistedToken.objects.exists())
+        self.assertEqual(OutstandingToken.objects.count(), 1)
@@ -0,0 +1,230 @@
+import copy
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+    TokenVerifySerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+
+from core.cache.local import LocalTTLCache
+
+TOKEN_VERSION_KEY = 'auth:token-version:{}'
+REVOKED_SESSION_KEY = 'auth:revoked-session:{}'
+USER_KEY = 'auth:user:{}'
+
+local_auth_cache = LocalTTLCache(settings.AUTH_LOCAL_CACHE_TTL)
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token carrying the claims needed to authorise requests without loading the user.
+
+    - `ver`: The `token_version` of the user when the token was issued.
+    - `is_staff`, `is_superuser`: The privileges of the user.
+    - `sid`: In access tokens, the ID of the refresh token they were issued from, so that
+      blacklisting the refresh token also revokes them.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        """Return a refresh token for `user`, with its claims."""
+        token = super().for_user(user)
+        token['ver'] = user.token_version
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        if settings.AUTH_CLAIMS_ENABLED:
+            # The first requests with the token then find the version without a query. `add` never
+            # overwrites a revocation recorded since the user was loaded.
+            cache.add(TOKEN_VERSION_KEY.format(user.pk), user.token_version, timeout=get_revocation_timeout())
+        return token
+
+    @property
+    def access_token(self):
+        """Return an access token created from this refresh token, linked to it by `sid`."""
+        access = super().access_token
+        access['sid'] = self[api_settings.JTI_CLAIM]
+        return access
+
+    def check_blacklist(self):
+        """Refuse the token if it was blacklisted or its user's tokens were revoked, without a query if cached."""
+        if is_token_revoked(self, session_id=self[api_settings.JTI_CLAIM], check_database=True):
+            raise TokenError(_('Token is blacklisted'))
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Serializer for obtaining a token pair with the user claims."""
+
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Serializer for refreshing an access token, refusing refresh tokens that were revoked."""
+
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenVerifySerializer(TokenVerifySerializer):
+    """Serializer for verifying a token, refusing tokens that were revoked or blacklisted."""
+
+    def validate(self, attrs):
+        """Check the token is valid and was not revoked."""
+        token = UntypedToken(attrs['token'])
+        if token.get(api_settings.TOKEN_TYPE_CLAIM) == ClaimsRefreshToken.token_type:
+            revoked = is_token_revoked(token, session_id=token[api_settings.JTI_CLAIM], check_database=True)
+        else:
+            revoked = is_token_revoked(token)
+        if revoked:
+            raise InvalidToken(_('Token has been revoked'))
+        return {}
+
+
+class ClaimsTokenStrategy:
+    """Social auth token strategy issuing tokens with the user claims."""
+
+    @classmethod
+    def obtain(cls, user):
+        """Return a token pair for a user who logged in with a social provider."""
+        refresh = ClaimsRefreshToken.for_user(user)
+        return {
+            'access': str(refresh.access_token),
+            'refresh': str(refresh),
+            'user': user,
+        }
+
+
+def is_token_revoked(token, session_id=None, check_database=False):
+    """Return whether the user's tokens were revoked after `token` was issued, or its session was.
+
+    The revocation markers are looked up in the local tier first and then in the shared cache,
+    with one round trip at most. A missing version marker, e.g. one evicted from the shared
+    cache, is confirmed against the `token_version` of the user and cached again. With
+    `check_database`, a missing session marker is confirmed against the blacklist table
+    instead, and the answer is cached for `TOKEN_BLACKLIST_CACHE_TIMEOUT`, so that refresh tokens
+    blacklisted before the cache was populated are still refused.
+
+    Without `AUTH_CLAIMS_ENABLED` the cache is not shared by the processes, so it would only
+    hold the revocations made by this one, and everything is looked up in the database.
+
+    :param token: A validated token.
+    :type token: Token
+    :param session_id: The ID of the refresh token the token belongs to, `sid` by default.
+    :type session_id: str | None
+    :param check_database: Whether an unknown session is looked up in the blacklist table.
+    :type check_database: bool
+    :return: Whether the token must be refused.
+    :rtype: bool
+    """
+    user_id = token[api_settings.USER_ID_CLAIM]
+    session_id = session_id or token.get('sid')
+    if not settings.AUTH_CLAIMS_ENABLED:
+        if token.get('ver', 0) < get_token_version(user_id):
+            return True
+        return bool(session_id) and BlacklistedToken.objects.filter(token__jti=session_id).exists()
+
+    version_key = TOKEN_VERSION_KEY.format(user_id)
+    keys = [version_key]
+    if session_id:
+        keys.append(REVOKED_SESSION_KEY.format(session_id))
+
+    markers = local_auth_cache.get_many(keys)
+    missing = [key for key in keys if key not in markers]
+    if missing:
+        fetched = cache.get_many(missing)
+        for key in missing:
+            markers[key] = fetched.get(key)
+            local_auth_cache.set(key, markers[key])
+
+    if markers[version_key] is None:
+        markers[version_key] = get_token_version(user_id)
+        # `add` never overwrites a revocation recorded since the query.
+        cache.add(version_key, markers[version_key], timeout=get_revocation_timeout())
+        local_auth_cache.set(version_key, markers[version_key])
+    if token.get('ver', 0) < markers[version_key]:
+        return True
+    if not session_id:
+        return False
+
+    session_key = keys[1]
+    if markers[session_key] is None and check_database:
+        markers[session_key] = BlacklistedToken.objects.filter(token__jti=session_id).exists()
+        if markers[session_key]:
+            cache.set(session_key, True, timeout=get_revocation_timeout())
+        else:
+            # `add` never overwrites a blacklisting recorded since the query.
+            cache.add(session_key, False, timeout=settings.TOKEN_BLACKLIST_CACHE_TIMEOUT)
+        local_auth_cache.set(session_key, markers[session_key])
+    return bool(markers[session_key])
+
+
+def get_token_version(user_id):
+    """Return the `token_version` of the user from the database, `math.inf` if it was deleted."""
+    from apps.users.models import UserModel
+
+    version = UserModel.objects.filter(pk=user_id).values_list('token_version', flat=True).first()
+    return math.inf if version is None else version
+
+
+def get_revocation_timeout():
+    """Return how long (in seconds) a revocation marker must be kept, the longest lifetime of a token."""
+    return int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+
+
+def revoke_user_tokens(user_id, token_version):
+    """Refuse the tokens of the user issued before `token_version`, for as long as they can live.
+
+    Passing `math.inf` refuses all of them, e.g. once the user is deleted.
+    """
+    key = TOKEN_VERSION_KEY.format(user_id)
+    cache.set(key, token_version, timeout=get_revocation_timeout())
+    local_auth_cache.set(key, token_version)
+    invalidate_cached_user(user_id)
+
+
+def revoke_session(jti, expires_at):
+    """Refuse the refresh token `jti` and the access tokens issued from it, for as long as they can live.
+
+    :param jti: The ID of the refresh token.
+    :type jti: str
+    :param expires_at: When the refresh token expires, access tokens may outlive it by their lifetime.
+    :type expires_at: datetime
+    """
+    key = REVOKED_SESSION_KEY.format(jti)
+    timeout = (expires_at - timezone.now() + api_settings.ACCESS_TOKEN_LIFETIME).total_seconds()
+    cache.set(key, True, timeout=max(int(timeout), 1))
+    local_auth_cache.set(key, True)
+
+
+def get_cached_user(user_id):
+    """Return the user from the local tier, the shared cache or the database, in that order.
+
+    The password hash is never cached, it is loaded on access, e.g. to check the current
+    password. Every caller gets its own copy, so changing it does not affect the cached user.
+
+    :raises UserModel.DoesNotExist: If the user does not exist.
+    """
+    from apps.users.models import UserModel
+
+    key = USER_KEY.format(user_id)
+    user = local_auth_cache.get(key)
+    if user is None:
+        user = cache.get(key)
+        if user is None:
+            user = UserModel.objects.defer('password').get(pk=user_id)
+            cache.set(key, user, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+        local_auth_cache.set(key, user)
+    return copy.copy(user)
+
+
+def invalidate_cached_user(user_id):
+    """Drop the cached user, other processes drop their local copy within `AUTH_LOCAL_CACHE_TTL`."""
+    key = USER_KEY.format(user_id)
+    cache.delete(key)
+    local_auth_cache.delete(key)
@@ -0,0 +1,239 @@
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.db.models.signals import post_save
+from django.utils import timezone
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from apps.users.changes import record_changes
+from apps.users.models import ProfileModel, UserChangeModel, UserModel
+from apps.users.serializers import ProfileSerializer, UserUpdateSerializer
+from core.cache.read_through import make_version_etag
+
+
+class PreconditionFailed(APIException):
+    """The resource was modified since the client read it."""
+
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The resource was modified since it was read.'
+    default_code = 'precondition_failed'
+
+
+def get_user_etag(user):
+    """Return the ETag of the full representation of `user` and its profile, as served by `GET /users/<pk>`."""
+    profile = getattr(user, 'profile', None)
+    return make_version_etag((user.updated_at, profile.updated_at if profile else None))
+
+
+def etag_matches(if_match, etag):
+    """Return whether an `If-Match` value matches `etag`."""
+    etags = parse_etags(if_match)
+    return '*' in etags or etag in etags
+
+
+class UserUpdater:
+    """Apply partial updates of users and of their profiles, all in one transaction.
+
+    Only the changed columns are written, with one `UPDATE` per table and set of changed columns.
+    Conditional updates are optimistic: no row is locked while the users are read and validated,
+    and the `UPDATE`s only match the rows whose `updated_at` is still the one that was read. If
+    another request changed one since, nothing is saved and `PreconditionFailed` is raised.
+
+    `bulk_update` does not send `post_save`, so it is sent for every saved row: the receivers
+    invalidating the cached representations run as if the rows were saved one by one.
+    """
+
+    def __init__(self, context=None):
+        """Initialize the updater.
+
+        :param context: The context of the serializers validating the updates.
+        :type context: dict | None
+        """
+        self.context = context or {}
+
+    @staticmethod
+    def load(pks):
+        """Return the users `pks` with their profiles, by primary key."""
+        return UserModel.objects.select_related('profile').in_bulk(pks)
+
+    def validate(self, user, data):
+        """Return the validated partial update `data` of `user`.
+
+        A profile is created for a user that has none, so its fields are then all required.
+
+        :raises ValidationError: If `data` is invalid.
+        """
+        serializer = UserUpdateSerializer(user, data=data, partial=True, context=self.context)
+        serializer.is_valid(raise_exception=True)
+        validated_data = dict(serializer.validated_data)
+
+        if 'profile' in validated_data and getattr(user, 'profile', None) is None:
+            profile = ProfileSerializer(data=data['profile'], context=self.context)
+            if not profile.is_valid():
+                raise ValidationError({'profile': profile.errors})
+            validated_data['profile'] = profile.validated_data
+        return validated_data
+
+    def update_many(self, items):
+        """Validate and apply the updates of a bulk request, all of them or none.
+
+        :param items: The updates, as dicts with the `id` of the user, the changed fields and
+            optionally `if_match`, an ETag the user must still have.
+        :type items: list[dict]
+        :return: The updated users.
+        :rtype: list[UserModel]
+        :raises ValidationError: With the errors of every item, if one is invalid.
+        :raises PreconditionFailed: With the conflicts of every item, if a user does not match its `if_match`.
+        """
+        pks = [item.get('id') for item in items if isinstance(item, dict)]
+        users = self.load([pk for pk in pks if isinstance(pk, int)])
+        errors, updates, conflicts, seen = [], [], [], set()
+        for item in items:
+            if not isinstance(item, dict):
+                errors.append({'non_field_errors': ['Expected an object.']})
+                continue
+            user = users.get(item.get('id')) if isinstance(item.get('id'), int) else None
+            if user is None or user.pk in seen:
+                errors.append({'id': ['Duplicate user.' if user else 'Unknown user.']})
+                continue
+            seen.add(user.pk)
+
+            if_match = item.get('if_match')
+            data = {name: value for name, value in item.items() if name not in ('id', 'if_match')}
+            try:
+                updates.append((user, self.validate(user, data), if_match is not None))
+            except ValidationError as exc:
+                errors.append(exc.detail)
+                continue
+            errors.append({})
+            if if_match is not None and not etag_matches(str(if_match), get_user_etag(user)):
+                conflicts.append({'if_match': [PreconditionFailed.default_detail]})
+            else:
+                conflicts.append({})
+
+        if any(errors):
+            raise ValidationError(errors)
+        if any(conflicts):
+            raise PreconditionFailed(conflicts)
+        self.save(updates)
+        return [user for user, _, _ in updates]
+
+    def save(self, updates):
+        """Save the validated updates in one transaction.
+
+        :param updates: The `(user, validated_data, conditional)` of every update. A conditional
+            update is only saved if the user and its profile were not modified since they were loaded.
+        :type updates: Iterable[tuple[UserModel, dict, bool]]
+        :raises PreconditionFailed: If a conditional update no longer applies.
+        """
+        now = timezone.now()
+        # Changed rows, by model and changed columns, and the unchanged rows of conditional updates,
+        # with the `updated_at` they must still have (`None` when the update is unconditional).
+        changed = {UserModel: defaultdict(list), ProfileModel: defaultdict(list)}
+        unchanged = {UserModel: [], ProfileModel: []}
+        created = []
+        for user, data, conditional in updates:
+            data = dict(data)
+            profile_data = data.pop('profile', {})
+            rows = [(user, data)]
+            if getattr(user, 'profile', None) is not None:
+                rows.append((user.profile, profile_data))
+            elif profile_data:
+                user.profile = ProfileModel(**profile_data, user=user)
+                created.append(user.profile)
+
+            for instance, values in rows:
+                expected = instance.updated_at if conditional else None
+                fields = self._assign(instance, values, now)
+                if fields:
+                    changed[type(instance)][fields].append((instance, expected))
+                elif conditional:
+                    unchanged[type(instance)].append((instance, expected))
+
+        try:
+            with transaction.atomic():
+                for model in (UserModel, ProfileModel):
+                    for fields, rows in changed[model].items():
+                        self._update(model, rows, fields)
+                    if unchanged[model]:
+                        self._check(model, unchanged[model])
+                ProfileModel.objects.bulk_create(created)
+                self._send_post_save(changed, created)
+                self._record_changes(changed, created)
+        except IntegrityError as exc:
+            # A unique email or the profile of a user was taken by a concurrent request.
+            raise PreconditionFailed() from exc
+
+    def save_profile(self, profile, data, conditional):
+        """Save the validated update of a profile alone, like `save` saves those of users.
+
+        :param profile: The profile, as loaded before the update was validated.
+        :type profile: ProfileModel
+        :param data: The validated fields of the profile.
+        :type data: dict
+        :param conditional: Whether the update is only saved if the profile was not modified since it was loaded.
+        :type conditional: bool
+        :raises PreconditionFailed: If a conditional update no longer applies.
+        """
+        rows = [(profile, profile.updated_at if conditional else None)]
+        fields = self._assign(profile, data, timezone.now())
+        with transaction.atomic():
+            if fields:
+                changed = {ProfileModel: {fields: rows}}
+                self._update(ProfileModel, rows, fields)
+                self._send_post_save(changed, [])
+                self._record_changes(changed, [])
+            elif conditional:
+                self._check(ProfileModel, rows)
+
+    @staticmethod
+    def _assign(instance, values, now):
+        fields = tuple(sorted(name for name, value in values.items() if getattr(instance, name) != value))
+        for name in fields:
+            setattr(instance, name, values[name])
+        if fields:
+            instance.updated_at = now
+            fields += ('updated_at',)
+        return fields
+
+    @staticmethod
+    def _condition(rows):
+        return reduce(
+            or_, (Q(pk=instance.pk) if expected is None else Q(pk=instance.pk, updated_at=expected)
+                  for instance, expected in rows)
+        )
+
+    def _update(self, model, rows, fields):
+        objs = [instance for instance, _ in rows]
+        if model.objects.filter(self._condition(rows)).bulk_update(objs, fields) != len(objs):
+            raise PreconditionFailed()
+
+    def _check(self, model, rows):
+        # Locks the rows until the commit if they are unchanged, so they cannot change before it.
+        if model.objects.filter(self._condition(rows)).update(updated_at=F('updated_at')) != len(rows):
+            raise PreconditionFailed()
+
+    @staticmethod
+    def _send_post_save(changed, created):
+        for model, groups in changed.items():
+            for fields, rows in groups.items():
+                for instance, _ in rows:
+                    post_save.send(
+                        model, instance=instance, created=False, update_fields=frozenset(fields), raw=False,
+                        using=instance._state.db
+                    )
+        for profile in created:
+            post_save.send(
+                ProfileModel, instance=profile, created=True, update_fields=None, raw=False, using=profile._state.db
+            )
+
+    @staticmethod
+    def _record_changes(changed, created):
+        updated = [instance for groups in changed.values() for rows in groups.values() for instance, _ in rows]
+        record_changes(updated, UserChangeModel.Action.UPDATED)
+        record_changes(created, UserChangeModel.Action.CREATED)
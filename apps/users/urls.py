@@ -1,9 +1,25 @@
 from django.urls import path
 
-from .views import UserProfileUpdateView, UserRetrieveUpdateDestroyView, UsersListCreateView
+from .async_views import AsyncUserProfileView, AsyncUserRetrieveDestroyView, AsyncUsersListCreateView
+from .views import (
+    UserChangesStreamView,
+    UserChangesView,
+    UserProfileUpdateView,
+    UserRetrieveUpdateDestroyView,
+    UsersExportView,
+    UsersImportView,
+    UsersListCreateView,
+)
 
 urlpatterns = [
     path('', UsersListCreateView.as_view(), name='users_list_create'),
+    path('/import', UsersImportView.as_view(), name='users_import'),
+    path('/export', UsersExportView.as_view(), name='users_export'),
+    path('/changes', UserChangesView.as_view(), name='users_changes'),
+    path('/changes/stream', UserChangesStreamView.as_view(), name='users_changes_stream'),
     path('/<int:pk>', UserRetrieveUpdateDestroyView.as_view(), name='user_retrieve_update_delete'),
     path('/<int:pk>/profile', UserProfileUpdateView.as_view(), name='users_profile_update'),
+    path('/async', AsyncUsersListCreateView.as_view(), name='users_list_create_async'),
+    path('/async/<int:pk>', AsyncUserRetrieveDestroyView.as_view(), name='user_retrieve_delete_async'),
+    path('/async/<int:pk>/profile', AsyncUserProfileView.as_view(), name='users_profile_update_async'),
 ]
@@ -1,39 +1,335 @@
-import logging
+from contextlib import nullcontext
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from rest_framework.generics import ListCreateAPIView, RetrieveDestroyAPIView, UpdateAPIView
-from rest_framework.permissions import AllowAny
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from djoser.utils import decode_uid
+from djoser.views import UserViewSet
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.generics import ListCreateAPIView, RetrieveDestroyAPIView, RetrieveUpdateAPIView
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from .models import ProfileModel
+from core.cache.mixins import CachedRetrieveMixin, get_validator_headers, resolve_field
+from core.pagination.keyset_pagination import KeysetPagination
+from core.renderers.streaming import CSVRenderer, EventStreamRenderer, NDJSONRenderer
+from core.serializers.compiled import compile_serializer
+
+from .bulk_import import IMPORT_FORMATS, UserImporter, iter_import_rows
+from .caches import profile_detail_cache, user_detail_cache
+from .changes import change_waiters, iter_change_pages, record_changes, record_user_deletion, wait_for_changes
+from .export import UserExporter
+from .filters import UserFilterBackend
+from .models import ProfileModel, UserChangeModel
 from .models import UserModel as User
-from .serializers import ProfileSerializer, UserAccountSerializer
+from .permissions import IsOwnerOrStaff
+from .serializers import ProfileSerializer, UserAccountSerializer, UserChangesSerializer, UserExportSerializer
+from .updates import UserUpdater, get_user_etag
 
-logger = logging.getLogger(__name__)
 UserModel: User = get_user_model()
 
 
 class UsersListCreateView(ListCreateAPIView):
-    """API view for listing and creating users."""
+    """API view for listing, creating and bulk updating users."""
 
-    logger.info('Information incoming!')
     queryset = User.objects.all()
     serializer_class = UserAccountSerializer
     permission_classes = (AllowAny,)
+    pagination_class = KeysetPagination
+    filter_backends = (UserFilterBackend,)
+
+    def get_queryset(self):
+        """Return the users with only the columns and joins of the requested fieldset."""
+        return super().get_queryset().for_serializer(self.get_serializer())
+
+    def list(self, request, *args, **kwargs):
+        """Return a page of users rendered from rows of the compiled serializer, without model instances."""
+        serializer = compile_serializer(self.get_serializer())
+        if serializer is None:
+            return super().list(request, *args, **kwargs)
+
+        ordering = (field.lstrip('-') for field in self.paginator.ordering)
+        queryset = serializer.values_list(self.filter_queryset(super().get_queryset()), ordering)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(serializer.render_many(page))
+
+    def get_permissions(self):
+        """Let only staff users update users in bulk."""
+        if self.request.method == 'PATCH':
+            return [IsAdminUser()]
+        return super().get_permissions()
+
+    def patch(self, request, *args, **kwargs):
+        """Update many users and their profiles in one transaction, all of them or none.
+
+        Every item holds the `id` of a user, the fields to change and optionally `if_match`, an
+        ETag the user must still have. The updated users are returned with their new ETags.
+        """
+        if not isinstance(request.data, list) or not request.data:
+            raise ValidationError({'non_field_errors': ['Expected a non-empty list of updates.']})
+        if len(request.data) > settings.USERS_BULK_UPDATE_MAX_SIZE:
+            raise ValidationError(
+                {'non_field_errors': [f'Expected at most {settings.USERS_BULK_UPDATE_MAX_SIZE} updates.']}
+            )
 
+        users = UserUpdater(self.get_serializer_context()).update_many(request.data)
+        return Response(
+            {
+                'results': self.get_serializer(users, many=True).data,
+                'etags': {str(user.pk): get_user_etag(user) for user in users},
+            }
+        )
 
-class UserProfileUpdateView(UpdateAPIView):
-    """API view for updating user profiles."""
 
-    logger.info('Information incoming!')
+class UserProfileUpdateView(CachedRetrieveMixin, RetrieveUpdateAPIView):
+    """API view for retrieving and updating user profiles.
+
+    Users can only update their own profile, staff users any profile.
+    """
+
     queryset = ProfileModel.objects.all()
     serializer_class = ProfileSerializer
     permission_classes = (AllowAny,)
+    detail_cache = profile_detail_cache
+
+    def get_permissions(self):
+        """Let only the user itself and staff users update a profile."""
+        if self.request.method in ('PUT', 'PATCH'):
+            return [IsAuthenticated(), IsOwnerOrStaff()]
+        return super().get_permissions()
+
+    def update(self, request, *args, **kwargs):
+        """Update the changed fields of the profile.
+
+        With `If-Match` or `If-Unmodified-Since`, the update is only saved if the profile was not
+        modified since the client read it, else 412 is returned.
+        """
+        profile = self.get_object()
+        response = self.get_conditional_response(request, self.make_validators([profile.updated_at]))
+        if response is not None:
+            return response
+
+        serializer = self.get_serializer(profile, data=request.data, partial=kwargs.pop('partial', False))
+        serializer.is_valid(raise_exception=True)
+        conditional = 'If-Match' in request.headers or 'If-Unmodified-Since' in request.headers
+        UserUpdater(self.get_serializer_context()).save_profile(profile, serializer.validated_data, conditional)
+        return Response(
+            self.get_serializer(profile).data, headers=get_validator_headers(self.make_validators([profile.updated_at]))
+        )
+
 
+class UserRetrieveUpdateDestroyView(CachedRetrieveMixin, RetrieveDestroyAPIView):
+    """API view for retrieving, updating, and destroying user accounts.
 
-class UserRetrieveUpdateDestroyView(RetrieveDestroyAPIView):
-    """API view for retrieving, updating, and destroying user accounts."""
+    `PATCH` updates the user and its nested profile at once, e.g. `{"email": ..., "profile": {"city": ...}}`.
+    Users can only update their own account, staff users any account.
+    """
 
-    logger.info('Information incoming!')
     queryset = User.objects.all()
     serializer_class = UserAccountSerializer
     permission_classes = (AllowAny,)
+    detail_cache = user_detail_cache
+
+    def get_queryset(self):
+        """Return the users with only the columns and joins of the requested fieldset."""
+        return super().get_queryset().for_serializer(self.get_serializer(), self.get_validator_fields())
+
+    def get_permissions(self):
+        """Let only the user itself and staff users update a user."""
+        if self.request.method == 'PATCH':
+            return [IsAuthenticated(), IsOwnerOrStaff()]
+        return super().get_permissions()
+
+    def patch(self, request, *args, **kwargs):
+        """Update fields of the user and of its profile in one transaction.
+
+        With `If-Match` or `If-Unmodified-Since`, the update is only saved if the user and its
+        profile were not modified since the client read them, else 412 is returned.
+        """
+        updater = UserUpdater(self.get_serializer_context())
+        user = updater.load([kwargs['pk']]).get(kwargs['pk'])
+        if user is None:
+            raise NotFound()
+        self.check_object_permissions(request, user)
+
+        response = self.get_conditional_response(request, self.get_user_validators(user))
+        if response is not None:
+            return response
+        conditional = 'If-Match' in request.headers or 'If-Unmodified-Since' in request.headers
+        updater.save([(user, updater.validate(user, request.data), conditional)])
+        return Response(self.get_serializer(user).data, headers=get_validator_headers(self.get_user_validators(user)))
+
+    def get_user_validators(self, user):
+        """Return the validators of the full representation of `user`."""
+        return self.make_validators([resolve_field(user, field) for field in self.get_validator_fields()])
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        """Delete the user with its profile, recording both deletions in the change feed."""
+        record_user_deletion(instance)
+        super().perform_destroy(instance)
+
+    def get_validator_fields(self):
+        """Return the `updated_at` of the user, and of its profile when the profile is rendered."""
+        if 'profile' in self.get_serializer().fields:
+            return 'updated_at', 'profile__updated_at'
+        return ('updated_at',)
+
+    def get_cache_variant(self):
+        """Cache each requested fieldset of a user separately."""
+        return self.get_serializer().fieldset_variant
+
+
+class UsersImportView(APIView):
+    """API view for importing users with their profiles from a CSV or NDJSON upload."""
+
+    parser_classes = (MultiPartParser,)
+    permission_classes = (IsAdminUser,)
+
+    def post(self, request, *args, **kwargs):
+        """Import the uploaded `file` and report the errors of the rejected rows."""
+        upload = request.data.get('file')
+        if upload is None:
+            raise ValidationError({'file': ['No file was submitted.']})
+
+        import_format = request.data.get('format') or upload.name.rpartition('.')[2].lower()
+        if import_format == 'jsonl':
+            import_format = 'ndjson'
+        if import_format not in IMPORT_FORMATS:
+            raise ValidationError({'format': [f'Expected one of: {", ".join(IMPORT_FORMATS)}.']})
+
+        return Response(UserImporter().run(iter_import_rows(upload, import_format)))
+
+
+class UsersExportView(APIView):
+    """API view for streaming every user with its profile as NDJSON or CSV.
+
+    The format is negotiated from the `Accept` header or the `format` query parameter, and
+    `since` limits the export to the users updated since then. The `X-Export-Until` header holds
+    the `since` of the next incremental export.
+    """
+
+    permission_classes = (IsAdminUser,)
+    renderer_classes = (NDJSONRenderer, CSVRenderer)
+
+    def get(self, request, *args, **kwargs):
+        """Stream the exported users, read from a server-side cursor."""
+        serializer = UserExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        exporter = UserExporter(since=serializer.validated_data.get('since'))
+
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.render_rows(exporter.fieldnames, exporter.iter_rows()),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = f'attachment; filename="users.{renderer.format}"'
+        response['X-Export-Until'] = exporter.until.isoformat()
+        return response
+
+
+class UserChangesView(APIView):
+    """API view for reading the change feed of users and profiles, with long polling.
+
+    The changes after the position `after` are returned with the `cursor` to pass as `after` next
+    time. When there are none yet, the request waits up to `wait` seconds for one, unless
+    `USERS_CHANGES_MAX_WAITERS` requests already wait in the process: it is answered with 503.
+    """
+
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request, *args, **kwargs):
+        """Return a page of changes, waiting for one if requested."""
+        serializer = UserChangesSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        after = serializer.validated_data['after']
+        wait = min(serializer.validated_data['wait'], settings.USERS_CHANGES_MAX_WAIT)
+
+        with change_waiters.hold() if wait else nullcontext():
+            changes = wait_for_changes(after, serializer.validated_data.get('limit'), wait)
+        return Response({'changes': changes, 'cursor': changes[-1]['sequence'] if changes else after})
+
+
+class UserChangesStreamView(APIView):
+    """API view for following the change feed of users and profiles as server-sent events.
+
+    Every change is an event of type `<kind>.<action>` whose ID is its position in the feed. The
+    stream starts after the `Last-Event-ID` header, or else the `after` parameter, and is closed
+    after `USERS_CHANGES_STREAM_TIMEOUT` seconds: clients reconnect from their last event. Streams
+    count towards `USERS_CHANGES_MAX_WAITERS` until they are closed.
+    """
+
+    permission_classes = (IsAdminUser,)
+    renderer_classes = (EventStreamRenderer,)
+
+    def get(self, request, *args, **kwargs):
+        """Stream the changes as they are committed."""
+        params = request.query_params.copy()
+        if 'Last-Event-ID' in request.headers:
+            params['after'] = request.headers['Last-Event-ID']
+        serializer = UserChangesSerializer(data=params)
+        serializer.is_valid(raise_exception=True)
+
+        pages = iter_change_pages(serializer.validated_data['after'], serializer.validated_data.get('limit'))
+        events = (
+            [
+                {'id': change['sequence'], 'event': f'{change["kind"]}.{change["action"]}', 'data': change}
+                for change in page
+            ]
+            for page in pages
+        )
+        response = StreamingHttpResponse(
+            change_waiters.hold_while_streaming(request.accepted_renderer.render_events(events, retry=1000)),
+            content_type='text/event-stream; charset=utf-8',
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Stops nginx from buffering the events.
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class AuthUserViewSet(UserViewSet):
+    """Djoser's `/auth/users` endpoints, recording the changes of the users in the change feed.
+
+    Djoser saves the users outside of a transaction, so the actions changing one run in a
+    transaction in which the change is recorded: by the receivers of the `user_activated` and
+    `user_updated` signals, or here for the actions sending none.
+    """
+
+    @transaction.atomic
+    def perform_update(self, serializer, *args, **kwargs):
+        """Save the user, which is recorded by the receiver of `user_updated`."""
+        super().perform_update(serializer, *args, **kwargs)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        """Delete the user, recording the deletion in the change feed."""
+        record_user_deletion(instance)
+        super().perform_destroy(instance)
+
+    @action(['post'], detail=False)
+    def activation(self, request, *args, **kwargs):
+        """Activate the user, which is recorded by the receiver of `user_activated`."""
+        with transaction.atomic():
+            return super().activation(request, *args, **kwargs)
+
+    @action(['post'], detail=False, url_path=f'set_{User.USERNAME_FIELD}')
+    def set_username(self, request, *args, **kwargs):
+        """Change the email of the current user, recording the change in the change feed."""
+        with transaction.atomic():
+            response = super().set_username(request, *args, **kwargs)
+            record_changes([request.user], UserChangeModel.Action.UPDATED)
+        return response
+
+    @action(['post'], detail=False, url_path=f'reset_{User.USERNAME_FIELD}_confirm')
+    def reset_username_confirm(self, request, *args, **kwargs):
+        """Change the email of the user of a reset link, recording the change in the change feed."""
+        with transaction.atomic():
+            response = super().reset_username_confirm(request, *args, **kwargs)
+            user = UserModel.objects.get(pk=decode_uid(request.data['uid']))
+            record_changes([user], UserChangeModel.Action.UPDATED)
+        return response
@@ -1,4 +1,13 @@
+from .cache_conf import *
+from .db_conf import *
 from .djoser_conf import *
 from .email_conf import *
+from .health_conf import *
 from .jwt_conf import *
+from .logging_conf import *
+from .password_conf import *
+from .performance_conf import *
 from .rest_conf import *
+from .server_conf import *
+from .throttle_conf import *
+from .users_conf import *
@@ -0,0 +1,27 @@
+import os
+
+REDIS_HOST = os.environ.get('REDIS_HOST')
+REDIS_PORT = os.environ.get('REDIS_PORT', 6379)
+REDIS_URL = os.environ.get('REDIS_URL') or (f'redis://{REDIS_HOST}:{REDIS_PORT}/0' if REDIS_HOST else None)
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    # In-process LRU tier, used by the tests and when the service runs without Redis.
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'meduzzen',
+            'OPTIONS': {
+                'MAX_ENTRIES': int(os.environ.get('LOCAL_CACHE_MAX_ENTRIES', 10000)),
+            },
+        }
+    }
+
+API_CACHE_TIMEOUT = int(os.environ.get('API_CACHE_TIMEOUT', 300))
+API_CACHE_VERSION = 2
@@ -0,0 +1,20 @@
+import os
+
+from .server_conf import WEB_CONCURRENCY, WEB_THREADS
+
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE') or 60)
+DB_POOL_ENABLED = os.environ.get('DB_POOL_ENABLED', '').lower() in ('1', 'true')
+
+# Behind pgbouncer in transaction mode, server-side cursors do not survive between statements.
+DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER', '').lower() in ('1', 'true')
+
+# Every worker process gets an equal share of the connections left after the reserved ones,
+# and never more than it has threads to use them.
+DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS') or 100)
+DB_RESERVED_CONNECTIONS = int(os.environ.get('DB_RESERVED_CONNECTIONS') or 10)
+DB_POOL_MAX_SIZE = int(
+    os.environ.get('DB_POOL_MAX_SIZE')
+    or max(1, min(WEB_THREADS, (DB_MAX_CONNECTIONS - DB_RESERVED_CONNECTIONS) // WEB_CONCURRENCY))
+)
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT') or 5)
+DB_POOL_MAX_IDLE = float(os.environ.get('DB_POOL_MAX_IDLE') or 300)
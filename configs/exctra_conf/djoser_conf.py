@@ -11,13 +11,16 @@ DJOSER = {
     'ACTIVATION_URL': 'activate/{uid}/{token}',
     'SEND_ACTIVATION_EMAIL': True,
     'HIDE_USERS': False,
-    'SOCIAL_AUTH_TOKEN_STRATEGY': 'djoser.social.token.jwt.TokenStrategy',
+    # Authentication uses JWTs, there are no authtoken tokens to delete on logout.
+    'TOKEN_MODEL': None,
+    'SOCIAL_AUTH_TOKEN_STRATEGY': 'apps.users.tokens.ClaimsTokenStrategy',
     'SOCIAL_AUTH_ALLOWED_REDIRECT_URIS': ['http://localhost:8000/google', 'http://localhost:8000/facebook'],
     'SERIALIZERS': {
         'user_create': 'apps.users.serializers.UserCreateSerializers',
-        'user': 'apps.users.serializers.UserCreateSerializers',
-        'current_user': 'apps.users.serializers.UserCreateSerializers',
-        'user_delete': 'djoser.serializers.UserCreateSerializer'
+        # Without the password, which is changed with set_password, and with the email changed with set_email.
+        'user': 'djoser.serializers.UserSerializer',
+        'current_user': 'djoser.serializers.UserSerializer',
+        'user_delete': 'djoser.serializers.UserDeleteSerializer',
     },
 
 }
@@ -1,8 +1,30 @@
 import os
 
-EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND')
+# Mails sent while serving requests are only queued, the `send_queued_emails` worker delivers
+# them with the delivery backend, which is the SMTP backend unless EMAIL_BACKEND says otherwise.
+MAILING_QUEUE_ENABLED = os.environ.get('MAILING_QUEUE_ENABLED', 'true').lower() in ('1', 'true')
+MAILING_DELIVERY_BACKEND = os.environ.get('EMAIL_BACKEND') or 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = 'apps.mailing.backends.QueuedEmailBackend' if MAILING_QUEUE_ENABLED else MAILING_DELIVERY_BACKEND
 EMAIL_HOST = os.environ.get('EMAIL_HOST')
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
 EMAIL_PORT = os.environ.get('EMAIL_PORT')
 EMAIL_USE_TLS = True
+
+MAILING_BATCH_SIZE = int(os.environ.get('MAILING_BATCH_SIZE', 100))
+MAILING_MAX_ATTEMPTS = int(os.environ.get('MAILING_MAX_ATTEMPTS', 8))
+# Retries wait base * 2 ** (attempts - 1) seconds, up to the maximum, with some jitter.
+MAILING_RETRY_BASE_DELAY = float(os.environ.get('MAILING_RETRY_BASE_DELAY', 30))
+MAILING_RETRY_MAX_DELAY = float(os.environ.get('MAILING_RETRY_MAX_DELAY', 3600))
+# Mails still marked as sending after this long were claimed by a worker that died.
+MAILING_SENDING_TIMEOUT = int(os.environ.get('MAILING_SENDING_TIMEOUT', 300))
+# Identical mails queued within this window are sent once.
+MAILING_DEDUPE_WINDOW = int(os.environ.get('MAILING_DEDUPE_WINDOW', 600))
+# Without a separate worker process, e.g. in development, a thread of the web process delivers the mails.
+MAILING_LOCAL_WORKER = os.environ.get('MAILING_LOCAL_WORKER', '').lower() in ('1', 'true')
+MAILING_POLL_INTERVAL = float(os.environ.get('MAILING_POLL_INTERVAL', 2))
+# Delivered and failed emails hold activation and password reset links, `purge_sent_emails`
+# deletes them once they are older than these retentions (in seconds).
+MAILING_SENT_RETENTION = int(os.environ.get('MAILING_SENT_RETENTION') or 7 * 24 * 3600)
+MAILING_FAILED_RETENTION = int(os.environ.get('MAILING_FAILED_RETENTION') or 30 * 24 * 3600)
+MAILING_PURGE_BATCH_SIZE = int(os.environ.get('MAILING_PURGE_BATCH_SIZE') or 1000)
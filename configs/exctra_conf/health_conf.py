@@ -0,0 +1,9 @@
+import os
+
+# Readiness probes run concurrently, each one is given up on after the timeout, and the result
+# is reused for the TTL so that frequent probes do not add load on the dependencies.
+HEALTH_CHECK_TIMEOUT = float(os.environ.get('HEALTH_CHECK_TIMEOUT', 2))
+HEALTH_CHECK_CACHE_TTL = float(os.environ.get('HEALTH_CHECK_CACHE_TTL', 5))
+HEALTH_CHECK_WORKERS = int(os.environ.get('HEALTH_CHECK_WORKERS', 6))
+# Emails are queued in the database, so the mail server is a dependency of the mailing worker only.
+HEALTH_CHECK_PROBES = ('database', 'cache')
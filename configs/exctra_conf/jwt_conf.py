@@ -1,10 +1,29 @@
+import os
 from datetime import timedelta
 
+from .cache_conf import REDIS_URL
+
 SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_TOKEN_CLASSES': (
         'rest_framework_simplejwt.tokens.AccessToken',
-    )
-}
\ No newline at end of file
+    ),
+    'TOKEN_OBTAIN_SERIALIZER': 'apps.users.tokens.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'apps.users.tokens.ClaimsTokenRefreshSerializer',
+    'TOKEN_VERIFY_SERIALIZER': 'apps.users.tokens.ClaimsTokenVerifySerializer',
+}
+
+# Requests are authenticated from the token claims only with a cache shared by the processes,
+# as revocations are recorded in it. With the per-process fallback cache, a revocation would
+# only reach the process that made it, so tokens are checked against the database instead.
+AUTH_CLAIMS_ENABLED = bool(REDIS_URL)
+# Revocation markers and users loaded by the claims-based authentication are kept in the
+# process for a few seconds, in front of the shared cache.
+AUTH_LOCAL_CACHE_TTL = float(os.environ.get('AUTH_LOCAL_CACHE_TTL', 5))
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 300))
+# How long a refresh token found missing from the blacklist table is trusted without a query.
+TOKEN_BLACKLIST_CACHE_TIMEOUT = int(os.environ.get('TOKEN_BLACKLIST_CACHE_TIMEOUT', 3600))
+# Expired outstanding tokens are purged in batches of this many rows.
+TOKEN_PURGE_BATCH_SIZE = int(os.environ.get('TOKEN_PURGE_BATCH_SIZE', 1000))
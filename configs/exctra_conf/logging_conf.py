@@ -0,0 +1,64 @@
+import os
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'INFO'
+# An empty LOG_FILE writes to stderr, which is what the container runtime collects. A file is shared by the workers,
+# which rotate it in turn.
+LOG_FILE = os.environ.get('LOG_FILE', '')
+LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES') or 50 * 1024 * 1024)
+LOG_BACKUP_COUNT = int(os.environ.get('LOG_BACKUP_COUNT') or 5)
+LOG_ROTATE_INTERVAL = int(os.environ.get('LOG_ROTATE_INTERVAL') or 24 * 60 * 60)
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE') or 10000)
+LOG_BATCH_SIZE = int(os.environ.get('LOG_BATCH_SIZE') or 500)
+# The fraction of the INFO records that are kept, e.g. for the one line logged per request.
+LOG_INFO_SAMPLE_RATE = float(os.environ.get('LOG_INFO_SAMPLE_RATE') or 1)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'core.logging.formatters.JSONFormatter',
+        },
+    },
+    'filters': {
+        'request_id': {
+            '()': 'core.logging.filters.RequestIDFilter',
+        },
+        'sampling': {
+            '()': 'core.logging.filters.SamplingFilter',
+            'rate': LOG_INFO_SAMPLE_RATE,
+            'level': 'INFO',
+        },
+    },
+    'handlers': {
+        'queue': {
+            'level': LOG_LEVEL,
+            'class': 'core.logging.handlers.BackgroundQueueHandler',
+            'filename': LOG_FILE,
+            'max_bytes': LOG_MAX_BYTES,
+            'backup_count': LOG_BACKUP_COUNT,
+            'interval': LOG_ROTATE_INTERVAL,
+            'queue_size': LOG_QUEUE_SIZE,
+            'batch_size': LOG_BATCH_SIZE,
+            'formatter': 'json',
+            'filters': ['sampling', 'request_id'],
+        },
+    },
+    'loggers': {
+        'django': {
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
+            'propagate': True,
+        },
+        'core': {
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
+            'propagate': True,
+        },
+        'apps': {
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
+            'propagate': True,
+        },
+    },
+}
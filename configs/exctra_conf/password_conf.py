@@ -0,0 +1,28 @@
+import os
+
+PASSWORD_HASHER_CLASSES = {
+    'pbkdf2': 'core.hashing.hashers.PBKDF2PasswordHasher',
+    'argon2': 'core.hashing.hashers.Argon2PasswordHasher',
+    'bcrypt': 'core.hashing.hashers.BCryptSHA256PasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER') or 'pbkdf2'
+
+# The first hasher hashes new passwords, the others only verify existing hashes until the
+# user logs in and the password is rehashed with the preferred one.
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    hasher for name, hasher in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS') or 600000)
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_ARGON2_TIME_COST') or 2)
+PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get('PASSWORD_ARGON2_MEMORY_COST') or 102400)
+PASSWORD_ARGON2_PARALLELISM = int(os.environ.get('PASSWORD_ARGON2_PARALLELISM') or 8)
+PASSWORD_BCRYPT_ROUNDS = int(os.environ.get('PASSWORD_BCRYPT_ROUNDS') or 12)
+
+# Hashing runs in a bounded pool, `thread` suits the hashers above as they release the GIL.
+PASSWORD_HASHING_EXECUTOR = os.environ.get('PASSWORD_HASHING_EXECUTOR') or 'thread'
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS') or os.cpu_count() or 1)
+PASSWORD_HASHING_MAX_PENDING = int(os.environ.get('PASSWORD_HASHING_MAX_PENDING') or PASSWORD_HASHING_WORKERS * 4)
@@ -0,0 +1,24 @@
+import os
+
+# Requests slower than this are logged with the SQL they ran.
+PERFORMANCE_SLOW_REQUEST_MS = float(os.environ.get('PERFORMANCE_SLOW_REQUEST_MS', 500))
+PERFORMANCE_MAX_RECORDED_QUERIES = int(os.environ.get('PERFORMANCE_MAX_RECORDED_QUERIES', 100))
+PERFORMANCE_SERVER_TIMING = os.environ.get('PERFORMANCE_SERVER_TIMING', 'true').lower() in ('1', 'true')
+PERFORMANCE_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PERFORMANCE_QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+PERFORMANCE_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Responses of these media types are compressed when they are at least COMPRESSION_MIN_SIZE bytes long.
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_CONTENT_TYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/csv',
+    'text/css',
+    'text/html',
+    'text/plain',
+)
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+# Brotli is preferred when the client accepts it. Qualities above ~6 cost too much CPU for dynamic responses.
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 5))
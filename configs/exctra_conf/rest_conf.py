@@ -1,30 +1,23 @@
+import os
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.fast_json.FastJSONRenderer',
     ],
     'DEFAULT_PAGINATION_CLASS': 'core.pagination.page_pagination.PagePagination',
     'EXCEPTION_HANDLER': 'core.handlers.error_handler.custom_error_handler',
-    'DEFAULT_AUTHENTICATION_CLASSES': ('rest_framework_simplejwt.authentication.JWTAuthentication',),
-}
-
-LOGGING = {
-    'version': 1,
-    'disable_existing_loggers': False,
-    'handlers': {
-        'file': {
-            'level': 'INFO',
-            'class': 'logging.FileHandler',
-            'filename': './info.log',
-        },
-    },
-    'loggers': {
-        'django': {
-            'handlers': ['file'],
-            'level': 'INFO',
-            'propagate': True,
-        },
+    'DEFAULT_AUTHENTICATION_CLASSES': ('apps.users.authentication.ClaimsJWTAuthentication',),
+    'DEFAULT_THROTTLE_CLASSES': ('core.throttling.throttles.ScopedTokenBucketThrottle',),
+    'DEFAULT_THROTTLE_RATES': {
+        'read': os.environ.get('THROTTLE_RATE_READ', '1200/min'),
+        'write': os.environ.get('THROTTLE_RATE_WRITE', '300/min'),
+        'signup': os.environ.get('THROTTLE_RATE_SIGNUP', '20/hour'),
+        'login': os.environ.get('THROTTLE_RATE_LOGIN', '30/min'),
     },
+    # The number of proxies in front of the application, whose addresses are skipped in X-Forwarded-For.
+    # With 0, clients are identified by REMOTE_ADDR, as X-Forwarded-For is set by the clients themselves.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES') or 0),
 }
@@ -0,0 +1,12 @@
+import multiprocessing
+import os
+
+# Shared by the gunicorn configuration and the database pool sizing.
+SERVER_INTERFACE = os.environ.get('SERVER_INTERFACE') or 'wsgi'
+CPU_COUNT = multiprocessing.cpu_count()
+
+if SERVER_INTERFACE == 'asgi':
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY') or CPU_COUNT)
+else:
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY') or CPU_COUNT * 2 + 1)
+WEB_THREADS = int(os.environ.get('GUNICORN_THREADS') or 4)
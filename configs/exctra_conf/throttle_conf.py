@@ -0,0 +1,19 @@
+import os
+
+from .cache_conf import REDIS_URL
+
+# The token buckets are shared through Redis when it is configured, and kept per process otherwise.
+THROTTLE_REDIS_URL = os.environ.get('THROTTLE_REDIS_URL') or REDIS_URL
+# Seconds. A slow Redis must not hold the request, the local buckets are used after a timeout.
+THROTTLE_REDIS_TIMEOUT = float(os.environ.get('THROTTLE_REDIS_TIMEOUT', 0.1))
+THROTTLE_REDIS_RETRY_INTERVAL = float(os.environ.get('THROTTLE_REDIS_RETRY_INTERVAL', 5))
+THROTTLE_LOCAL_MAX_KEYS = int(os.environ.get('THROTTLE_LOCAL_MAX_KEYS', 10000))
+
+# Throttling scopes of the views that do not set `throttle_scope`, by URL name and method.
+THROTTLE_VIEW_SCOPES = {
+    'users_list_create': {'POST': 'signup'},
+    'users_list_create_async': {'POST': 'signup'},
+    'user-list': {'POST': 'signup'},
+    'jwt-create': {'POST': 'login'},
+    'provider-auth': {'POST': 'login'},
+}
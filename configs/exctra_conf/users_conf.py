@@ -0,0 +1,38 @@
+import os
+
+from .cache_conf import REDIS_URL
+
+USERS_IMPORT_BATCH_SIZE = int(os.environ.get('USERS_IMPORT_BATCH_SIZE', 1000))
+USERS_IMPORT_MAX_REPORTED_ERRORS = int(os.environ.get('USERS_IMPORT_MAX_REPORTED_ERRORS', 1000))
+# The `q` search of the users list ANDs at most this many whitespace-separated terms.
+USERS_SEARCH_MAX_TERMS = int(os.environ.get('USERS_SEARCH_MAX_TERMS', 5))
+# Users a single bulk PATCH of /users may update.
+USERS_BULK_UPDATE_MAX_SIZE = int(os.environ.get('USERS_BULK_UPDATE_MAX_SIZE', 1000))
+# Rows fetched at a time from the server-side cursor of the users export.
+USERS_EXPORT_CHUNK_SIZE = int(os.environ.get('USERS_EXPORT_CHUNK_SIZE', 2000))
+# Seconds, at least the longest transaction. The next incremental export starts this long before the current one,
+# so the changes committed while it ran are not missed.
+USERS_EXPORT_SAFETY_MARGIN = int(os.environ.get('USERS_EXPORT_SAFETY_MARGIN', 300))
+
+# Change feed of users and profiles. Long polls wait up to USERS_CHANGES_MAX_WAIT seconds, checking for
+# new changes every USERS_CHANGES_POLL_INTERVAL, and event streams are closed after USERS_CHANGES_STREAM_TIMEOUT
+# seconds, the clients reconnect from their last event.
+USERS_CHANGES_PAGE_SIZE = int(os.environ.get('USERS_CHANGES_PAGE_SIZE', 100))
+USERS_CHANGES_MAX_PAGE_SIZE = int(os.environ.get('USERS_CHANGES_MAX_PAGE_SIZE', 1000))
+USERS_CHANGES_MAX_WAIT = float(os.environ.get('USERS_CHANGES_MAX_WAIT', 25))
+USERS_CHANGES_POLL_INTERVAL = float(os.environ.get('USERS_CHANGES_POLL_INTERVAL', 1))
+USERS_CHANGES_STREAM_TIMEOUT = float(os.environ.get('USERS_CHANGES_STREAM_TIMEOUT', 300))
+USERS_CHANGES_HEARTBEAT_INTERVAL = float(os.environ.get('USERS_CHANGES_HEARTBEAT_INTERVAL', 15))
+# Long polls and event streams each hold a worker thread, a process serves at most this many at once and answers
+# the others with 503. Keep it below the threads of a worker (GUNICORN_THREADS).
+USERS_CHANGES_MAX_WAITERS = int(os.environ.get('USERS_CHANGES_MAX_WAITERS', 2))
+# The `relay_user_changes` worker appends the changes to this Redis stream, trimmed to about MAXLEN entries.
+USERS_CHANGES_REDIS_URL = os.environ.get('USERS_CHANGES_REDIS_URL') or REDIS_URL
+USERS_CHANGES_REDIS_STREAM = os.environ.get('USERS_CHANGES_REDIS_STREAM', 'users:changes')
+USERS_CHANGES_REDIS_MAXLEN = int(os.environ.get('USERS_CHANGES_REDIS_MAXLEN', 1000000))
+USERS_CHANGES_RELAY_BATCH_SIZE = int(os.environ.get('USERS_CHANGES_RELAY_BATCH_SIZE', 500))
+USERS_CHANGES_RELAY_INTERVAL = float(os.environ.get('USERS_CHANGES_RELAY_INTERVAL', 1))
+# Seconds. `compact_user_changes` deletes the changes older than COMPACT_AFTER that a later change of the same
+# object supersedes, and the deletions older than RETENTION, so the feed keeps the latest state of every object.
+USERS_CHANGES_COMPACT_AFTER = int(os.environ.get('USERS_CHANGES_COMPACT_AFTER', 7 * 24 * 3600))
+USERS_CHANGES_RETENTION = int(os.environ.get('USERS_CHANGES_RETENTION', 30 * 24 * 3600))
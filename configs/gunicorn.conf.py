@@ -0,0 +1,43 @@
+"""Gunicorn configuration for serving the project in production.
+
+Start the server with ``gunicorn -c configs/gunicorn.conf.py``. Every setting can be tuned
+with environment variables, and ``kill -HUP <master pid>`` reloads the configuration and
+replaces the workers gracefully, without dropping in-flight requests.
+"""
+import os
+
+from configs.exctra_conf.server_conf import SERVER_INTERFACE, WEB_CONCURRENCY, WEB_THREADS
+
+if SERVER_INTERFACE == 'asgi':
+    # An event loop per core serves concurrent requests without extra threads.
+    wsgi_app = 'configs.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'configs.wsgi:application'
+    worker_class = 'gthread'
+    threads = WEB_THREADS
+
+bind = os.environ.get('GUNICORN_BIND') or f'0.0.0.0:{os.environ.get("APP_PORT") or 8000}'
+workers = WEB_CONCURRENCY
+
+# Import the application once in the master, so workers fork with it loaded and start instantly.
+preload_app = True
+
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE') or 5)
+timeout = int(os.environ.get('GUNICORN_TIMEOUT') or 30)
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT') or 30)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS') or 10000)
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER') or 1000)
+backlog = int(os.environ.get('GUNICORN_BACKLOG') or 2048)
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL') or 'info'
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the preloaded master, each worker opens its own."""
+    from django.db import connections
+
+    connections.close_all()
@@ -12,6 +12,14 @@ import os
 from pathlib import Path
 
 from .exctra_conf import *
+from .exctra_conf.db_conf import (
+    DB_CONN_MAX_AGE,
+    DB_PGBOUNCER,
+    DB_POOL_ENABLED,
+    DB_POOL_MAX_IDLE,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_TIMEOUT,
+)
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -46,11 +54,16 @@ INSTALLED_APPS = [
 
     # my apps
     'apps.health_check',
+    'apps.mailing',
     'apps.users',
 
 ]
 
 MIDDLEWARE = [
+    'core.middleware.request_id.RequestIDMiddleware',
+    'core.middleware.performance.PerformanceMiddleware',
+    'core.middleware.compression.CompressionMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'social_django.middleware.SocialAuthExceptionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -88,12 +101,21 @@ WSGI_APPLICATION = 'configs.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        'ENGINE': 'core.db.backends.postgresql_pool' if DB_POOL_ENABLED else 'django.db.backends.postgresql_psycopg2',
         'NAME': os.environ.get('POSTGRES_DB'),
         'USER': os.environ.get('POSTGRES_USER'),
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD'),
         'HOST': os.environ.get('POSTGRES_HOST'),
-        'PORT': os.environ.get('POSTGRES_PORT')
+        'PORT': os.environ.get('POSTGRES_PORT'),
+        # With the pool, connections go back to it at the end of every request instead of being kept per thread.
+        'CONN_MAX_AGE': 0 if DB_POOL_ENABLED else DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'DISABLE_SERVER_SIDE_CURSORS': DB_PGBOUNCER,
+        'POOL': {
+            'MAX_SIZE': DB_POOL_MAX_SIZE,
+            'TIMEOUT': DB_POOL_TIMEOUT,
+            'MAX_IDLE': DB_POOL_MAX_IDLE,
+        },
     }
 }
 
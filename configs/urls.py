@@ -1,12 +1,15 @@
 from django.contrib import admin
 from django.urls import include, path
 
+from core.metrics.views import metrics_view
+
 urlpatterns = [
     path('admin', admin.site.urls),
     path('health_check', include('apps.health_check.urls')),
     path('users', include('apps.users.urls')),
+    path('metrics', metrics_view, name='metrics'),
 
-    path('auth/', include('djoser.urls')),
+    path('auth/', include('apps.users.auth_urls')),
     path('auth/', include('djoser.urls.jwt')),
     path('auth/', include('djoser.social.urls')),
 
@@ -0,0 +1,87 @@
+import json
+import statistics
+from pathlib import Path
+
+# Latencies regress when they grow, and throughput when it drops. The tail latencies are the
+# noisiest, so they are compared with their own tolerance.
+HIGHER_IS_WORSE = ('p50_ms', 'p95_ms', 'p99_ms')
+LOWER_IS_WORSE = ('rps',)
+TAIL_METRICS = ('p95_ms', 'p99_ms')
+
+
+def load_baseline(path):
+    """Return the baselines stored in the JSON file `path`, or an empty dict if it does not exist."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_baseline(path, baselines):
+    """Store `baselines` in the JSON file `path`."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+
+
+def median_summary(summaries):
+    """Return the median of every metric of the summaries of repeated runs, with their counts summed.
+
+    :param summaries: The `LoadResult.summary()` of every run.
+    :type summaries: list[dict]
+    :rtype: dict
+    """
+    merged = {}
+    for metric in summaries[0]:
+        values = [summary[metric] for summary in summaries if summary[metric] is not None]
+        if metric in ('requests', 'errors'):
+            merged[metric] = sum(values)
+        else:
+            merged[metric] = round(statistics.median(values), 2) if values else None
+    return merged
+
+
+def find_regressions(results, baseline, tolerance=0.2, tail_tolerance=0.5, query_slack=0.5):
+    """Compare the summaries of a benchmark run with their baseline.
+
+    The median latency and the throughput regress when they are more than `tolerance` worse
+    than the baseline, and the tail latencies when they are more than `tail_tolerance` worse.
+    The number of queries per request does not depend on the machine, so it regresses
+    as soon as it grows by more than `query_slack`, which absorbs the variation of the mean.
+
+    :param results: The `LoadResult.summary()` of every scenario, by scenario name.
+    :type results: dict[str, dict]
+    :param baseline: The baseline summaries, by scenario name.
+    :type baseline: dict[str, dict]
+    :param tolerance: The allowed relative change of the median latency and the throughput.
+    :type tolerance: float
+    :param tail_tolerance: The allowed relative change of the p95 and p99 latencies.
+    :type tail_tolerance: float
+    :param query_slack: The allowed growth of the number of queries per request.
+    :type query_slack: float
+    :return: A description of every regressed metric.
+    :rtype: list[str]
+    """
+    regressions = []
+    for scenario, summary in results.items():
+        expected = baseline.get(scenario)
+        if not expected:
+            continue
+
+        for metric in HIGHER_IS_WORSE:
+            allowed = tail_tolerance if metric in TAIL_METRICS else tolerance
+            if summary[metric] > expected[metric] * (1 + allowed):
+                regressions.append(_describe(scenario, metric, summary[metric], expected[metric]))
+        for metric in LOWER_IS_WORSE:
+            if summary[metric] < expected[metric] * (1 - tolerance):
+                regressions.append(_describe(scenario, metric, summary[metric], expected[metric]))
+
+        queries, expected_queries = summary.get('queries_per_request'), expected.get('queries_per_request')
+        if queries is not None and expected_queries is not None and queries > expected_queries + query_slack:
+            regressions.append(_describe(scenario, 'queries_per_request', queries, expected_queries))
+    return regressions
+
+
+def _describe(scenario, metric, value, expected):
+    change = f' ({(value - expected) / expected:+.0%})' if expected else ''
+    return f'{scenario} {metric}: {value} vs {expected} in the baseline{change}'
@@ -0,0 +1,226 @@
+import http.client
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+SERVER_TIMING_QUERIES_RE = re.compile(r'queries;desc="(\d+)"')
+
+# Commands serving the application locally, to be started with `local_server` from the project directory.
+SERVER_COMMANDS = {
+    'runserver': [sys.executable, 'manage.py', 'runserver', '--noreload', '{bind}'],
+    'gunicorn': ['gunicorn', '-c', 'configs/gunicorn.conf.py', '--bind', '{bind}'],
+}
+# Environment of the local servers: the load comes from one address, which must not be throttled.
+SERVER_ENV = {
+    'GUNICORN_ACCESS_LOG': '',
+    'PERFORMANCE_SERVER_TIMING': 'true',
+    'THROTTLE_RATE_READ': '1000000/s',
+    'THROTTLE_RATE_WRITE': '1000000/s',
+    'THROTTLE_RATE_SIGNUP': '1000000/s',
+    'THROTTLE_RATE_LOGIN': '1000000/s',
+}
+
+
+class ServerStartError(Exception):
+    """Raised when a local server exits or does not accept connections in time."""
+
+
+@dataclass
+class LoadResult:
+    """Outcome of a load run: latencies and query counts of the successful requests, failures and duration.
+
+    Query counts are read from the `Server-Timing` header, and only known for the requests that have it.
+    """
+
+    latencies: list = field(default_factory=list)
+    queries: list = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def requests(self):
+        """Return the number of successful requests."""
+        return len(self.latencies)
+
+    @property
+    def rps(self):
+        """Return the number of successful requests per second."""
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def queries_per_request(self):
+        """Return the mean number of queries per request, or `None` if the server does not report it."""
+        return sum(self.queries) / len(self.queries) if self.queries else None
+
+    def percentile(self, percent):
+        """Return the latency percentile in milliseconds.
+
+        :param percent: The percentile to compute, between 0 and 100.
+        :type percent: float
+        :return: The latency in milliseconds.
+        :rtype: float
+        """
+        if not self.latencies:
+            return 0.0
+        if len(self.latencies) == 1:
+            return self.latencies[0] * 1000
+        return statistics.quantiles(self.latencies, n=100, method='inclusive')[int(percent) - 1] * 1000
+
+    def summary(self):
+        """Return the throughput and latency percentiles as a dict."""
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'rps': round(self.rps, 1),
+            'p50_ms': round(self.percentile(50), 2),
+            'p95_ms': round(self.percentile(95), 2),
+            'p99_ms': round(self.percentile(99), 2),
+            'queries_per_request': (
+                None if self.queries_per_request is None else round(self.queries_per_request, 2)
+            ),
+        }
+
+
+def run_load(
+    url, concurrency=10, duration=10.0, requests=None, method='GET', body=None, headers=None, make_request=None
+):
+    """Send requests to `url` from `concurrency` threads over persistent (keep-alive) connections.
+
+    The run stops after `duration` seconds, or after `requests` requests if given.
+
+    :param url: The absolute URL to request.
+    :type url: str
+    :param concurrency: The number of concurrent connections.
+    :type concurrency: int
+    :param duration: The length of the run in seconds.
+    :type duration: float
+    :param requests: The total number of requests to send, instead of a duration.
+    :type requests: int | None
+    :param method: The HTTP method.
+    :type method: str
+    :param body: The request body.
+    :type body: bytes | None
+    :param headers: The request headers.
+    :type headers: dict | None
+    :param make_request: A function of the request number returning the `(method, path, body)` of the
+        request, to send different requests to the host of `url` instead of repeating one.
+    :type make_request: Callable[[int], tuple[str, str, bytes | None]] | None
+    :return: The latencies and errors of the run.
+    :rtype: LoadResult
+    """
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path = f'{path}?{parts.query}'
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+
+    result = LoadResult()
+    lock = threading.Lock()
+    counter = [0]
+    deadline = time.perf_counter() + duration
+
+    def next_request():
+        with lock:
+            if requests is None:
+                if time.perf_counter() >= deadline:
+                    return None
+            elif counter[0] >= requests:
+                return None
+            counter[0] += 1
+            return counter[0]
+
+    def worker():
+        connection = connection_class(parts.netloc, timeout=30)
+        latencies, queries, errors = [], [], 0
+        while number := next_request():
+            request = make_request(number) if make_request else (method, path, body)
+            started = time.perf_counter()
+            try:
+                connection.request(*request, headers or {})
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                connection.close()
+                connection = connection_class(parts.netloc, timeout=30)
+                continue
+            if response.status >= 400:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            match = SERVER_TIMING_QUERIES_RE.search(response.headers.get('Server-Timing', ''))
+            if match:
+                queries.append(int(match.group(1)))
+        connection.close()
+        with lock:
+            result.latencies.extend(latencies)
+            result.queries.extend(queries)
+            result.errors += errors
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+@contextmanager
+def local_server(command, cwd=None, env=None, timeout=30):
+    """Start a server on a free local port, and stop it on exit.
+
+    :param command: The command line, where `{bind}` is replaced by the `host:port` to listen on.
+    :type command: list[str]
+    :param cwd: The working directory of the server.
+    :type cwd: str | None
+    :param env: Environment variables set for the server, on top of the current ones.
+    :type env: dict | None
+    :param timeout: The number of seconds to wait for the server to accept connections.
+    :type timeout: float
+    :return: The base URL of the server.
+    :rtype: Iterator[str]
+    """
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    bind = f'127.0.0.1:{port}'
+    process = subprocess.Popen(
+        [part.format(bind=bind) for part in command],
+        cwd=cwd,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(port, process, timeout)
+        yield f'http://{bind}'
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def wait_for_port(port, process, timeout=30):
+    """Wait until `process` accepts connections on the local `port`.
+
+    :raises ServerStartError: If the process exits or does not listen in time.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise ServerStartError(f'Server exited with code {process.returncode}')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise ServerStartError('Server did not start in time')
@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LocalTTLCache:
+    """Thread-safe in-process cache whose entries expire `ttl` seconds after they are set.
+
+    It is meant as a first tier in front of the shared cache, for values read on every request
+    that may be a few seconds stale. `None` values are cached too, so a negative lookup of the
+    shared cache is not repeated on every request. The least recently set entries are evicted
+    once `max_entries` is reached.
+    """
+
+    def __init__(self, ttl, max_entries=10000):
+        """Initialize the cache.
+
+        :param ttl: The lifetime of the entries in seconds.
+        :type ttl: float
+        :param max_entries: The maximum number of entries kept.
+        :type max_entries: int
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        """Return the fresh entries of `keys`, as a dict that only holds the keys found."""
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del self._entries[key]
+                    continue
+                found[key] = entry[1]
+        return found
+
+    def get(self, key, default=None):
+        """Return the fresh entry of `key`, or `default`."""
+        return self.get_many([key]).get(key, default)
+
+    def set(self, key, value, ttl=None):
+        """Store `value` under `key` for `ttl` seconds, the cache TTL by default."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (expires_at, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        """Drop the entry of `key`."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,124 @@
+from functools import reduce
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from core.cache.read_through import make_version_etag
+
+
+class CachedRetrieveMixin:
+    """Serve `retrieve` from a `ReadThroughCache` and answer conditional requests with 304.
+
+    The ETag and `Last-Modified` validators of an object are derived from the `updated_at`
+    columns of the rows it is rendered from (see `get_validator_fields`). When a conditional
+    request misses the cache, those columns alone are queried, and the 304 is answered without
+    loading or serializing the object.
+
+    The object is only loaded (and the object permissions only checked) on a cache miss, so
+    the mixin is meant for views whose object permissions do not depend on the instance.
+
+    - `detail_cache`: The `ReadThroughCache` holding the serialized objects.
+    """
+
+    detail_cache = None
+
+    def retrieve(self, request, *args, **kwargs):
+        """Return the cached representation of the object, or 304 if the client has it.
+
+        :param request: The incoming request.
+        :type request: Request
+        :return: The serialized object with its validators, or an empty 304 response.
+        :rtype: Response
+        """
+        pk = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        # The entry loaded on a miss is stored under the generation seen before loading it.
+        key = self.detail_cache.get_entry_key(pk, self.get_cache_variant())
+        entry = self.detail_cache.get(key)
+
+        if entry is None and ('If-None-Match' in request.headers or 'If-Modified-Since' in request.headers):
+            validators = self.load_validators(pk)
+            if validators is not None:
+                response = self.get_conditional_response(request, validators)
+                if response is not None:
+                    return response
+
+        if entry is None:
+            entry = self.load_cache_entry()
+            self.detail_cache.set(key, entry)
+
+        response = self.get_conditional_response(request, entry)
+        if response is not None:
+            return response
+        return Response(entry['data'], headers=get_validator_headers(entry))
+
+    def load_cache_entry(self):
+        """Return the serialized object with its validators, to be stored in the cache."""
+        instance = self.get_object()
+        data = dict(self.get_serializer(instance).data)
+        timestamps = [resolve_field(instance, field) for field in self.get_validator_fields()]
+        return {'data': data, **self.make_validators(timestamps)}
+
+    def load_validators(self, pk):
+        """Return the validators of the object `pk` from its timestamp columns, `None` if it does not exist."""
+        queryset = self.get_queryset().filter(**{self.lookup_field: pk}).order_by()
+        rows = list(queryset.values_list(*self.get_validator_fields())[:1])
+        return self.make_validators(rows[0]) if rows else None
+
+    def make_validators(self, timestamps):
+        """Return the ETag and `Last-Modified` timestamp of a representation of rows modified at `timestamps`."""
+        return make_validators(timestamps, self.get_cache_variant())
+
+    def get_validator_fields(self):
+        """Return the `updated_at` lookups of the rows the representation is rendered from."""
+        return ('updated_at',)
+
+    def get_cache_variant(self):
+        """Return the identifier of the representation served for the current request."""
+        return ''
+
+    def get_conditional_response(self, request, validators):
+        """Return a 304 (or 412) response if the request preconditions match `validators`, else `None`."""
+        response = get_conditional_response(
+            request, etag=validators['etag'], last_modified=validators['last_modified']
+        )
+        if response is None:
+            return None
+        for header, value in get_validator_headers(validators).items():
+            response.headers[header] = value
+        return response
+
+
+def make_validators(timestamps, variant=''):
+    """Return the ETag and `Last-Modified` timestamp of a representation of rows modified at `timestamps`.
+
+    :param timestamps: The `updated_at` values of the rows the representation is rendered from.
+    :type timestamps: Iterable[datetime | None]
+    :param variant: An identifier of the representation, when a resource has several.
+    :type variant: str
+    :return: The `etag` and `last_modified` validators.
+    :rtype: dict
+    """
+    timestamps = list(timestamps)
+    modified = [timestamp for timestamp in timestamps if timestamp is not None]
+    return {
+        'etag': make_version_etag(timestamps, variant),
+        'last_modified': int(max(modified).timestamp()) if modified else None,
+    }
+
+
+def get_validator_headers(validators):
+    """Return the `ETag` and `Last-Modified` headers of the given validators."""
+    headers = {'ETag': validators['etag']}
+    if validators['last_modified'] is not None:
+        headers['Last-Modified'] = http_date(validators['last_modified'])
+    return headers
+
+
+def resolve_field(instance, lookup):
+    """Return the value of a `related__field` lookup on `instance`, or `None` if a relation is missing."""
+    try:
+        return reduce(getattr, lookup.split('__'), instance)
+    except ObjectDoesNotExist:
+        return None
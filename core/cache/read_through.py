@@ -0,0 +1,147 @@
+import hashlib
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+registry = {}
+
+
+class ReadThroughCache:
+    """Read-through cache for serialized resources, keyed by primary key and version.
+
+    Every primary key has a generation token stored next to its entries. Invalidating a key
+    replaces the token, so all variants cached for the old generation stop being read at once
+    and expire on their own. The cache version (`API_CACHE_VERSION`) is bumped whenever the
+    cached representation changes shape.
+
+    Instances register themselves by namespace, so their hit/miss counters can be reported.
+    """
+
+    def __init__(self, namespace, timeout=None, alias='default'):
+        """Initialize the cache for the given key namespace.
+
+        :param namespace: The prefix of every key of this cache.
+        :type namespace: str
+        :param timeout: The lifetime of the entries in seconds, `API_CACHE_TIMEOUT` by default.
+        :type timeout: int | None
+        :param alias: The alias of the Django cache backend to use.
+        :type alias: str
+        """
+        self.namespace = namespace
+        self.timeout = timeout
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        registry[namespace] = self
+
+    @property
+    def backend(self):
+        """Return the Django cache backend of this cache."""
+        return caches[self.alias]
+
+    def get_or_load(self, pk, loader, variant=''):
+        """Return the cached value for `pk`, calling `loader` and caching its result on a miss.
+
+        :param pk: The primary key of the cached resource.
+        :type pk: int | str
+        :param loader: A callable returning the value to cache.
+        :type loader: Callable
+        :param variant: An identifier of the representation, when a resource has several.
+        :type variant: str
+        :return: The cached or freshly loaded value.
+        :rtype: Any
+        """
+        key = self.get_entry_key(pk, variant)
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    def get_entry_key(self, pk, variant=''):
+        """Return the key of the entry of `pk` in its current generation.
+
+        A value loaded after a miss must be stored under the key resolved before loading it.
+        If `pk` is invalidated while the value is loaded, the value is then stored for the old
+        generation, which is not read anymore, instead of being served as the current one.
+
+        :param pk: The primary key of the cached resource.
+        :type pk: int | str
+        :param variant: An identifier of the representation, when a resource has several.
+        :type variant: str
+        :return: The cache key.
+        :rtype: str
+        """
+        generation_key = self._get_generation_key(pk)
+        generation = self.backend.get(generation_key)
+        if generation is None:
+            generation = uuid.uuid4().hex
+            if not self.backend.add(generation_key, generation, self._get_timeout()):
+                generation = self.backend.get(generation_key, generation)
+        return f'{self.namespace}:{pk}:{generation}:{variant}'
+
+    def get(self, key):
+        """Return the value cached under `key`, or `None` on a miss.
+
+        :param key: A key returned by `get_entry_key`.
+        :type key: str
+        :return: The cached value.
+        :rtype: Any
+        """
+        value = self.backend.get(key, version=settings.API_CACHE_VERSION)
+        self._count(hit=value is not None)
+        return value
+
+    def set(self, key, value):
+        """Cache `value` under `key`.
+
+        :param key: A key returned by `get_entry_key` before `value` was loaded.
+        :type key: str
+        :param value: The value to cache.
+        :type value: Any
+        """
+        self.backend.set(key, value, self._get_timeout(), version=settings.API_CACHE_VERSION)
+
+    def invalidate(self, pk):
+        """Invalidate every cached variant of `pk`.
+
+        :param pk: The primary key of the changed resource.
+        :type pk: int | str
+        """
+        self.backend.set(self._get_generation_key(pk), uuid.uuid4().hex, self._get_timeout())
+
+    def stats(self):
+        """Return the hit and miss counters of this process."""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def _get_generation_key(self, pk):
+        return f'{self.namespace}:{pk}:generation'
+
+    def _get_timeout(self):
+        return settings.API_CACHE_TIMEOUT if self.timeout is None else self.timeout
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+def make_version_etag(timestamps, variant=''):
+    """Return a strong ETag for a representation derived from the modification times of its rows.
+
+    :param timestamps: The `updated_at` values of the rows the representation is rendered from.
+    :type timestamps: Iterable[datetime | None]
+    :param variant: An identifier of the representation, when a resource has several.
+    :type variant: str
+    :return: The quoted ETag value.
+    :rtype: str
+    """
+    parts = [str(settings.API_CACHE_VERSION), variant]
+    parts.extend(timestamp.isoformat() if timestamp else '' for timestamp in timestamps)
+    return f'"{hashlib.md5(":".join(parts).encode()).hexdigest()}"'
@@ -0,0 +1,60 @@
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from core.db.pool import get_pool
+
+from .creation import DatabaseCreation
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend that borrows connections from a per-process `ConnectionPool`.
+
+    Django opens a connection when a thread first needs one and closes it at the end of the
+    request (with `CONN_MAX_AGE = 0`). This backend turns both into a pool checkout and
+    return, so concurrent threads of a worker share at most `POOL['MAX_SIZE']` connections.
+    """
+
+    creation_class = DatabaseCreation
+
+    @property
+    def is_pooled(self):
+        """Return whether this connection uses the pool, maintenance connections do not."""
+        return self.alias != NO_DB_ALIAS
+
+    def get_new_connection(self, conn_params):
+        """Return a connection from the pool, opening a new one if the pool has room."""
+        if not self.is_pooled:
+            return super().get_new_connection(conn_params)
+
+        # Set for every wrapper, pooled connections are opened by whichever wrapper came first.
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return self.get_pool(conn_params).acquire()
+
+    def get_pool(self, conn_params=None):
+        """Return the connection pool of this database alias."""
+        options = self.settings_dict['POOL']
+        return get_pool(
+            f'{self.alias}:{self.settings_dict["NAME"]}',
+            lambda: super(DatabaseWrapper, self).get_new_connection(conn_params or self.get_connection_params()),
+            options['MAX_SIZE'],
+            options['TIMEOUT'],
+            options['MAX_IDLE'],
+        )
+
+    def _close(self):
+        if self.connection is None or not self.is_pooled:
+            return super()._close()
+
+        # A connection closed inside an atomic block stays attached to this wrapper,
+        # so it cannot be handed to another thread.
+        discard = self.in_atomic_block or self.connection.closed
+        if not discard:
+            try:
+                self.connection.rollback()
+            except self.Database.Error:
+                discard = True
+        with self.wrap_database_errors:
+            self.get_pool().release(self.connection, discard=discard)
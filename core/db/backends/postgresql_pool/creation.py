@@ -0,0 +1,13 @@
+from django.db.backends.postgresql import creation
+
+from core.db.pool import pools
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    """Test database creation that closes the pooled connections before dropping the database."""
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        for key, pool in pools.items():
+            if key.endswith(f':{test_database_name}'):
+                pool.close_idle()
+        super()._destroy_test_db(test_database_name, verbosity)
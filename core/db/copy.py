@@ -0,0 +1,55 @@
+import io
+from datetime import date, datetime, time
+
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def copy_objects(cursor, model, objs, fields):
+    """Insert model instances with PostgreSQL `COPY ... FROM STDIN`, bypassing the ORM.
+
+    Much faster than `bulk_create` for large volumes, but `pre_save` is not called (so
+    `auto_now` fields keep the values set on the instances), no signals are sent and the
+    primary keys are not set on the instances: include the primary key in `fields` to insert
+    known values instead.
+
+    :param cursor: A cursor of a PostgreSQL connection.
+    :type cursor: CursorWrapper
+    :param model: The model of the instances.
+    :type model: type[Model]
+    :param objs: The instances to insert.
+    :type objs: Iterable[Model]
+    :param fields: The concrete fields to write, the other columns get their database default.
+    :type fields: Sequence[Field]
+    """
+    connection = cursor.db
+    quote_name = connection.ops.quote_name
+    buffer = io.StringIO()
+    for obj in objs:
+        values = (field.get_db_prep_save(getattr(obj, field.attname), connection) for field in fields)
+        buffer.write('\t'.join(map(format_copy_value, values)))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    columns = ', '.join(quote_name(field.column) for field in fields)
+    with connection.wrap_database_errors:
+        cursor.copy_expert(f'COPY {quote_name(model._meta.db_table)} ({columns}) FROM STDIN', buffer)
+
+
+def format_copy_value(value):
+    """Return `value` in the text format of `COPY`."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return str(value).translate(COPY_ESCAPES)
+
+
+def reserve_ids(cursor, model, count):
+    """Return `count` new values of the primary key sequence of `model`, to insert rows with known IDs."""
+    cursor.execute(
+        'SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+        [model._meta.db_table, model._meta.pk.column, count],
+    )
+    return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,116 @@
+import logging
+
+from django.contrib.postgres.operations import AddIndexConcurrently as PostgresAddIndexConcurrently
+from django.db import DatabaseError
+from django.db.migrations.operations import AddIndex
+from django.db.migrations.operations.base import Operation
+
+logger = logging.getLogger(__name__)
+
+
+class AddIndexConcurrently(PostgresAddIndexConcurrently):
+    """Create an index with `CREATE INDEX CONCURRENTLY` on PostgreSQL, and a regular one elsewhere.
+
+    Building the index concurrently does not lock the table against writes, so it can run on a
+    live database. Like the PostgreSQL operation, it must be used in a migration with
+    `atomic = False`.
+    """
+
+    def describe(self):
+        """Return a description of the operation, naming the index."""
+        return f'Concurrently create index {self.index.name} on model {self.model_name}'
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        """Create the index, concurrently on PostgreSQL."""
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        """Drop the index, concurrently on PostgreSQL."""
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class AddTrigramIndexConcurrently(Operation):
+    """Create a `pg_trgm` GIN index on `UPPER(column)` to serve `icontains` lookups on PostgreSQL.
+
+    The index is optional: the operation does nothing on other databases, and only logs a
+    warning when the `pg_trgm` extension cannot be installed, in which case the lookups still
+    work with a sequential scan. The index is not part of the model state, so it must be used
+    in a migration with `atomic = False` rather than declared in `Meta.indexes`.
+    """
+
+    reversible = True
+    atomic = False
+
+    def __init__(self, model_name, field_name, name):
+        """Initialize the operation.
+
+        :param model_name: The name of the model.
+        :type model_name: str
+        :param field_name: The name of the text field to index.
+        :type field_name: str
+        :param name: The name of the index.
+        :type name: str
+        """
+        self.model_name = model_name
+        self.field_name = field_name
+        self.name = name
+
+    def deconstruct(self):
+        """Return the arguments needed to recreate the operation."""
+        return self.__class__.__name__, [], {
+            'model_name': self.model_name,
+            'field_name': self.field_name,
+            'name': self.name,
+        }
+
+    def state_forwards(self, app_label, state):
+        """Leave the model state unchanged, the index only exists in the database."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        """Install `pg_trgm` if needed and create the index concurrently."""
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self._should_run(schema_editor, model) or not self._ensure_extension(schema_editor):
+            return
+
+        quote_name = schema_editor.quote_name
+        column = model._meta.get_field(self.field_name).column
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {quote_name(self.name)} '
+            f'ON {quote_name(model._meta.db_table)} USING gin (UPPER({quote_name(column)}) gin_trgm_ops)'
+        )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        """Drop the index concurrently if it exists."""
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self._should_run(schema_editor, model):
+            schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {schema_editor.quote_name(self.name)}')
+
+    def describe(self):
+        """Return a description of the operation, naming the index."""
+        return f'Concurrently create trigram index {self.name} on {self.model_name}.{self.field_name}'
+
+    @property
+    def migration_name_fragment(self):
+        """Return the fragment used for naming migrations holding the operation."""
+        return self.name.lower()
+
+    def _should_run(self, schema_editor, model):
+        if schema_editor.connection.vendor != 'postgresql':
+            return False
+        if schema_editor.connection.in_atomic_block:
+            raise DatabaseError(f'{self.__class__.__name__} cannot run inside a transaction (set atomic = False).')
+        return self.allow_migrate_model(schema_editor.connection.alias, model)
+
+    def _ensure_extension(self, schema_editor):
+        try:
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        except DatabaseError as exc:
+            logger.warning('Skipping the trigram index %s, pg_trgm is not available: %s', self.name, exc)
+            return False
+        return True
@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+from collections import deque
+
+from django.db import OperationalError
+
+pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    """Raised when no pooled connection becomes available within the pool timeout."""
+
+
+class ConnectionPool:
+    """Thread-safe pool of database connections shared by the threads of a worker process.
+
+    Connections are opened lazily up to `max_size`. When all of them are in use, callers wait
+    up to `timeout` seconds for one to be released before `PoolTimeout` is raised. Idle
+    connections older than `max_idle` seconds are closed instead of being reused.
+    """
+
+    def __init__(self, connect, max_size, timeout=5.0, max_idle=300.0):
+        """Initialize the pool.
+
+        :param connect: A callable opening a new DB-API connection.
+        :type connect: Callable
+        :param max_size: The maximum number of open connections.
+        :type max_size: int
+        :param timeout: How long (in seconds) to wait for a free connection.
+        :type timeout: float
+        :param max_idle: How long (in seconds) a connection may stay idle before it is closed.
+        :type max_idle: float
+        """
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.pid = os.getpid()
+        self._idle = deque()
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._condition = threading.Condition()
+        self.connections_opened = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.wait_time = 0.0
+
+    def acquire(self):
+        """Return an idle connection, open a new one, or wait for one to be released.
+
+        :return: An open DB-API connection.
+        :raises PoolTimeout: If no connection is released within the pool timeout.
+        """
+        started = time.monotonic()
+        waited = False
+        with self._condition:
+            while True:
+                while self._idle:
+                    connection, released_at = self._idle.pop()
+                    if connection.closed or time.monotonic() - released_at > self.max_idle:
+                        self._discard(connection)
+                        continue
+                    self._in_use += 1
+                    self._record_wait(waited, started)
+                    return connection
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    self._in_use += 1
+                    self._record_wait(waited, started)
+                    break
+
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self.timeouts += 1
+                    self._record_wait(waited, started)
+                    raise PoolTimeout(f'No database connection available within {self.timeout}s')
+                if not waited:
+                    waited = True
+                    self.waits += 1
+                self._waiting += 1
+                self._condition.wait(remaining)
+                self._waiting -= 1
+
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self.connections_opened += 1
+        return connection
+
+    def release(self, connection, discard=False):
+        """Return a connection to the pool, or close it if `discard` is set or it is broken.
+
+        :param connection: The connection returned by `acquire`.
+        :param discard: Whether the connection must not be reused.
+        :type discard: bool
+        """
+        with self._condition:
+            self._in_use -= 1
+            if discard or connection.closed:
+                self._discard(connection)
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def close_idle(self):
+        """Close every idle connection, e.g. before the database is dropped."""
+        with self._condition:
+            while self._idle:
+                self._discard(self._idle.pop()[0])
+
+    def stats(self):
+        """Return the current usage and the wait counters of the pool."""
+        with self._condition:
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'connections_opened': self.connections_opened,
+                'waits': self.waits,
+                'timeouts': self.timeouts,
+                'wait_time_ms': round(self.wait_time * 1000, 3),
+            }
+
+    def _discard(self, connection):
+        self._size -= 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _record_wait(self, waited, started):
+        if waited:
+            self.wait_time += time.monotonic() - started
+
+
+def get_pool(key, connect, max_size, timeout, max_idle):
+    """Return the pool for `key` in the current process, creating it on first use.
+
+    Pools are not shared with forked children, as connections cannot cross processes.
+    """
+    pool = pools.get(key)
+    if pool is None or pool.pid != os.getpid():
+        with _pools_lock:
+            pool = pools.get(key)
+            if pool is None or pool.pid != os.getpid():
+                pool = pools[key] = ConnectionPool(connect, max_size, timeout, max_idle)
+    return pool
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 hasher with the iteration count taken from `PASSWORD_PBKDF2_ITERATIONS`.
+
+    Passwords hashed with a different iteration count are rehashed on the next successful login.
+    """
+
+    @property
+    def iterations(self):
+        """Return the configured number of iterations."""
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2id hasher with the cost taken from the `PASSWORD_ARGON2_*` settings.
+
+    Passwords hashed with different parameters are rehashed on the next successful login.
+    """
+
+    @property
+    def time_cost(self):
+        """Return the configured number of passes."""
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        """Return the configured memory usage in KiB."""
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        """Return the configured number of lanes."""
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    """Bcrypt-SHA256 hasher with the work factor taken from `PASSWORD_BCRYPT_ROUNDS`.
+
+    Passwords hashed with a different work factor are rehashed on the next successful login.
+    """
+
+    @property
+    def rounds(self):
+        """Return the configured log2 work factor."""
+        return settings.PASSWORD_BCRYPT_ROUNDS
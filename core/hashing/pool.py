@@ -0,0 +1,125 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class PasswordHashingPool:
+    """Bounded pool of workers for hashing and checking passwords off the request thread.
+
+    At most `max_pending` jobs are queued or running at a time, so a signup storm applies
+    backpressure to the callers instead of growing an unbounded queue. With no workers, jobs
+    run inline on the calling thread.
+    """
+
+    def __init__(self, workers, executor='thread', max_pending=None):
+        """Initialize the pool.
+
+        :param workers: The number of worker threads or processes, 0 to hash inline.
+        :type workers: int
+        :param executor: Either `thread` or `process`.
+        :type executor: str
+        :param max_pending: The maximum number of queued and running jobs.
+        :type max_pending: int | None
+        """
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max_pending or max(workers, 1) * 4)
+        if not workers:
+            self._executor = None
+        elif executor == 'process':
+            self._executor = ProcessPoolExecutor(workers, initializer=init_worker)
+        else:
+            self._executor = ThreadPoolExecutor(workers, thread_name_prefix='password-hashing')
+
+    def submit(self, fn, *args):
+        """Schedule `fn(*args)` on the pool, waiting for a free slot if the pool is saturated.
+
+        :return: A future holding the result of the call.
+        :rtype: Future
+        """
+        self._slots.acquire()
+        return self._submit(fn, *args)
+
+    async def asubmit(self, fn, *args):
+        """Schedule `fn(*args)` on the pool and await its result without blocking the event loop."""
+        if not self._slots.acquire(blocking=False):
+            await asyncio.get_running_loop().run_in_executor(None, self._slots.acquire)
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def hash(self, password):
+        """Return the hash of `password` computed on the pool."""
+        return self.submit(make_password, password).result()
+
+    def hash_many(self, passwords):
+        """Return the hashes of `passwords`, computed in parallel on the pool."""
+        futures = [self.submit(make_password, password) for password in passwords]
+        return [future.result() for future in futures]
+
+    async def ahash(self, password):
+        """Return the hash of `password`, awaiting the pool."""
+        return await self.asubmit(make_password, password)
+
+    async def acheck(self, password, encoded):
+        """Return whether `password` matches the `encoded` hash, awaiting the pool."""
+        return await self.asubmit(check_password, password, encoded)
+
+    def shutdown(self):
+        """Stop the workers once the pending jobs are done."""
+        if self._executor:
+            self._executor.shutdown()
+
+    def _submit(self, fn, *args):
+        try:
+            if self._executor:
+                future = self._executor.submit(fn, *args)
+            else:
+                future = Future()
+                try:
+                    future.set_result(fn(*args))
+                except Exception as exc:
+                    future.set_exception(exc)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+
+def get_hashing_pool():
+    """Return the process-wide password hashing pool configured by the `PASSWORD_HASHING_*` settings."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PasswordHashingPool(
+                    settings.PASSWORD_HASHING_WORKERS,
+                    settings.PASSWORD_HASHING_EXECUTOR,
+                    settings.PASSWORD_HASHING_MAX_PENDING,
+                )
+    return _pool
+
+
+@receiver(setting_changed)
+def reset_hashing_pool(setting, **kwargs):
+    """Rebuild the pool when its settings are overridden, e.g. in tests."""
+    global _pool
+    if setting.startswith('PASSWORD_HASHING_') and _pool is not None:
+        with _pool_lock:
+            _pool.shutdown()
+            _pool = None
+
+
+def init_worker():
+    """Load the Django settings and apps in a worker process that was spawned rather than forked."""
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
@@ -0,0 +1,43 @@
+import logging
+import random
+import zlib
+
+from .context import request_id
+
+
+class RequestIDFilter(logging.Filter):
+    """Attach the ID of the request being served to every record, as `record.request_id`."""
+
+    def filter(self, record):
+        """Add the request ID and keep the record."""
+        record.request_id = request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of the records at or below `level`, and every record above it.
+
+    Records of the same request are kept or dropped together, so a sampled request keeps all
+    of its log lines.
+    """
+
+    def __init__(self, rate=1.0, level='INFO', name=''):
+        """Initialize the filter.
+
+        :param rate: The fraction of the records to keep, between 0 and 1.
+        :type rate: float
+        :param level: The highest level that is sampled.
+        :type level: str | int
+        """
+        super().__init__(name)
+        self.rate = float(rate)
+        self.level = logging.getLevelName(level) if isinstance(level, str) else level
+
+    def filter(self, record):
+        """Return whether the record is kept."""
+        if record.levelno > self.level or self.rate >= 1:
+            return True
+        current_request_id = request_id.get()
+        if current_request_id is None:
+            return random.random() < self.rate
+        return zlib.crc32(current_request_id.encode()) % 10000 < self.rate * 10000
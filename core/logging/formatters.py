@@ -0,0 +1,33 @@
+import json
+import logging
+from datetime import datetime, timezone
+
+# Attributes every `LogRecord` has, anything else on a record was passed with `extra`.
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line, with the request ID and the `extra` fields."""
+
+    def format(self, record):
+        """Return the record serialized as JSON."""
+        data = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in RECORD_ATTRIBUTES and key not in data:
+                data[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exc_info'] = record.exc_text
+        if record.stack_info:
+            data['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
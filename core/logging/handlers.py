@@ -0,0 +1,231 @@
+import fcntl
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler that writes batches of formatted lines, rotating on size or on age.
+
+    The file is rotated when the next batch would make it larger than `max_bytes`, or when it
+    was last rotated more than `interval` seconds ago. Either limit is disabled when it is 0.
+
+    The file may be shared by several processes, e.g. the gunicorn workers. Batches are written
+    under an exclusive lock on `<filename>.lock`, whose modification time is the time of the last
+    rotation, the limits apply to the file rather than to what this process wrote, and a process
+    reopens the file when another one rotated it.
+    """
+
+    def __init__(self, filename, max_bytes=0, backup_count=0, interval=0, encoding='utf-8'):
+        """Initialize the handler, opening the file on the first write."""
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding, delay=True)
+        self.interval = interval
+        self.lock_filename = f'{self.baseFilename}.lock'
+
+    def write_batch(self, text):
+        """Append the already formatted `text` to the file, rotating it first if needed."""
+        # The lock file is opened for every batch: a lock taken on a descriptor inherited through
+        # a fork would be shared with the parent instead of excluding it.
+        with self.lock, open(self.lock_filename, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self.reopen_if_rotated()
+            if self.stream is None:
+                self.stream = self._open()
+            if self.should_rollover(len(text.encode(self.encoding or 'utf-8'))):
+                self.doRollover()
+                os.utime(self.lock_filename)
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(text)
+            self.stream.flush()
+
+    def reopen_if_rotated(self):
+        """Close the stream if the file it writes to was rotated, by this or another process."""
+        if self.stream is None:
+            return
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            current = None
+        opened = os.fstat(self.stream.fileno())
+        if current is None or (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino):
+            self.stream.close()
+            self.stream = None
+
+    def should_rollover(self, size):
+        """Return whether the file must be rotated before `size` more bytes are written to it."""
+        current_size = os.fstat(self.stream.fileno()).st_size
+        if not current_size:
+            return False
+        if self.interval and time.time() - os.stat(self.lock_filename).st_mtime >= self.interval:
+            return True
+        return bool(self.maxBytes) and current_size + size > self.maxBytes
+
+
+class BatchedStreamHandler(logging.StreamHandler):
+    """Stream handler that writes batches of formatted lines, e.g. to the stderr of a container."""
+
+    def write_batch(self, text):
+        """Write the already formatted `text` to the stream."""
+        with self.lock:
+            self.stream.write(text)
+            self.flush()
+
+
+class BackgroundQueueHandler(logging.handlers.QueueHandler):
+    """Handler that only enqueues records, leaving formatting and I/O to a background thread.
+
+    The calling thread never blocks on the disk or on a lock: records are appended to a
+    bounded deque, and when it is full they are dropped and counted. A listener thread wakes
+    up every `flush_interval` seconds, takes up to `batch_size` records at a time, formats them
+    with the formatter of this handler and writes each batch at once, to a rotating file or to
+    stderr if no `filename` is given.
+
+    The listener is started on the first record of every process, so workers forked from a
+    preloaded master each get their own.
+    """
+
+    def __init__(
+        self, filename=None, max_bytes=0, backup_count=0, interval=0, queue_size=10000, batch_size=500,
+        flush_interval=0.05
+    ):
+        """Initialize the handler.
+
+        :param filename: The file to write to, stderr if it is empty.
+        :type filename: str | None
+        :param max_bytes: The size at which the file is rotated, 0 to disable.
+        :type max_bytes: int
+        :param backup_count: The number of rotated files to keep.
+        :type backup_count: int
+        :param interval: The age (in seconds) at which the file is rotated, 0 to disable.
+        :type interval: float
+        :param queue_size: The maximum number of records waiting to be written.
+        :type queue_size: int
+        :param batch_size: The maximum number of records written at once.
+        :type batch_size: int
+        :param flush_interval: How long (in seconds) the listener sleeps when there is nothing to write.
+        :type flush_interval: float
+        """
+        super().__init__(deque())
+        if filename:
+            self.target = BatchedRotatingFileHandler(filename, max_bytes, backup_count, interval)
+        else:
+            self.target = BatchedStreamHandler()
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._listener = None
+        self._pid = None
+        self._stopping = False
+        self._wakeup = threading.Event()
+        self._idle = threading.Event()
+        self._listener_lock = threading.Lock()
+
+    def handle(self, record):
+        """Filter and enqueue the record, without the handler lock the queue does not need."""
+        keep = self.filter(record)
+        if keep:
+            self.emit(record)
+        return keep
+
+    def prepare(self, record):
+        """Return the record made safe to format later on another thread.
+
+        Only the message is merged with its arguments and the traceback is rendered here,
+        while they are still valid. The formatting itself is left to the listener.
+        """
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = (self.formatter or logging.Formatter()).formatException(record.exc_info)
+        return record
+
+    def enqueue(self, record):
+        """Append the record to the queue, or drop it if the queue is full."""
+        if self._pid != os.getpid():
+            self.start()
+        if len(self.queue) < self.queue_size:
+            self.queue.append(record)
+        else:
+            self.dropped += 1
+
+    def start(self):
+        """Start the listener thread of the current process if it is not running yet."""
+        with self._listener_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # A forked child inherits the queued records of the parent, which the parent writes.
+                self.queue = deque()
+            self._stopping = False
+            self._listener = threading.Thread(target=self._listen, name='log-listener', daemon=True)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def flush(self):
+        """Wait until every queued record is written."""
+        self._wakeup.set()
+        while self._pid == os.getpid() and self._listener.is_alive() and (self.queue or not self._idle.is_set()):
+            time.sleep(self.flush_interval / 10)
+
+    def close(self):
+        """Write the queued records and stop the listener."""
+        with self._listener_lock:
+            if self._pid == os.getpid() and self._listener.is_alive():
+                self._stopping = True
+                self._wakeup.set()
+                self._listener.join(timeout=5)
+            self._pid = None
+        self.target.close()
+        super().close()
+
+    def _listen(self):
+        while True:
+            self._idle.clear()
+            while self.queue:
+                batch = []
+                while self.queue and len(batch) < self.batch_size:
+                    batch.append(self.queue.popleft())
+                self._write(batch)
+            self._idle.set()
+            if self._stopping and not self.queue:
+                return
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+
+    def _write(self, records):
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record) + '\n')
+            except Exception:
+                self.handleError(record)
+
+        dropped = self.dropped
+        if dropped > self._reported_dropped:
+            # Formatted like the other records, so the output stays one JSON object per line.
+            count = dropped - self._reported_dropped
+            record = logger.makeRecord(
+                logger.name, logging.WARNING, __file__, 0, '%s log records dropped, the log queue was full',
+                (count,), None, extra={'dropped': count},
+            )
+            try:
+                lines.append(self.format(record) + '\n')
+            except Exception:
+                self.handleError(record)
+            self._reported_dropped = dropped
+
+        if lines:
+            try:
+                self.target.write_batch(''.join(lines))
+            except Exception:
+                if records:
+                    self.handleError(records[-1])
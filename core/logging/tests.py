@@ -0,0 +1,92 @@
+import json
+import logging
+import os
+import tempfile
+
+from rest_framework.test import APITestCase
+
+from .context import request_id
+from .filters import RequestIDFilter
+from .formatters import JSONFormatter
+from .handlers import BackgroundQueueHandler, BatchedRotatingFileHandler
+
+
+class LoggingPipelineTestCase(APITestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.filename = os.path.join(self.directory.name, 'app.log')
+
+    def build_logger(self, **kwargs):
+        handler = BackgroundQueueHandler(self.filename, **kwargs)
+        handler.setFormatter(JSONFormatter())
+        handler.addFilter(RequestIDFilter())
+        self.addCleanup(handler.close)
+        logger = logging.getLogger(f'tests.{self.id()}')
+        logger.propagate = False
+        logger.handlers = [handler]
+        logger.setLevel(logging.INFO)
+        return logger, handler
+
+    def test_request_id_header(self):
+        response = self.client.get('/health_check/live', HTTP_X_REQUEST_ID='lb-123')
+        self.assertEqual(response['X-Request-ID'], 'lb-123')
+        response = self.client.get('/health_check/live', HTTP_X_REQUEST_ID='bad\nid')
+        self.assertEqual(len(response['X-Request-ID']), 32)
+
+    def test_records_are_written_as_json_lines(self):
+        logger, handler = self.build_logger()
+        token = request_id.set('abc')
+        try:
+            logger.info('Created %s users', 3, extra={'endpoint': 'users'})
+        finally:
+            request_id.reset(token)
+        handler.flush()
+
+        with open(self.filename) as file:
+            record = json.loads(file.readline())
+        self.assertEqual(record['message'], 'Created 3 users')
+        self.assertEqual(record['request_id'], 'abc')
+        self.assertEqual(record['endpoint'], 'users')
+
+    def test_file_is_rotated_by_size(self):
+        logger, handler = self.build_logger(max_bytes=1024, backup_count=2, batch_size=5)
+        for index in range(100):
+            logger.info('Record %s', index)
+        handler.flush()
+        self.assertTrue(os.path.exists(f'{self.filename}.1'))
+        self.assertFalse(os.path.exists(f'{self.filename}.3'))
+
+    def test_file_shared_by_processes_is_rotated_once(self):
+        first, second = (BatchedRotatingFileHandler(self.filename, 100, 3, interval=3600) for _ in range(2))
+        self.addCleanup(first.close)
+        self.addCleanup(second.close)
+
+        first.write_batch('a' * 60 + '\n')
+        second.write_batch('b' * 60 + '\n')
+        # The first process writes to the new file, not to the backup the second one rotated it to.
+        first.write_batch('c\n')
+        with open(f'{self.filename}.1') as file:
+            self.assertEqual(file.read(), 'a' * 60 + '\n')
+        with open(self.filename) as file:
+            self.assertEqual(file.read(), 'b' * 60 + '\nc\n')
+
+        os.utime(first.lock_filename, (0, 0))
+        first.write_batch('d\n')
+        second.write_batch('e\n')
+        with open(self.filename) as file:
+            self.assertEqual(file.read(), 'd\ne\n')
+        self.assertFalse(os.path.exists(f'{self.filename}.3'))
+
+    def test_records_are_dropped_when_the_queue_is_full(self):
+        logger, handler = self.build_logger(queue_size=1, flush_interval=60)
+        handler.start()
+        for index in range(10):
+            logger.info('Record %s', index)
+        self.assertGreater(handler.dropped, 0)
+
+        handler.flush()
+        with open(self.filename) as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(records[-1]['level'], 'WARNING')
+        self.assertEqual(records[-1]['dropped'], handler.dropped)
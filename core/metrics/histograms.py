@@ -0,0 +1,101 @@
+import bisect
+import math
+import threading
+
+histograms = {}
+_histograms_lock = threading.Lock()
+
+
+class Histogram:
+    """Thread-safe Prometheus-style histogram with cumulative buckets, labelled by arbitrary values.
+
+    The counters live in the memory of the current process, so every worker exposes its own
+    series and the scraper (or a recording rule) sums them across workers.
+    """
+
+    def __init__(self, name, documentation, buckets, label_names=()):
+        """Initialize the histogram.
+
+        :param name: The metric name, without the `_bucket`, `_sum` and `_count` suffixes.
+        :type name: str
+        :param documentation: The help text of the metric.
+        :type documentation: str
+        :param buckets: The upper bounds of the buckets, in increasing order.
+        :type buckets: Iterable[float]
+        :param label_names: The names of the labels of every observation.
+        :type label_names: tuple[str]
+        """
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.label_names = label_names
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        """Record `value` in the series identified by the `labels` values."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def collect(self):
+        """Return a snapshot of every series as `(labels, cumulative_counts, sum)` tuples."""
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+
+        result = []
+        for labels, counts, total in snapshot:
+            cumulative = []
+            running = 0
+            for count in counts:
+                running += count
+                cumulative.append(running)
+            result.append((labels, cumulative, total))
+        return result
+
+    def render(self):
+        """Return the histogram in the Prometheus text exposition format."""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        bounds = [*map(format_value, self.buckets), '+Inf']
+        for labels, cumulative, total in self.collect():
+            label_pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(self.label_names, labels)]
+            for bound, count in zip(bounds, cumulative):
+                bucket_labels = format_labels([*label_pairs, f'le="{bound}"'])
+                lines.append(f'{self.name}_bucket{bucket_labels} {count}')
+            lines.append(f'{self.name}_sum{format_labels(label_pairs)} {format_value(total)}')
+            lines.append(f'{self.name}_count{format_labels(label_pairs)} {cumulative[-1]}')
+        return '\n'.join(lines)
+
+
+def get_histogram(name, documentation, buckets, label_names=()):
+    """Return the histogram registered under `name`, creating it on first use."""
+    histogram = histograms.get(name)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = histograms.get(name)
+            if histogram is None:
+                histogram = histograms[name] = Histogram(name, documentation, buckets, label_names)
+    return histogram
+
+
+def format_value(value):
+    """Format a sample value the way Prometheus expects it."""
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(label_pairs):
+    """Return the `{name="value",...}` label set of a sample, or nothing if it has no labels."""
+    return f'{{{",".join(label_pairs)}}}' if label_pairs else ''
+
+
+def escape_label(value):
+    """Escape a label value for the Prometheus text format."""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
@@ -0,0 +1,31 @@
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+from core.cache.read_through import registry
+from core.db.pool import pools
+
+from .histograms import escape_label, histograms
+
+
+@require_GET
+def metrics_view(request):
+    """Return the metrics of the current worker process in the Prometheus text format."""
+    lines = [histogram.render() for histogram in list(histograms.values())]
+
+    lines.append('# HELP read_through_cache_requests_total Read-through cache lookups by result.')
+    lines.append('# TYPE read_through_cache_requests_total counter')
+    for namespace, cache in list(registry.items()):
+        stats = cache.stats()
+        for result, count in (('hit', stats['hits']), ('miss', stats['misses'])):
+            lines.append(
+                f'read_through_cache_requests_total{{cache="{escape_label(namespace)}",result="{result}"}} {count}'
+            )
+
+    lines.append('# HELP db_pool_connections Connections of the database pools by state.')
+    lines.append('# TYPE db_pool_connections gauge')
+    for key, pool in list(pools.items()):
+        stats = pool.stats()
+        for state in ('in_use', 'idle', 'waiting'):
+            lines.append(f'db_pool_connections{{pool="{escape_label(key)}",state="{state}"}} {stats[state]}')
+
+    return HttpResponse('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,130 @@
+import gzip
+import zlib
+
+import brotli
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress responses with Brotli or gzip, depending on what the client accepts.
+
+    Unlike Django's `GZipMiddleware`, only the media types of `COMPRESSION_CONTENT_TYPES` are
+    compressed, responses shorter than `COMPRESSION_MIN_SIZE` are sent as is, and Brotli is
+    preferred when the `Accept-Encoding` header allows it. Streaming responses are compressed
+    chunk by chunk, flushing after each one so that the chunks are not held back.
+
+    It should come before `ConditionalGetMiddleware`, so that ETags are computed and compared
+    on the uncompressed content.
+    """
+
+    def process_response(self, request, response):
+        """Return the response compressed with the preferred encoding accepted by the client."""
+        if response.has_header('Content-Encoding') or not self.is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = get_preferred_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_async_chunks(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compress_chunks(response.streaming_content, encoding)
+            del response.headers['Content-Length']
+        else:
+            content = compress(response.content, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        # The compressed body is not byte-identical to the one the ETag was computed on.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = f'W/{etag}'
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def is_compressible(response):
+        """Return whether the response has a compressible media type and is long enough."""
+        media_type = response.get('Content-Type', '').partition(';')[0].strip().lower()
+        if media_type not in settings.COMPRESSION_CONTENT_TYPES:
+            return False
+        return response.streaming or len(response.content) >= settings.COMPRESSION_MIN_SIZE
+
+
+def get_preferred_encoding(accept_encoding):
+    """Return `br` or `gzip`, whichever is preferred in the `Accept-Encoding` header, or `None`.
+
+    :param accept_encoding: The value of the `Accept-Encoding` request header.
+    :type accept_encoding: str
+    :return: The content coding to use.
+    :rtype: str | None
+    """
+    qualities = {}
+    for item in accept_encoding.lower().split(','):
+        coding, _, params = item.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip()] = quality
+
+    wildcard = qualities.get('*', 0.0)
+    candidates = [(qualities.get(coding, wildcard), coding) for coding in ('br', 'gzip')]
+    quality, coding = max(candidates, key=lambda candidate: candidate[0])
+    return coding if quality > 0 else None
+
+
+def compress(content, encoding):
+    """Return `content` compressed with `encoding`."""
+    if encoding == 'br':
+        return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(content, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def compress_chunks(chunks, encoding):
+    """Yield the compressed stream of `chunks`, flushed after each chunk."""
+    compressor = _Compressor(encoding)
+    for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.finish()
+
+
+async def compress_async_chunks(chunks, encoding):
+    """Yield the compressed stream of the async iterator `chunks`, flushed after each chunk."""
+    compressor = _Compressor(encoding)
+    async for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.finish()
+
+
+class _Compressor:
+    def __init__(self, encoding):
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._brotli = None
+            # wbits=31 writes a gzip header and trailer around the deflate stream.
+            self._zlib = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, chunk):
+        if self._brotli is not None:
+            return self._brotli.process(chunk) + self._brotli.flush()
+        return self._zlib.compress(chunk) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
@@ -0,0 +1,213 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from core.metrics.histograms import get_histogram
+
+logger = logging.getLogger('core.performance')
+
+_current_metrics = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Timings and counters collected while a single request is served."""
+
+    def __init__(self):
+        """Start the clock of the request."""
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        self.serializing = False
+        self.response_size = None
+        self.recorded_queries = []
+
+    def record_query(self, sql, duration):
+        """Count a query, keeping its SQL up to `PERFORMANCE_MAX_RECORDED_QUERIES` queries."""
+        self.queries += 1
+        self.db_time += duration
+        if len(self.recorded_queries) < settings.PERFORMANCE_MAX_RECORDED_QUERIES:
+            self.recorded_queries.append((sql, duration))
+
+    def get_server_timing(self):
+        """Return the value of the `Server-Timing` header."""
+        return ', '.join(
+            [
+                f'total;dur={self.duration * 1000:.3f}',
+                f'db;dur={self.db_time * 1000:.3f}',
+                f'serialize;dur={self.serialize_time * 1000:.3f}',
+                f'render;dur={self.render_time * 1000:.3f}',
+                f'queries;desc="{self.queries}"',
+            ]
+        )
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper counting and timing the queries run on behalf of the current request."""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, time.perf_counter() - started)
+
+
+@contextmanager
+def measure_serialization():
+    """Add the time spent in the block to the serialization time of the current request.
+
+    Nested blocks, e.g. a serializer building the data of another one, are counted once.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+
+    metrics.serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serialize_time += time.perf_counter() - started
+        metrics.serializing = False
+
+
+@receiver(connection_created)
+def install_query_recorder(connection, **kwargs):
+    """Wrap every database connection, so queries run from any thread or async task are recorded."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class PerformanceMiddleware:
+    """Measure every request and publish the measurements.
+
+    The wall time, the number and duration of the queries, the time spent serializing (in the
+    blocks wrapped in `measure_serialization`, e.g. by `MeasuredSerializerMixin`), the rendering
+    time of template responses and the response size are sent back in a `Server-Timing` header,
+    logged on one line, and recorded in per-endpoint histograms served by the metrics view.
+    Requests slower than `PERFORMANCE_SLOW_REQUEST_MS` are also logged with their SQL.
+
+    It should be the first middleware, so that the time spent in the others is measured too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """Initialize the middleware for a sync or an async handler chain."""
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Serve the request, measuring it."""
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        # Connections opened before this module was imported did not get the wrapper on creation.
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+        metrics = request.performance_metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        """Serve the request on the async handler chain, measuring it."""
+        metrics = request.performance_metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        """Time the rendering of DRF and template responses, which happens right after this hook."""
+        metrics = getattr(request, 'performance_metrics', None)
+        if metrics is not None:
+            started = time.perf_counter()
+
+            def record_render_time(rendered):
+                metrics.render_time += time.perf_counter() - started
+
+            response.add_post_render_callback(record_render_time)
+        return response
+
+    def finish(self, request, response, metrics):
+        """Publish the measurements of a served request."""
+        metrics.duration = time.perf_counter() - metrics.started
+        if not response.streaming:
+            metrics.response_size = len(response.content)
+        if settings.PERFORMANCE_SERVER_TIMING:
+            response['Server-Timing'] = metrics.get_server_timing()
+
+        endpoint = get_endpoint(request)
+        labels = (request.method, endpoint, str(response.status_code))
+        get_histogram(
+            'http_request_duration_seconds', 'Time spent serving HTTP requests.',
+            settings.PERFORMANCE_DURATION_BUCKETS, ('method', 'endpoint', 'status'),
+        ).observe(metrics.duration, *labels)
+        get_histogram(
+            'http_request_db_queries', 'Database queries run per HTTP request.',
+            settings.PERFORMANCE_QUERY_COUNT_BUCKETS, ('method', 'endpoint', 'status'),
+        ).observe(metrics.queries, *labels)
+        get_histogram(
+            'http_request_db_duration_seconds', 'Time spent in the database per HTTP request.',
+            settings.PERFORMANCE_DURATION_BUCKETS, ('method', 'endpoint', 'status'),
+        ).observe(metrics.db_time, *labels)
+        if metrics.response_size is not None:
+            get_histogram(
+                'http_response_size_bytes', 'Size of the HTTP response bodies.',
+                settings.PERFORMANCE_SIZE_BUCKETS, ('method', 'endpoint', 'status'),
+            ).observe(metrics.response_size, *labels)
+
+        log_data = {
+            'method': request.method,
+            'path': request.path,
+            'endpoint': endpoint,
+            'status': response.status_code,
+            'duration_ms': round(metrics.duration * 1000, 3),
+            'db_queries': metrics.queries,
+            'db_ms': round(metrics.db_time * 1000, 3),
+            'serialize_ms': round(metrics.serialize_time * 1000, 3),
+            'render_ms': round(metrics.render_time * 1000, 3),
+            'response_bytes': metrics.response_size,
+        }
+        logger.info(
+            '%(method)s %(path)s %(status)s %(duration_ms)sms %(db_queries)s queries', log_data, extra=log_data
+        )
+        if metrics.duration * 1000 >= settings.PERFORMANCE_SLOW_REQUEST_MS:
+            logger.warning(
+                'Slow request %s %s took %.1fms with %s queries:\n%s',
+                request.method, request.path, metrics.duration * 1000, metrics.queries,
+                '\n'.join(f'[{duration * 1000:.3f}ms] {sql}' for sql, duration in metrics.recorded_queries),
+                extra=log_data,
+            )
+
+
+def get_endpoint(request):
+    """Return the URL pattern that served the request, which keeps the number of series bounded."""
+    resolver_match = getattr(request, 'resolver_match', None)
+    if resolver_match is None:
+        return 'unmatched'
+    return resolver_match.route or resolver_match.view_name
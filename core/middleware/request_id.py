@@ -0,0 +1,57 @@
+import re
+import uuid
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from core.logging.context import request_id
+
+# IDs sent by a proxy are reused only if they cannot inject anything into the logs.
+VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._:-]{1,128}$')
+
+
+class RequestIDMiddleware:
+    """Identify every request, so that all of its log records can be correlated.
+
+    The ID sent by the load balancer in `X-Request-ID` is reused, otherwise a new one is
+    generated. It is available to the logging filters while the request is served, and sent
+    back in the `X-Request-ID` response header.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """Initialize the middleware for a sync or an async handler chain."""
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Serve the request with its ID set."""
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = request_id.set(self.get_request_id(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id.reset(token)
+        response['X-Request-ID'] = request.request_id
+        return response
+
+    async def __acall__(self, request):
+        """Serve the request on the async handler chain with its ID set."""
+        token = request_id.set(self.get_request_id(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_id.reset(token)
+        response['X-Request-ID'] = request.request_id
+        return response
+
+    @staticmethod
+    def get_request_id(request):
+        """Return the ID of the request, storing it on the request as `request_id`."""
+        value = request.headers.get('X-Request-ID', '')
+        request.request_id = value if VALID_REQUEST_ID.match(value) else uuid.uuid4().hex
+        return request.request_id
@@ -0,0 +1,306 @@
+import base64
+import hashlib
+import json
+from datetime import date, datetime
+
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Keyset (cursor) pagination class for paginating large querysets.
+
+    Instead of `COUNT(*)` plus `OFFSET`, every page is fetched with a `WHERE` clause on the
+    ordering columns of the last seen row, so the cost of a page does not depend on its depth.
+
+    - `page_size`: The default page size.
+    - `page_size_query_param`: The query parameter for specifying the page size.
+    - `max_page_size`: The maximum allowed page size.
+    - `cursor_query_param`: The query parameter holding the opaque cursor.
+    - `total_query_param`: The query parameter that requests an approximate `total_items`.
+    - `ordering`: The ordering of the pages, the last field must be unique to break ties.
+    - `count_cache_timeout`: How long (in seconds) a computed total is cached.
+    - `estimate_threshold`: Tables estimated below this many rows are counted exactly.
+    """
+
+    page_size = 5
+    page_size_query_param = 'size'
+    max_page_size = 20
+    cursor_query_param = 'cursor'
+    total_query_param = 'with_total'
+    ordering = ('-created_at', '-id')
+    count_cache_timeout = 60
+    estimate_threshold = 10000
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return a single page of results, or `None` if pagination is disabled.
+
+        :param queryset: The queryset to paginate.
+        :type queryset: QuerySet
+        :param request: The incoming request.
+        :type request: Request
+        :param view: The view that is paginating the queryset.
+        :type view: APIView
+        :return: The list of items on the requested page.
+        :rtype: list
+        """
+        page_queryset = self.get_page_queryset(queryset, request)
+        if page_queryset is None:
+            return None
+        return self.set_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Return a single page of results fetched with the async ORM, like `paginate_queryset`."""
+        page_queryset = self.get_page_queryset(queryset, request)
+        if page_queryset is None:
+            return None
+        return self.set_page([item async for item in page_queryset])
+
+    def get_page_queryset(self, queryset, request):
+        """Return the sliced queryset fetching the requested page plus one row to detect more pages.
+
+        :param queryset: The queryset to paginate.
+        :type queryset: QuerySet
+        :param request: The incoming request.
+        :type request: Request
+        :return: The queryset of the page, or `None` if pagination is disabled.
+        :rtype: QuerySet | None
+        """
+        self.request = request
+        self.queryset = queryset
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.cursor = self.decode_cursor(request, queryset.model)
+        ordering = self.get_ordering(self.is_reversed)
+
+        queryset = queryset.order_by(*ordering)
+        loaded_fields, deferred = queryset.query.deferred_loading
+        if loaded_fields and not deferred:
+            # The cursors are built from the ordering fields, so they must not be left out by `only()`.
+            queryset = queryset.only(*loaded_fields, *(field.lstrip('-') for field in self.ordering))
+        if self.cursor:
+            queryset = queryset.filter(self._build_keyset_filter(self.cursor['position'], ordering))
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        """Store the page fetched by the queryset of `get_page_queryset` and return its items.
+
+        :param results: The rows fetched for the page.
+        :type results: list
+        :return: The items on the page.
+        :rtype: list
+        """
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.is_reversed:
+            self.page.reverse()
+
+        self.next_position, self.prev_position = self._get_edge_positions(has_more, self.is_reversed)
+        return self.page
+
+    @property
+    def is_reversed(self):
+        """Return whether the current page is fetched backwards from the cursor."""
+        return bool(self.cursor and self.cursor['reverse'])
+
+    def get_paginated_response(self, data):
+        """Return a paginated response for a list of data.
+
+        :param data: The list of data to include in the response.
+        :type data: list
+        :return: A Response object containing the paginated data and metadata.
+        :rtype: Response
+        """
+        return Response(self.get_paginated_payload(data))
+
+    def get_paginated_payload(self, data):
+        """Return the paginated envelope for a list of data.
+
+        The envelope keeps the `prev`/`next`/`data` keys of `PagePagination`. `total_items` is
+        only included when requested with the `total_query_param`, and is approximate.
+
+        :param data: The list of data to include in the response.
+        :type data: list
+        :return: The data with the pagination metadata.
+        :rtype: dict
+        """
+        payload = {}
+        if self.request.query_params.get(self.total_query_param) in ('1', 'true', 'True'):
+            payload['total_items'] = self.get_total_items(self.queryset)
+        payload.update(
+            {
+                'prev': self.get_previous_link(),
+                'next': self.get_next_link(),
+                'data': data
+            }
+        )
+        return payload
+
+    def get_page_size(self, request):
+        """Return the page size requested by the client, capped by `max_page_size`.
+
+        :param request: The incoming request.
+        :type request: Request
+        :return: The page size to use.
+        :rtype: int
+        """
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, reverse=False):
+        """Return the ordering of the page, inverted when walking backwards.
+
+        :param reverse: Whether the page is fetched backwards from the cursor.
+        :type reverse: bool
+        :return: The ordering expressions for `order_by`.
+        :rtype: tuple
+        """
+        if not reverse:
+            return self.ordering
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering)
+
+    def get_next_link(self):
+        """Return the URL of the next page, or `None` on the last page."""
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        """Return the URL of the previous page, or `None` on the first page."""
+        if self.prev_position is None:
+            return None
+        return self.encode_cursor(self.prev_position, reverse=True)
+
+    def get_position(self, item):
+        """Return the values of the ordering fields for a page item.
+
+        :param item: A model instance (or a row with attribute access) from the page.
+        :type item: object
+        :return: The values of the ordering fields.
+        :rtype: list
+        """
+        return [getattr(item, field.lstrip('-')) for field in self.ordering]
+
+    def encode_cursor(self, position, reverse):
+        """Return the URL of the current request with an opaque cursor for `position`.
+
+        :param position: The values of the ordering fields of the boundary row.
+        :type position: list
+        :param reverse: Whether the cursor walks backwards.
+        :type reverse: bool
+        :return: The absolute URL of the page.
+        :rtype: str
+        """
+        raw = json.dumps({'p': [_encode_value(value) for value in position], 'r': int(reverse)})
+        token = base64.urlsafe_b64encode(raw.encode()).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        """Return the decoded cursor of the request, or `None` for the first page.
+
+        :param request: The incoming request.
+        :type request: Request
+        :param model: The model being paginated, used to parse the cursor values.
+        :type model: type[Model]
+        :return: A dict with the `position` and `reverse` flag of the cursor.
+        :rtype: dict | None
+        :raises NotFound: If the cursor is malformed.
+        """
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            values = data['p']
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except Exception as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+        return {'position': position, 'reverse': bool(data.get('r'))}
+
+    def get_total_items(self, queryset):
+        """Return an approximate number of items in the queryset without an exact `COUNT(*)`.
+
+        Unfiltered querysets on PostgreSQL use the planner statistics from `pg_class.reltuples` when
+        they estimate at least `estimate_threshold` rows. Everything else falls back to an exact
+        count that is cached for `count_cache_timeout`.
+
+        :param queryset: The (unordered, unsliced) queryset being paginated.
+        :type queryset: QuerySet
+        :return: The approximate number of items.
+        :rtype: int
+        """
+        if not queryset.query.where:
+            estimate = _estimate_table_rows(queryset)
+            # The statistics of small tables are often stale, and counting them exactly is cheap.
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+
+        sql, params = queryset.order_by().query.sql_with_params()
+        digest = hashlib.md5(f'{queryset.db}:{sql}:{params!r}'.encode()).hexdigest()
+        return cache.get_or_set(f'pagination:count:{digest}', queryset.count, self.count_cache_timeout)
+
+    def _build_keyset_filter(self, position, ordering):
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _get_edge_positions(self, has_more, reverse):
+        cursor_position = self.cursor['position'] if self.cursor else None
+        if not self.page:
+            if reverse:
+                return cursor_position, None
+            return None, cursor_position
+
+        first, last = self.get_position(self.page[0]), self.get_position(self.page[-1])
+        if reverse:
+            return last, first if has_more else None
+        return last if has_more else None, first if self.cursor else None
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _estimate_table_rows(queryset):
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [connection.ops.quote_name(queryset.model._meta.db_table)]
+        )
+        row = cursor.fetchone()
+
+    # `reltuples` is -1 for tables that were never vacuumed or analyzed.
+    if not row or row[0] < 0:
+        return None
+    return row[0]
@@ -0,0 +1,57 @@
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    # Without orjson, JSON is encoded by the standard library like the DRF renderer does.
+    orjson = None
+
+if orjson is not None:
+    # orjson encodes datetimes itself, but in another format than DRF, so they go through the DRF encoder too.
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSON renderer encoding with orjson, producing the same output as the DRF `JSONRenderer`.
+
+    Types orjson does not know (decimals, lazy strings, querysets, ...) and datetimes are
+    encoded by the DRF `JSONEncoder`. Indented responses, requested through the `indent`
+    media type parameter, are rendered by the DRF renderer. Without orjson, the JSON is encoded
+    with the standard library, as the DRF renderer does.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render `data` into JSON bytes.
+
+        :param data: The data to render.
+        :type data: Any
+        :param accepted_media_type: The media type accepted by the client.
+        :type accepted_media_type: str | None
+        :param renderer_context: The context of the view rendering the data.
+        :type renderer_context: dict | None
+        :return: The encoded JSON.
+        :rtype: bytes
+        """
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return encode_json(data)
+
+
+def encode_json(data):
+    """Return `data` encoded as compact JSON bytes, like the DRF `JSONRenderer` does."""
+    if orjson is None:
+        ret = json.dumps(data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode()
+    else:
+        ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+    # Like DRF, escape the line separators that are valid in JSON but not in JavaScript.
+    if b'\xe2\x80' in ret:
+        ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return ret
+
+
+_default = JSONEncoder().default
@@ -0,0 +1,142 @@
+import csv
+import io
+from datetime import date, datetime, time
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.renderers.fast_json import encode_json
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+_default = JSONEncoder().default
+
+
+class StreamingRowsRenderer(BaseRenderer):
+    """Base class for renderers of row formats that can also be streamed.
+
+    `render` renders regular response data, e.g. errors, while `render_rows` yields the encoded
+    rows in chunks of about `buffer_size` bytes, for a `StreamingHttpResponse`. Buffering keeps
+    the number of writes, and of compressor flushes, independent from the number of rows.
+    """
+
+    charset = 'utf-8'
+    buffer_size = DEFAULT_BUFFER_SIZE
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render a dict or a list of dicts as rows, with the keys of the first one as fields."""
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        fieldnames = tuple(rows[0]) if rows else ()
+        return b''.join(self.render_rows(fieldnames, ([row.get(name) for name in fieldnames] for row in rows)))
+
+    def render_rows(self, fieldnames, rows):
+        """Yield the encoded `rows` in chunks.
+
+        :param fieldnames: The names of the fields.
+        :type fieldnames: Sequence[str]
+        :param rows: The rows, as sequences of values in the order of `fieldnames`.
+        :type rows: Iterable[Sequence]
+        :return: An iterator of the encoded chunks.
+        :rtype: Iterator[bytes]
+        """
+        raise NotImplementedError('.render_rows() must be overridden')
+
+
+class CSVRenderer(StreamingRowsRenderer):
+    """Renderer of rows as CSV with a header line, formatting values like the JSON renderer."""
+
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def render_rows(self, fieldnames, rows):
+        """Yield the header and the CSV lines of `rows` in chunks."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fieldnames)
+        for row in rows:
+            writer.writerow([format_csv_value(value) for value in row])
+            if buffer.tell() >= self.buffer_size:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+
+class NDJSONRenderer(StreamingRowsRenderer):
+    """Renderer of rows as newline-delimited JSON objects."""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render_rows(self, fieldnames, rows):
+        """Yield the JSON lines of `rows` in chunks."""
+        chunk = []
+        size = 0
+        for row in rows:
+            line = encode_json(dict(zip(fieldnames, row))) + b'\n'
+            chunk.append(line)
+            size += len(line)
+            if size >= self.buffer_size:
+                yield b''.join(chunk)
+                chunk = []
+                size = 0
+        if chunk:
+            yield b''.join(chunk)
+
+
+def format_csv_value(value):
+    """Return a CSV cell of `value`, formatted like its JSON representation."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (datetime, date, time)):
+        return _default(value)
+    return value
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Renderer of server-sent events (`text/event-stream`).
+
+    `render_events` yields one chunk per batch of events, so they reach the client as soon as
+    they are produced. Responses of this media type must not be buffered, e.g. by compression.
+    """
+
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render regular response data, e.g. an error, as a single `error` event."""
+        if data is None:
+            return b''
+        return self.encode_event({'event': 'error', 'data': data})
+
+    def render_events(self, batches, retry=None):
+        """Yield the encoded batches of events.
+
+        :param batches: The batches of events, as dicts with the `data` of the event and optionally
+            its `id` and `event` type. An empty batch is sent as a comment, which keeps the connection alive.
+        :type batches: Iterable[list[dict]]
+        :param retry: The number of milliseconds the client waits before reconnecting.
+        :type retry: int | None
+        :return: An iterator of the encoded chunks.
+        :rtype: Iterator[bytes]
+        """
+        if retry is not None:
+            yield f'retry: {retry}\n\n'.encode()
+        for batch in batches:
+            yield b''.join(map(self.encode_event, batch)) if batch else b': keep-alive\n\n'
+
+    @staticmethod
+    def encode_event(event):
+        """Return an event encoded as one message, with its data as a line of JSON."""
+        message = b''
+        if event.get('id') is not None:
+            message += f'id: {event["id"]}\n'.encode()
+        if event.get('event'):
+            message += f'event: {event["event"]}\n'.encode()
+        return message + b'data: ' + encode_json(event['data']) + b'\n\n'
@@ -0,0 +1,144 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import ISO_8601
+from rest_framework.fields import BooleanField, CharField, DateTimeField, IntegerField
+from rest_framework.serializers import BaseSerializer
+from rest_framework.settings import api_settings
+
+from core.middleware.performance import measure_serialization
+
+# Fields whose representation is the value loaded from the database as is.
+PASSTHROUGH_FIELDS = (BooleanField, CharField, IntegerField)
+
+
+class NotCompilable(Exception):
+    """Raised when a serializer renders fields that cannot be read from `values_list()` columns."""
+
+
+class CompiledSerializer:
+    """Read-only serializer rendering `values_list()` rows, compiled from a DRF `ModelSerializer`.
+
+    Serializing model instances runs the whole DRF field machinery for every row. Compiling
+    resolves the rendered fields to columns once, so a row is rendered by indexing a tuple,
+    with `to_representation` only called for the fields that really convert their value
+    (e.g. datetimes). Nested serializers on one-to-one relations are read from the joined
+    columns and rendered as `None` when the related row is missing.
+    """
+
+    def __init__(self, serializer):
+        """Compile the rendered fields of `serializer`.
+
+        :param serializer: The serializer to compile, with its fields already pruned if needed.
+        :type serializer: ModelSerializer
+        :raises NotCompilable: If a rendered field is not backed by a column.
+        """
+        self.columns = []
+        self._plan = self._compile(serializer, serializer.Meta.model, '')
+
+    def add_column(self, lookup):
+        """Return the index of the `lookup` column in the rows, adding it to the columns if needed."""
+        if lookup not in self.columns:
+            self.columns.append(lookup)
+        return self.columns.index(lookup)
+
+    def values_list(self, queryset, extra_columns=()):
+        """Return `queryset` fetching named rows with the compiled columns.
+
+        :param queryset: The queryset of the serialized model.
+        :type queryset: QuerySet
+        :param extra_columns: Additional columns to fetch, e.g. the ordering fields read by a paginator.
+        :type extra_columns: Iterable[str]
+        :return: The queryset of rows.
+        :rtype: QuerySet
+        """
+        for lookup in extra_columns:
+            self.add_column(lookup)
+        return queryset.values_list(*self.columns, named=True)
+
+    def to_representation(self, row):
+        """Return the representation of a row fetched with `values_list(*self.columns)`."""
+        return self._render(self._plan, row)
+
+    def render_many(self, rows):
+        """Return the representations of the rows."""
+        plan = self._plan
+        render = self._render
+        with measure_serialization():
+            return [render(plan, row) for row in rows]
+
+    def _compile(self, serializer, model, prefix):
+        plan = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+
+            source = field.source
+            if source == '*' or '.' in source:
+                raise NotCompilable(f'{name} is not a model field')
+            try:
+                model_field = model._meta.get_field(source)
+            except FieldDoesNotExist as exc:
+                raise NotCompilable(f'{name} is not a model field') from exc
+
+            if isinstance(field, BaseSerializer):
+                if getattr(field, 'many', False) or not model_field.one_to_one:
+                    raise NotCompilable(f'{name} is not a one-to-one relation')
+                related_model = model_field.related_model
+                lookup = f'{prefix}{source}__'
+                index = self.add_column(f'{lookup}{related_model._meta.pk.name}')
+                plan.append((name, index, None, self._compile(field, related_model, lookup)))
+            elif model_field.concrete and not model_field.is_relation:
+                index = self.add_column(f'{prefix}{model_field.name}')
+                convert = get_converter(field)
+                plan.append((name, index, convert, None))
+            else:
+                raise NotCompilable(f'{name} is not a column')
+        return plan
+
+    def _render(self, plan, row):
+        data = {}
+        for name, index, convert, nested in plan:
+            value = row[index]
+            if nested is not None:
+                data[name] = None if value is None else self._render(nested, row)
+            elif value is None or convert is None:
+                data[name] = value
+            else:
+                data[name] = convert(value)
+        return data
+
+
+def get_converter(field):
+    """Return the function converting a column value to the representation of `field`, `None` if there is none."""
+    if isinstance(field, PASSTHROUGH_FIELDS):
+        return None
+    if isinstance(field, DateTimeField):
+        return get_datetime_converter(field)
+    return field.to_representation
+
+
+def get_datetime_converter(field):
+    """Return a converter rendering aware datetimes like `DateTimeField` with the ISO 8601 format.
+
+    `DateTimeField.to_representation` looks the current timezone up for every value, which
+    dominates the rendering of a row. Here it is looked up once, when compiling.
+    """
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format != ISO_8601 or timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(timezone).isoformat()
+        return f'{value[:-6]}Z' if value.endswith('+00:00') else value
+
+    return convert
+
+
+def compile_serializer(serializer):
+    """Return `serializer` compiled for `values_list()` rows, or `None` if it cannot be compiled."""
+    try:
+        return CompiledSerializer(serializer)
+    except NotCompilable:
+        return None
@@ -0,0 +1,20 @@
+from rest_framework.serializers import ListSerializer
+
+from core.middleware.performance import measure_serialization
+
+
+class MeasuredSerializerMixin:
+    """Serializer mixin adding the time spent building `data` to the serialization time of the request.
+
+    Set `Meta.list_serializer_class` to `MeasuredListSerializer` to measure lists of the serializer too.
+    """
+
+    @property
+    def data(self):
+        """Return the representation of the instance, measuring how long it takes to build."""
+        with measure_serialization():
+            return super().data
+
+
+class MeasuredListSerializer(MeasuredSerializerMixin, ListSerializer):
+    """List serializer adding the time spent building `data` to the serialization time of the request."""
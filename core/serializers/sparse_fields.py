@@ -0,0 +1,63 @@
+from rest_framework.exceptions import ValidationError
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class SparseFieldsetMixin:
+    """Serializer mixin rendering only the fields requested with the `fields` and `expand` query parameters.
+
+    `fields` is a comma-separated list of the fields to render. Fields listed in
+    `Meta.expandable_fields` (typically nested serializers) are only rendered with `fields`
+    when they are listed there or in `expand`. Without `fields`, every field is rendered.
+
+    The request is taken from the serializer context, and only reads are shaped, so the same
+    serializer still validates complete payloads on writes. As the pruned fields are the ones
+    the serializer exposes, `UserQuerySet.for_serializer` selects only their columns and joins.
+    """
+
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+
+    def get_fields(self):
+        """Return the fields of the serializer, pruned to the requested fieldset."""
+        fields = super().get_fields()
+        requested = self.get_requested_fields()
+        if requested is None:
+            return fields
+
+        readable = {name for name, field in fields.items() if not field.write_only}
+        unknown = requested - readable
+        if unknown:
+            raise ValidationError({'fields': [f'Unknown fields: {", ".join(sorted(unknown))}.']})
+        return {name: field for name, field in fields.items() if name in requested or field.write_only}
+
+    def get_requested_fields(self):
+        """Return the names of the fields requested by the client, or `None` to render all of them.
+
+        :return: The requested field names, including the expanded ones.
+        :rtype: set[str] | None
+        :raises ValidationError: If an unknown field is expanded.
+        """
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+
+        fields = _split(request.query_params.get(self.fields_query_param))
+        expand = _split(request.query_params.get(self.expand_query_param))
+        expandable = set(getattr(self.Meta, 'expandable_fields', ()))
+        if expand - expandable:
+            raise ValidationError({'expand': [f'Expected any of: {", ".join(sorted(expandable))}.']})
+        if not fields:
+            return None
+        return fields | expand
+
+    @property
+    def fieldset_variant(self):
+        """Return an identifier of the rendered fieldset, empty when every field is rendered."""
+        if self.get_requested_fields() is None:
+            return ''
+        return ','.join(name for name, field in self.fields.items() if not field.write_only)
+
+
+def _split(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
@@ -0,0 +1,50 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryCountAssertionsMixin:
+    """Test case mixin with assertions on the number of executed SQL queries.
+
+    `assertNumQueries` pins an exact number, which breaks on every harmless change. These
+    assertions instead catch what regresses latency: a query budget being exceeded, and the
+    number of queries growing with the number of rendered rows (N+1).
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, limit, using=DEFAULT_DB_ALIAS):
+        """Assert that the wrapped block executes at most `limit` queries.
+
+        :param limit: The maximum number of queries allowed.
+        :type limit: int
+        :param using: The database alias to capture queries on.
+        :type using: str
+        """
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+
+        executed = len(context.captured_queries)
+        if executed > limit:
+            queries = '\n'.join(f'{index}. {query["sql"]}' for index, query in enumerate(context, start=1))
+            self.fail(f'{executed} queries executed, {limit} allowed:\n{queries}')
+
+    def assertQueriesDoNotScale(self, action, grow, using=DEFAULT_DB_ALIAS):
+        """Assert that `action` runs the same number of queries before and after calling `grow`.
+
+        :param action: A callable performing the request under test.
+        :type action: Callable
+        :param grow: A callable adding more rows to be rendered by `action`.
+        :type grow: Callable
+        :param using: The database alias to capture queries on.
+        :type using: str
+        """
+        with CaptureQueriesContext(connections[using]) as before:
+            action()
+        grow()
+        with CaptureQueriesContext(connections[using]) as after:
+            action()
+
+        if len(after) != len(before):
+            queries = '\n'.join(f'{index}. {query["sql"]}' for index, query in enumerate(after, start=1))
+            self.fail(f'Query count grew from {len(before)} to {len(after)} with more rows:\n{queries}')
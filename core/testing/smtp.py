@@ -0,0 +1,99 @@
+import socketserver
+import threading
+from email import message_from_bytes, policy
+
+
+class LocalSMTPServer:
+    """Minimal SMTP server on localhost, standing in for the real mail server in tests.
+
+    It accepts every message and keeps it in `messages`, counts the connections it served,
+    and can be told to reject the next messages with a temporary failure. Use it as a context
+    manager, it listens on a free port exposed as `port`.
+    """
+
+    def __init__(self, host='127.0.0.1'):
+        """Initialize the server, it starts listening when entered."""
+        self.host = host
+        self.port = None
+        self.messages = []
+        self.connections = 0
+        self.fail_next = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        """Start serving on a background thread."""
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                with server._lock:
+                    server.connections += 1
+                server._handle_session(self.rfile, self.wfile)
+
+        self._server = socketserver.ThreadingTCPServer((self.host, 0), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handle_session(self, rfile, wfile):
+        def reply(line):
+            wfile.write(f'{line}\r\n'.encode())
+            wfile.flush()
+
+        reply('220 localhost ESMTP test server')
+        sender, recipients = None, []
+        for raw_line in rfile:
+            command = raw_line.decode('utf-8', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+            if verb == 'EHLO':
+                reply('250-localhost')
+                reply('250 8BITMIME')
+            elif verb == 'HELO':
+                reply('250 localhost')
+            elif verb == 'MAIL':
+                sender, recipients = command.split(':', 1)[1].strip(), []
+                reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command.split(':', 1)[1].strip().strip('<>'))
+                reply('250 OK')
+            elif verb == 'DATA':
+                reply('354 End data with <CR><LF>.<CR><LF>')
+                data = self._read_data(rfile)
+                with self._lock:
+                    rejected = self.fail_next > 0
+                    if rejected:
+                        self.fail_next -= 1
+                    else:
+                        self.messages.append(
+                            {
+                                'sender': sender,
+                                'recipients': recipients,
+                                'message': message_from_bytes(data, policy=policy.default),
+                            }
+                        )
+                reply('451 Temporary failure, try again later' if rejected else '250 OK')
+            elif verb in ('RSET', 'NOOP'):
+                reply('250 OK')
+            elif verb == 'QUIT':
+                reply('221 Bye')
+                return
+            else:
+                reply('502 Command not implemented')
+
+    @staticmethod
+    def _read_data(rfile):
+        lines = []
+        for raw_line in rfile:
+            if raw_line in (b'.\r\n', b'.\n'):
+                break
+            lines.append(raw_line[1:] if raw_line.startswith(b'..') else raw_line)
+        return b''.join(lines)
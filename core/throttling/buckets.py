@@ -0,0 +1,169 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from redis import Redis, RedisError
+
+logger = logging.getLogger(__name__)
+
+_bucket = None
+_bucket_lock = threading.Lock()
+
+# Refills the bucket of KEYS[1] for the time elapsed since it was last used, then takes a token
+# if one is left. The clock of the Redis server is used, so every worker sees the same time.
+CONSUME_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1])
+if tokens == nil then
+    tokens = capacity
+else
+    tokens = math.min(capacity, tokens + math.max(0, now - tonumber(state[2])) * refill_rate)
+end
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / refill_rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / refill_rate * 1000))
+return tostring(wait)
+"""
+
+
+class LocalTokenBucket:
+    """Thread-safe in-process token buckets.
+
+    Every key has a bucket of `capacity` tokens that refills at `refill_rate` tokens per
+    second, and each request takes one token. The buckets are only shared by the threads of one
+    process. The least recently used buckets are dropped once `max_keys` is reached, which only
+    lets their clients start over with a full bucket.
+    """
+
+    def __init__(self, max_keys=10000):
+        """Initialize the buckets.
+
+        :param max_keys: The maximum number of buckets kept.
+        :type max_keys: int
+        """
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_rate):
+        """Take a token from the bucket of `key`.
+
+        :param key: The key of the bucket.
+        :type key: str
+        :param capacity: The maximum number of tokens in the bucket.
+        :type capacity: int
+        :param refill_rate: The number of tokens added to the bucket per second.
+        :type refill_rate: float
+        :return: 0 if a token was taken, else the number of seconds until one is available.
+        :rtype: float
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / refill_rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        """Drop every bucket."""
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisTokenBucket:
+    """Token buckets stored in Redis, and so shared by every worker of every host.
+
+    A request is counted with a single Lua script, so concurrent requests of one client cannot
+    both take its last token. While Redis is unavailable the buckets of `fallback` are used
+    instead, and Redis is tried again every `retry_interval` seconds. Those are per-process,
+    so during an outage a client may make up to one bucket's worth of requests per worker.
+    """
+
+    def __init__(self, client, fallback, retry_interval=5):
+        """Initialize the buckets.
+
+        :param client: The Redis client.
+        :type client: Redis
+        :param fallback: The buckets used while Redis is unavailable.
+        :type fallback: LocalTokenBucket
+        :param retry_interval: The number of seconds to wait before trying Redis again after an error.
+        :type retry_interval: float
+        """
+        self.client = client
+        self.fallback = fallback
+        self.retry_interval = retry_interval
+        self._script = client.register_script(CONSUME_SCRIPT)
+        self._unavailable_until = 0.0
+
+    def consume(self, key, capacity, refill_rate):
+        """Take a token from the bucket of `key`, from the local buckets if Redis is unavailable.
+
+        :param key: The key of the bucket.
+        :type key: str
+        :param capacity: The maximum number of tokens in the bucket.
+        :type capacity: int
+        :param refill_rate: The number of tokens added to the bucket per second.
+        :type refill_rate: float
+        :return: 0 if a token was taken, else the number of seconds until one is available.
+        :rtype: float
+        """
+        if time.monotonic() >= self._unavailable_until:
+            try:
+                return float(self._script(keys=[key], args=[capacity, refill_rate]))
+            except RedisError as exc:
+                self._unavailable_until = time.monotonic() + self.retry_interval
+                logger.warning(
+                    'Throttling with local buckets for %ss, Redis is unavailable: %s', self.retry_interval, exc
+                )
+        return self.fallback.consume(key, capacity, refill_rate)
+
+
+def get_token_bucket():
+    """Return the process-wide token buckets configured by the `THROTTLE_*` settings.
+
+    The buckets are kept in Redis when `THROTTLE_REDIS_URL` is set, and in process otherwise.
+    """
+    global _bucket
+    if _bucket is None:
+        with _bucket_lock:
+            if _bucket is None:
+                local = LocalTokenBucket(settings.THROTTLE_LOCAL_MAX_KEYS)
+                if settings.THROTTLE_REDIS_URL:
+                    client = Redis.from_url(
+                        settings.THROTTLE_REDIS_URL,
+                        socket_timeout=settings.THROTTLE_REDIS_TIMEOUT,
+                        socket_connect_timeout=settings.THROTTLE_REDIS_TIMEOUT,
+                    )
+                    _bucket = RedisTokenBucket(client, local, settings.THROTTLE_REDIS_RETRY_INTERVAL)
+                else:
+                    _bucket = local
+    return _bucket
+
+
+@receiver(setting_changed)
+def reset_token_bucket(setting, **kwargs):
+    """Rebuild the buckets when their settings are overridden, e.g. in tests."""
+    global _bucket
+    if setting.startswith('THROTTLE_') or setting == 'REST_FRAMEWORK':
+        with _bucket_lock:
+            _bucket = None
@@ -0,0 +1,82 @@
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from core.throttling.buckets import get_token_bucket
+
+
+class ScopedTokenBucketThrottle(SimpleRateThrottle):
+    """Throttle each client with a token bucket per scope, shared by the workers through Redis.
+
+    A rate of `N/period` lets a client make a burst of `N` requests, then one request every
+    `period / N`. Clients are identified by their user ID when authenticated, else by their IP
+    address (see the `NUM_PROXIES` setting).
+
+    The scope of a request is, in order:
+
+    - the `throttle_scope` attribute of the view;
+    - the scope of the view's URL name and the request method in `THROTTLE_VIEW_SCOPES`, for
+      third-party views such as the djoser ones;
+    - `read` for safe methods, else `write`.
+
+    Scopes without a rate in `DEFAULT_THROTTLE_RATES` are not throttled.
+    """
+
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def __init__(self):
+        """Initialize the throttle, whose scope and rate depend on the request."""
+        self.rate = None
+        self.wait_time = 0.0
+
+    @property
+    def THROTTLE_RATES(self):  # noqa: N802
+        """Return the configured rates, read on every request so that they can be overridden in tests."""
+        return api_settings.DEFAULT_THROTTLE_RATES
+
+    def allow_request(self, request, view):
+        """Take a token from the bucket of the client in the scope of the request.
+
+        :param request: The incoming request.
+        :type request: Request
+        :param view: The view handling the request.
+        :type view: APIView
+        :return: Whether the request is allowed.
+        :rtype: bool
+        """
+        self.scope = self.get_scope(request, view)
+        self.rate = self.THROTTLE_RATES.get(self.scope)
+        if self.rate is None:
+            return True
+
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        self.key = self.get_cache_key(request, view)
+        self.wait_time = get_token_bucket().consume(self.key, self.num_requests, self.num_requests / self.duration)
+        return self.wait_time <= 0
+
+    def get_scope(self, request, view):
+        """Return the throttling scope of the request."""
+        scope = getattr(view, 'throttle_scope', None)
+        if scope:
+            return scope
+
+        resolver_match = request.resolver_match
+        if resolver_match is not None:
+            scope = settings.THROTTLE_VIEW_SCOPES.get(resolver_match.url_name, {}).get(request.method)
+            if scope:
+                return scope
+        return 'read' if request.method in SAFE_METHODS else 'write'
+
+    def get_cache_key(self, request, view):
+        """Return the key of the bucket of the client in the current scope."""
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            ident = f'user:{user.pk}'
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def wait(self):
+        """Return the number of seconds until the client may make another request in the scope."""
+        return self.wait_time
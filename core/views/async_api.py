@@ -0,0 +1,136 @@
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+from rest_framework.exceptions import APIException, NotAuthenticated, Throttled
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from core.cache.mixins import get_validator_headers, make_validators
+from core.renderers.fast_json import encode_json
+from core.throttling.buckets import LocalTokenBucket, get_token_bucket
+
+
+class AsyncAPIView(View):
+    """Base class for ASGI-native JSON API views.
+
+    Unlike DRF views, the handlers are coroutines, so under an ASGI server the request is
+    served on the event loop without a `sync_to_async` thread hop. Like DRF views, the view
+    is exempt from CSRF checks, is throttled by the `DEFAULT_THROTTLE_CLASSES`, and errors use
+    the DRF `{"detail": ...}` format.
+    """
+
+    http_method_names = ['get', 'post', 'put', 'patch', 'delete', 'options']
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        """Return the view function, exempt from CSRF checks."""
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        """Return a 429 response if the request is throttled, else the response of its handler."""
+        drf_request = self.get_request()
+        if isinstance(get_token_bucket(), LocalTokenBucket):
+            wait = self.get_throttle_wait(drf_request)
+        else:
+            # The Redis client blocks, so it is called off the event loop.
+            wait = await sync_to_async(self.get_throttle_wait, thread_sensitive=False)(drf_request)
+        if wait is not None:
+            return self.render(
+                {'detail': Throttled(wait).detail}, status=429, headers={'Retry-After': str(max(1, math.ceil(wait)))}
+            )
+        return await super().dispatch(request, *args, **kwargs)
+
+    def get_request(self):
+        """Return the current request wrapped in a DRF `Request`, for query parameters and URLs."""
+        return Request(self.request)
+
+    async def authenticate(self):
+        """Return the current request with the user authenticated by the `authentication_classes`.
+
+        Handlers call it when they need the user; the authenticators may query the database, so
+        they are run off the event loop.
+
+        :return: The authenticated DRF `Request`, or a 401 (or 403) response if the credentials are
+            missing or invalid.
+        :rtype: Request | HttpResponse
+        """
+        request = Request(self.request, authenticators=[auth() for auth in self.authentication_classes])
+        try:
+            user = await sync_to_async(lambda: request.user)()
+        except APIException as exc:
+            return self.render_not_authenticated(request, exc)
+        if not user or not user.is_authenticated:
+            return self.render_not_authenticated(request, NotAuthenticated())
+        return request
+
+    def render_not_authenticated(self, request, exc):
+        """Return the error response of a failed authentication, challenging the client like DRF views."""
+        headers = {}
+        if exc.status_code == 401 and request.authenticators:
+            headers['WWW-Authenticate'] = request.authenticators[0].authenticate_header(request)
+        return self.render({'detail': exc.detail}, status=exc.status_code, headers=headers)
+
+    def get_throttle_wait(self, request):
+        """Return the longest wait of the throttles refusing `request`, or `None` if it is allowed."""
+        waits = []
+        for throttle_class in self.throttle_classes:
+            throttle = throttle_class()
+            if not throttle.allow_request(request, self):
+                waits.append(throttle.wait() or 0)
+        return max(waits) if waits else None
+
+    def parse_json(self):
+        """Return the decoded JSON body of the request, or `None` if it is not valid JSON."""
+        try:
+            return json.loads(self.request.body or b'{}')
+        except ValueError:
+            return None
+
+    def render(self, data, status=200, headers=None):
+        """Return `data` rendered as a JSON response, or an empty response if `data` is `None`."""
+        if data is None:
+            return HttpResponse(status=status, headers=headers)
+        return HttpResponse(encode_json(data), status=status, headers=headers, content_type='application/json')
+
+    def render_conditional(self, data, timestamps, variant=''):
+        """Return `data` with its validators, or an empty 304 response if the client has it.
+
+        The validators are derived from the `updated_at` of the rendered rows as in
+        `CachedRetrieveMixin`, so a resource has the same ETag whichever view serves it. ETags are
+        compared weakly, so the weak ETags of compressed responses match too.
+
+        :param data: The serialized representation of the resource.
+        :type data: dict
+        :param timestamps: The `updated_at` values of the rows `data` is rendered from.
+        :type timestamps: Iterable[datetime | None]
+        :param variant: An identifier of the representation, when a resource has several.
+        :type variant: str
+        """
+        validators = make_validators(timestamps, variant)
+        response = self.get_conditional_response(validators)
+        if response is not None:
+            return response
+        return self.render(data, headers=get_validator_headers(validators))
+
+    def get_conditional_response(self, validators):
+        """Return a 304 (or 412) response if the request preconditions match `validators`, else `None`."""
+        response = get_conditional_response(
+            self.request, etag=validators['etag'], last_modified=validators['last_modified']
+        )
+        if response is None:
+            return None
+        for header, value in get_validator_headers(validators).items():
+            response.headers[header] = value
+        return response
+
+    def render_error(self, detail, status):
+        """Return an error response with the given detail."""
+        return self.render({'detail': detail}, status=status)
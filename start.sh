@@ -1,4 +1,10 @@
 #!/bin/bash
+#
+# Usage: start.sh [web|migrate|mailer|relay]
+#   web      serve the application with gunicorn (default)
+#   migrate  apply the database migrations once and exit
+#   mailer   deliver the queued emails until stopped
+#   relay    append the user changes to the Redis stream until stopped
 
 wait_for_postgres() {
     until nc -z "$POSTGRES_HOST" "$POSTGRES_PORT"; do
@@ -11,8 +17,25 @@ wait_for_postgres() {
 wait_for_postgres
 echo "PostgreSQL is ready. Proceed with your script."
 
-python manage.py makemigrations
-python manage.py migrate
-
-echo "Starting Server..."
-python manage.py runserver 0.0.0.0:8000
+case "${1:-web}" in
+    migrate)
+        echo "Applying migrations..."
+        exec python manage.py migrate --noinput
+        ;;
+    web)
+        echo "Starting Server..."
+        exec gunicorn -c configs/gunicorn.conf.py
+        ;;
+    mailer)
+        echo "Starting mailing worker..."
+        exec python manage.py send_queued_emails
+        ;;
+    relay)
+        echo "Starting user changes relay..."
+        exec python manage.py relay_user_changes
+        ;;
+    *)
+        echo "Unknown command: $1" >&2
+        exit 1
+        ;;
+esac